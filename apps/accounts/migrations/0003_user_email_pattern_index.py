@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-18 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_name_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email'], name='user_email_pattern_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
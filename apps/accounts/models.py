@@ -64,3 +64,8 @@ class User(AbstractBaseUser):
     class Meta:
         db_table = "user"
         verbose_name = "ユーザー"
+        # メールアドレス・名前の前方一致検索（LIKE 'xxx%'）に使う
+        indexes = [
+            models.Index(fields=["email"], name="user_email_pattern_idx", opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["name"], name="user_name_idx", opclasses=["varchar_pattern_ops"]),
+        ]
@@ -0,0 +1,19 @@
+from django.conf import settings
+
+
+class ChangeAwareSessionMixin:
+    # 読み込み時と内容が変わっていなければ、modifiedでもセッションを保存しない
+    # （有効期限を毎回延長する SESSION_SAVE_EVERY_REQUEST の場合は常に保存する）
+    def load(self):
+        session_data = super().load()
+        self._loaded_session_data = self.serializer().dumps(session_data)
+        return session_data
+
+    def save(self, must_create=False):
+        session_data = self.serializer().dumps(self._get_session(no_load=must_create))
+        unchanged = session_data == getattr(self, "_loaded_session_data", None)
+        if unchanged and not (must_create or settings.SESSION_SAVE_EVERY_REQUEST):
+            return
+
+        super().save(must_create=must_create)
+        self._loaded_session_data = session_data
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import cached_db
+
+from . import ChangeAwareSessionMixin
+
+
+class SessionStore(ChangeAwareSessionMixin, cached_db.SessionStore):
+    pass
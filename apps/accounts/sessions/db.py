@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import db
+
+from . import ChangeAwareSessionMixin
+
+
+class SessionStore(ChangeAwareSessionMixin, db.SessionStore):
+    pass
@@ -1 +1,93 @@
-# Create your tests here.
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.accounts.views import LoginUserSearchView
+
+
+@override_settings(DEMO_LOGIN_INFO=True)
+class TestLoginUserSearchView(TestCase):
+    url = reverse("accounts:login_user_search")
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, name in enumerate(["テスト1", "テスト2", "山田", "無効"], start=1):
+            User.objects.create(email="user{}@example.com".format(i), name=name, active=name != "無効")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_login_page_not_list_users(self):
+        """
+        ログイン画面にアクセスする
+        ユーザー一覧を取得しないことを確認
+        :return:
+        """
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("accounts:login"))
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertNotIn("users", response.context_data)
+
+    def test_search_by_prefix(self):
+        """
+        メールアドレス・名前の前方一致で検索する
+        有効なユーザーのみメールアドレス順に返されることを確認
+        :return:
+        """
+        response = self.client.get(self.url, {"q": "テスト"})
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertEqual(
+            ["user1@example.com", "user2@example.com"], [user["email"] for user in response.json()["users"]]
+        )
+
+        response = self.client.get(self.url, {"q": "user3"})
+        self.assertEqual([{"email": "user3@example.com", "name": "山田", "manager": False}], response.json()["users"])
+
+        response = self.client.get(self.url, {"q": "無効"})
+        self.assertEqual([], response.json()["users"])
+
+    def test_pagination(self):
+        """
+        表示件数を超えるユーザーが該当する
+        次のページのカーソルで続きを取得できることを確認
+        :return:
+        """
+        with mock.patch.object(LoginUserSearchView, "PAGE_SIZE", 2):
+            response = self.client.get(self.url)
+            self.assertEqual(
+                ["user1@example.com", "user2@example.com"], [user["email"] for user in response.json()["users"]]
+            )
+            self.assertEqual("user2@example.com", response.json()["next"])
+
+            response = self.client.get(self.url, {"after": response.json()["next"]})
+            self.assertEqual(["user3@example.com"], [user["email"] for user in response.json()["users"]])
+            self.assertIsNone(response.json()["next"])
+
+    def test_cached(self):
+        """
+        同じ条件で続けて検索する
+        2回目はDBに問い合わせず、キャッシュから返されることを確認
+        :return:
+        """
+        self.client.get(self.url, {"q": "テスト"})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"q": "テスト"})
+        self.assertEqual(2, len(response.json()["users"]))
+
+    @override_settings(DEMO_LOGIN_INFO=False)
+    def test_demo_login_info_disabled(self):
+        """
+        デモ用のログイン情報を無効にしてアクセスする
+        ユーザー情報が返されず、ログイン画面にも検索欄が表示されないことを確認
+        :return:
+        """
+        response = self.client.get(self.url, {"q": "テスト"})
+        self.assertEqual(HTTPStatus.NOT_FOUND.value, response.status_code)
+
+        response = self.client.get(reverse("accounts:login"))
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertNotContains(response, "login-user-search")
@@ -1,10 +1,11 @@
 from django.urls import path
 
-from apps.accounts.views import LoginView, LogoutView
+from apps.accounts.views import LoginUserSearchView, LoginView, LogoutView
 
 app_name = "apps.accounts"
 
 urlpatterns = [
     path("login/", LoginView.as_view(), name="login"),
+    path("login/users/", LoginUserSearchView.as_view(), name="login_user_search"),
     path("logout/", LogoutView.as_view(), name="logout"),
 ]
@@ -1,5 +1,11 @@
+from django.conf import settings
 from django.contrib.auth import views
+from django.db.models import Q
+from django.http import Http404, JsonResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.cache import cache_page
 
 from apps.accounts.form import LoginForm
 from apps.accounts.models import User
@@ -10,6 +16,11 @@ class LoginView(views.LoginView):
     redirect_authenticated_user = True
     template_name = "material-dashboard-master/pages/sign-in.html"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["demo_login_info"] = settings.DEMO_LOGIN_INFO
+        return context
+
     def get_redirect_url(self):
         url = super().get_redirect_url()
 
@@ -18,11 +29,32 @@ class LoginView(views.LoginView):
 
         return url
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data()
-        # TODO デモ用 ログイン情報
-        context["users"] = User.objects.all().order_by("-manager", "email")
-        return context
+
+# デモ環境のログイン情報として、ログイン画面の入力に合わせてメールアドレス・名前が前方一致するユーザーを返す
+# 認証なしでユーザー情報を返すため、DEMO_LOGIN_INFOが有効な場合のみ公開する
+@method_decorator(cache_page(60), name="dispatch")
+class LoginUserSearchView(generic.View):
+    PAGE_SIZE = 10
+
+    def get(self, request, *args, **kwargs):
+        if not settings.DEMO_LOGIN_INFO:
+            raise Http404
+
+        user_qs = User.objects.filter(active=True)
+
+        query = request.GET.get("q", "").strip()
+        if query:
+            user_qs = user_qs.filter(Q(email__startswith=query) | Q(name__startswith=query))
+
+        # メールアドレスは一意なので、直前のページの末尾より後ろを取得する
+        after = request.GET.get("after")
+        if after:
+            user_qs = user_qs.filter(email__gt=after)
+
+        user_list = list(user_qs.order_by("email").values("email", "name", "manager")[: self.PAGE_SIZE + 1])
+        next_cursor = user_list[self.PAGE_SIZE - 1]["email"] if len(user_list) > self.PAGE_SIZE else None
+
+        return JsonResponse({"users": user_list[: self.PAGE_SIZE], "next": next_cursor})
 
 
 class LogoutView(views.LogoutView):
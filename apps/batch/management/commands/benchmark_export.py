@@ -0,0 +1,65 @@
+import time
+import tracemalloc
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.timecard.views import TimeCardExportView
+
+
+class Command(BaseCommand):
+    help = "勤怠Excel出力の通常モードと書き込み専用モードの処理時間・最大メモリ使用量を比較する"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="対象ユーザーのメールアドレス（省略時は先頭のユーザー）")
+        parser.add_argument("--month", default=timezone.datetime.today().strftime("%Y%m"), help="対象月（YYYYMM）")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = self._get_user(options["user"])
+        view = self._get_view(user, options["month"])
+
+        modes = {
+            "standard": view._create_wb,
+            "write_only": lambda: view._create_write_only_wb(
+                *view._get_ws_contents(user, view._get_monthly_stamps())
+            ),
+        }
+        for mode, create_wb in modes.items():
+            elapsed, peak = self._measure(create_wb, options["repeat"])
+            self.stdout.write(
+                "{:<10} total={:.3f}s avg={:.2f}ms peak={:.1f}KiB".format(
+                    mode, elapsed, elapsed / options["repeat"] * 1000, peak / 1024
+                )
+            )
+
+    def _get_user(self, email):
+        user = User.objects.filter(email=email).first() if email else User.objects.order_by("id").first()
+        if user is None:
+            raise CommandError("ユーザーが存在しません")
+
+        return user
+
+    def _get_view(self, user, month):
+        request = RequestFactory().get("/", {"month": month})
+        request.user = user
+
+        view = TimeCardExportView()
+        view.setup(request)
+        view.EOM_by_url = view._get_EOM_by_url(False)
+        return view
+
+    def _measure(self, create_wb, repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            create_wb().save(BytesIO())
+
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return elapsed, peak
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from apps.accounts.models import User
+from apps.timecard.views import TimeCardBulkExportView
+
+
+class Command(BaseCommand):
+    help = "指定月の勤怠Excelをユーザーごとに作成し、ZIPファイルにまとめて出力する"
+
+    def add_arguments(self, parser):
+        parser.add_argument("month", help="対象月（YYYYMM）")
+        parser.add_argument("--user", nargs="*", default=[], help="対象ユーザーのメールアドレス（省略時は全ユーザー）")
+        parser.add_argument("--output", help="出力先のファイルパス（省略時は 勤怠_YYYY年MM月.zip）")
+        parser.add_argument("--workers", type=int, help="Excel作成に使うプロセス数（省略時はCPUコア数）")
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/", {"month": options["month"]})
+        view = TimeCardBulkExportView()
+        view.setup(request)
+        view.EOM_by_url = view._get_EOM_by_url(False)
+        if view.EOM_by_url is None:
+            raise CommandError("対象月はYYYYMMの形式で指定してください")
+
+        users_qs = User.objects.filter(active=True)
+        if options["user"]:
+            users_qs = users_qs.filter(email__in=options["user"])
+
+        output = options["output"] or "勤怠_" + view.EOM_by_url.strftime("%Y{0}%m{1}").format(*"年月") + ".zip"
+        with open(output, "wb") as file:
+            file_count = view.write_zip(file, users_qs, options["workers"])
+
+        self.stdout.write("{}件のExcelを{}に出力しました".format(file_count, output))
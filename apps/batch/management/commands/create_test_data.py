@@ -7,9 +7,7 @@ from django.utils import timezone
 from faker import Faker
 
 from apps.accounts.models import User
-from apps.timecard.models import TimeCard, TimeCardSummary
-from apps.timecard.views.base import timedelta2str
-from apps.timecard.views.timecard import TimeCardProcessMonthlyReportView
+from apps.timecard.models import MonthlySubmission, TimeCard, TimeCardSummary
 
 
 class Command(BaseCommand):
@@ -70,8 +68,8 @@ class Command(BaseCommand):
                 end_work = datetime.replace(hour=random.randint(11, 12), minute=random.randint(0, 59))
                 total_work_hours += end_work - start_work
 
-                TimeCard.objects.create(user=user, kind=TimeCard.Kind.IN, stamped_time=start_work, state=state)
-                TimeCard.objects.create(user=user, kind=TimeCard.Kind.OUT, stamped_time=end_work, state=state)
+                TimeCard.objects.create(user=user, kind=TimeCard.Kind.IN, stamped_time=start_work)
+                TimeCard.objects.create(user=user, kind=TimeCard.Kind.OUT, stamped_time=end_work)
             else:
                 start_work = datetime.replace(hour=random.randint(7, 9), minute=random.randint(0, 59))
                 end_work = datetime.replace(hour=random.randint(17, 20), minute=random.randint(0, 59))
@@ -81,12 +79,15 @@ class Command(BaseCommand):
                 total_work_hours += end_work - start_work - break_hours
                 total_break_hours += break_hours
 
-                TimeCard.objects.create(user=user, kind=TimeCard.Kind.IN, stamped_time=start_work, state=state)
-                TimeCard.objects.create(user=user, kind=TimeCard.Kind.OUT, stamped_time=end_work, state=state)
-                TimeCard.objects.create(
-                    user=user, kind=TimeCard.Kind.ENTER_BREAK, stamped_time=enter_break, state=state
-                )
-                TimeCard.objects.create(user=user, kind=TimeCard.Kind.END_BREAK, stamped_time=end_break, state=state)
+                TimeCard.objects.create(user=user, kind=TimeCard.Kind.IN, stamped_time=start_work)
+                TimeCard.objects.create(user=user, kind=TimeCard.Kind.OUT, stamped_time=end_work)
+                TimeCard.objects.create(user=user, kind=TimeCard.Kind.ENTER_BREAK, stamped_time=enter_break)
+                TimeCard.objects.create(user=user, kind=TimeCard.Kind.END_BREAK, stamped_time=end_break)
+
+        if state != MonthlySubmission.State.NEW:
+            MonthlySubmission.objects.create(
+                user=user, month=(self.today + relativedelta(month=month, day=1)).date(), state=state
+            )
 
         return work_days_list, total_work_hours, total_break_hours
 
@@ -96,7 +97,7 @@ class Command(BaseCommand):
         last_month = self.today.month - 1
         for month in range(1, self.today.month):
             work_days_list, total_work_hours, total_break_hours = self._create_timecard(
-                user, month, TimeCard.State.PROCESSING
+                user, month, MonthlySubmission.State.PROCESSING
             )
 
             if month != last_month:
@@ -105,19 +106,22 @@ class Command(BaseCommand):
                 )
 
     def _approve_timecard_and_create_summary(self, user, month, work_days_list, total_work_hours, total_break_hours):
-        obj = TimeCardProcessMonthlyReportView()
-        work_days_flag = obj.create_work_days_flag(work_days_list)
-        TimeCard.objects.filter(user=user, state=TimeCard.State.PROCESSING).update(state=TimeCard.State.APPROVED)
+        work_days_flag = 0
+        for work_day in work_days_list:
+            work_days_flag |= 1 << (work_day - 1)
+
+        BOM = (self.today + relativedelta(month=month, day=1)).date()
+        MonthlySubmission.objects.approve(user, BOM)
         TimeCardSummary.objects.create(
             user=user,
             work_days_flag=work_days_flag,
-            month=(self.today + relativedelta(month=month)).strftime("%Y%m"),
-            total_work_hours=timedelta2str(total_work_hours),
-            total_break_hours=timedelta2str(total_break_hours),
+            month=BOM,
+            work_seconds=int(total_work_hours.total_seconds()),
+            break_seconds=int(total_break_hours.total_seconds()),
         )
 
     def _create_new_timecard(self, user):
-        self._create_timecard(user, self.today.month, TimeCard.State.NEW)
+        self._create_timecard(user, self.today.month, MonthlySubmission.State.NEW)
         TimeCard.objects.filter(user=user, stamped_time__gt=self.today).delete()
 
     def _get_day_count(self, month):
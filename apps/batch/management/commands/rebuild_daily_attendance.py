@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.accounts.models import User
+from apps.timecard.models import DailyAttendance
+
+
+class Command(BaseCommand):
+    help = "打刻情報から日次勤怠を再作成する"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", nargs="*", default=[], help="対象ユーザーのメールアドレス（省略時は全ユーザー）")
+        parser.add_argument("--chunk-size", type=int, default=100, help="1回のトランザクションで処理するユーザー数")
+
+    def handle(self, *args, **options):
+        users_qs = User.objects.all()
+        if options["user"]:
+            users_qs = users_qs.filter(email__in=options["user"])
+
+        user_ids = list(users_qs.order_by("id").values_list("id", flat=True))
+        chunk_size = options["chunk_size"]
+
+        total_count = 0
+        for index in range(0, len(user_ids), chunk_size):
+            chunk_user_ids = user_ids[index : index + chunk_size]
+            with transaction.atomic():
+                total_count += DailyAttendance.objects.rebuild(chunk_user_ids)
+
+            self.stdout.write("{}/{}人のユーザーを処理しました".format(index + len(chunk_user_ids), len(user_ids)))
+
+        self.stdout.write("{}件の日次勤怠を作成しました".format(total_count))
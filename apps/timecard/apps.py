@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TimecardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.timecard"
+
+    def ready(self):
+        from apps.timecard import signals  # noqa: F401
+        from apps.timecard.month_calendar import warm_up
+
+        # 前後12ヶ月分の祝日・曜日情報を起動時に作成しておく
+        warm_up()
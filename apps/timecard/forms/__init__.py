@@ -1,5 +1,15 @@
 from .base import BaseForm, SplitDateTimeWidget
-from .timecard import (TimeCardForm, TimeCardFormSet, TimeCardSearchForm,
-                       UploadFileForm)
+from .timecard import (MonthlySubmissionFilterForm, TimeCardForm,
+                       TimeCardFormSet, TimeCardSearchForm,
+                       TimeCardSummaryFilterForm, UploadFileForm)
 
-__all__ = ["BaseForm", "TimeCardForm", "TimeCardSearchForm", "TimeCardFormSet", "UploadFileForm", "SplitDateTimeWidget"]
+__all__ = [
+    "BaseForm",
+    "MonthlySubmissionFilterForm",
+    "TimeCardForm",
+    "TimeCardSearchForm",
+    "TimeCardSummaryFilterForm",
+    "TimeCardFormSet",
+    "UploadFileForm",
+    "SplitDateTimeWidget",
+]
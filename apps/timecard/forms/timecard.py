@@ -5,13 +5,45 @@ from django.db import transaction
 from django.forms import BaseModelFormSet, modelformset_factory
 
 from apps.timecard.forms import BaseForm, SplitDateTimeWidget
-from apps.timecard.models import TimeCard
+from apps.timecard.models import MonthlySubmission, TimeCard
 
 
 class TimeCardSearchForm(BaseForm):
     month = forms.CharField(label="表示月", required=False, max_length=7, widget=forms.DateInput(attrs={"type": "month"}))
 
 
+class MonthlySubmissionFilterForm(BaseForm):
+    name = forms.CharField(label="申請者（前方一致）", required=False, max_length=20)
+    state = forms.ChoiceField(
+        label="ステータス", required=False, choices=[("", "すべて")] + MonthlySubmission.State.choices
+    )
+
+
+class TimeCardSummaryFilterForm(BaseForm):
+    SORT_CHOICES = [
+        ("name", "名前順"),
+        ("-work_seconds", "総勤務時間が長い順"),
+        ("work_seconds", "総勤務時間が短い順"),
+        ("-overtime_seconds", "残業時間が長い順"),
+    ]
+
+    sort = forms.ChoiceField(label="並び順", required=False, choices=SORT_CHOICES)
+    name = forms.CharField(label="名前（前方一致）", required=False, max_length=20)
+    min_hours = forms.DecimalField(label="総勤務時間（以上）", required=False, min_value=0, decimal_places=2)
+    max_hours = forms.DecimalField(label="総勤務時間（以下）", required=False, min_value=0, decimal_places=2)
+    work_day = forms.IntegerField(label="出勤日", required=False, min_value=1, max_value=31)
+    work_days_lt = forms.IntegerField(label="出勤日数（未満）", required=False, min_value=1, max_value=32)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        min_hours = cleaned_data.get("min_hours")
+        max_hours = cleaned_data.get("max_hours")
+        if min_hours is not None and max_hours is not None and min_hours > max_hours:
+            self.add_error("max_hours", "下限＜上限で入力してください。")
+
+        return cleaned_data
+
+
 class TimeCardForm(BaseForm, forms.ModelForm):
     DISPLAY_KIND_CHOICES = [TimeCard.Kind.IN, TimeCard.Kind.OUT, TimeCard.Kind.ENTER_BREAK, TimeCard.Kind.END_BREAK]
 
@@ -64,7 +96,6 @@ class BaseTimeCardFormSet(BaseModelFormSet):
                 stamped_time__gte=date,
                 stamped_time__lt=(date + relativedelta(days=1)),
                 user=user,
-                state=TimeCard.State.NEW,
             ).order_by("kind")
 
     @transaction.atomic
@@ -150,7 +181,7 @@ TimeCardFormSet = modelformset_factory(
 
 
 class UploadFileForm(BaseForm):
-    LIMIT_SIZE = 2 * 10 * 10**3
+    LIMIT_SIZE = 10 * 10 * 10**3
     file = forms.FileField(
         label="アップロードファイル",
         allow_empty_file=False,
@@ -161,6 +192,8 @@ class UploadFileForm(BaseForm):
         file = self.cleaned_data["file"]
 
         if file.size > self.LIMIT_SIZE:
-            raise forms.ValidationError("ファイルサイズが大きすぎます。 20KB以下のファイルを指定してください。")
+            raise forms.ValidationError(
+                "ファイルサイズが大きすぎます。 {}KB以下のファイルを指定してください。".format(self.LIMIT_SIZE // 10**3)
+            )
 
         return file
@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('timecard', '0006_timecardsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='対象日')),
+                ('start_work', models.DateTimeField(blank=True, null=True, verbose_name='出勤時刻')),
+                ('end_work', models.DateTimeField(blank=True, null=True, verbose_name='退勤時刻')),
+                ('enter_break', models.DateTimeField(blank=True, null=True, verbose_name='休憩開始時刻')),
+                ('end_break', models.DateTimeField(blank=True, null=True, verbose_name='休憩終了時刻')),
+                ('work_seconds', models.PositiveIntegerField(default=0, verbose_name='労働時間（秒）')),
+                ('break_seconds', models.PositiveIntegerField(default=0, verbose_name='休憩時間（秒）')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='登録日時')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+            ],
+            options={
+                'verbose_name': '日次勤怠',
+                'db_table': 'daily_attendance',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyattendance',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_attendance_user_date'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 3.2 on 2026-10-18 17:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def delete_duplicate_summaries(apps, schema_editor):
+    # 同じユーザー・対象月のサマリが複数ある場合は最新のもののみ残す
+    TimeCardSummary = apps.get_model('timecard', 'TimeCardSummary')
+    seen_keys = set()
+    delete_ids = []
+    for summary_id, user_id, month in TimeCardSummary.objects.order_by('user', 'month', '-updated_at', '-id').values_list('id', 'user', 'month').iterator():
+        if (user_id, month) in seen_keys:
+            delete_ids.append(summary_id)
+        else:
+            seen_keys.add((user_id, month))
+
+    TimeCardSummary.objects.filter(id__in=delete_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('timecard', '0007_dailyattendance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timecard',
+            index=models.Index(fields=['user', 'stamped_time'], name='timecard_user_stamped_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timecard',
+            index=models.Index(fields=['user', 'kind', 'stamped_time'], name='timecard_user_kind_stamped_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timecard',
+            index=models.Index(fields=['stamped_time'], name='timecard_stamped_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timecard',
+            index=models.Index(condition=models.Q(state='1'), fields=['user', 'stamped_time'], name='timecard_processing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timecardsummary',
+            index=models.Index(fields=['month'], name='timecard_summary_month_idx'),
+        ),
+        migrations.RunPython(delete_duplicate_summaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timecardsummary',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='unique_timecard_summary_user_month'),
+        ),
+        migrations.AlterField(
+            model_name='dailyattendance',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー'),
+        ),
+        migrations.AlterField(
+            model_name='timecard',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='timecard', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー'),
+        ),
+        migrations.AlterField(
+            model_name='timecardsummary',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='timecardsummary', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー'),
+        ),
+    ]
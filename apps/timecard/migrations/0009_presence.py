@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 17:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('timecard', '0008_timecard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Presence',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='presence', serialize=False, to='accounts.user', verbose_name='ユーザー')),
+                ('date', models.DateField(verbose_name='対象日')),
+                ('state', models.CharField(choices=[('0', '未出勤'), ('1', '勤務中'), ('2', '退勤済み')], default='0', max_length=1, verbose_name='在席状況')),
+                ('start_work', models.DateTimeField(blank=True, null=True, verbose_name='出勤時刻')),
+                ('end_work', models.DateTimeField(blank=True, null=True, verbose_name='退勤時刻')),
+                ('last_stamped_time', models.DateTimeField(blank=True, null=True, verbose_name='最終打刻時刻')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='更新日時')),
+            ],
+            options={
+                'verbose_name': '在席状況',
+                'db_table': 'presence',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 17:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('timecard', '0009_presence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.CharField(max_length=6, verbose_name='対象月')),
+                ('work_seconds', models.PositiveIntegerField(default=0, verbose_name='労働時間（秒）')),
+                ('break_seconds', models.PositiveIntegerField(default=0, verbose_name='休憩時間（秒）')),
+                ('work_days_flag', models.PositiveIntegerField(default=0, verbose_name='出勤日フラグ')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='登録日時')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_attendance', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+            ],
+            options={
+                'verbose_name': '月次勤怠',
+                'db_table': 'monthly_attendance',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyattendance',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='unique_monthly_attendance_user_month'),
+        ),
+    ]
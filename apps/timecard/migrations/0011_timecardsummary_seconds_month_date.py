@@ -0,0 +1,128 @@
+# Generated by Django 3.2 on 2026-10-18 18:00
+
+from datetime import date
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+
+
+def iter_summary_chunks(TimeCardSummary):
+    # 大量のサマリを一度に読み込まないよう、ID順に一定件数ずつ処理する
+    last_id = 0
+    while True:
+        summaries = list(TimeCardSummary.objects.filter(id__gt=last_id).order_by('id')[:CHUNK_SIZE])
+        if not summaries:
+            return
+
+        yield summaries
+        last_id = summaries[-1].id
+
+
+def hours_str2seconds(hours_str):
+    try:
+        return round(float(hours_str) * 60 * 60)
+    except ValueError:
+        return 0
+
+
+def convert_to_seconds_and_date(apps, schema_editor):
+    TimeCardSummary = apps.get_model('timecard', 'TimeCardSummary')
+    for summaries in iter_summary_chunks(TimeCardSummary):
+        for summary in summaries:
+            summary.work_seconds = hours_str2seconds(summary.total_work_hours)
+            summary.break_seconds = hours_str2seconds(summary.total_break_hours)
+            summary.month_date = date(int(summary.month[:4]), int(summary.month[4:]), 1)
+
+        TimeCardSummary.objects.bulk_update(summaries, ['work_seconds', 'break_seconds', 'month_date'])
+
+
+def convert_to_hours_str(apps, schema_editor):
+    TimeCardSummary = apps.get_model('timecard', 'TimeCardSummary')
+    for summaries in iter_summary_chunks(TimeCardSummary):
+        for summary in summaries:
+            summary.total_work_hours = str(float('{:.2f}'.format(summary.work_seconds / (60 * 60))))
+            summary.total_break_hours = str(float('{:.2f}'.format(summary.break_seconds / (60 * 60))))
+            summary.month = summary.month_date.strftime('%Y%m')
+
+        TimeCardSummary.objects.bulk_update(summaries, ['total_work_hours', 'total_break_hours', 'month'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timecard', '0010_monthlyattendance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timecardsummary',
+            name='work_seconds',
+            field=models.PositiveIntegerField(default=0, verbose_name='総労働時間（秒）'),
+        ),
+        migrations.AddField(
+            model_name='timecardsummary',
+            name='break_seconds',
+            field=models.PositiveIntegerField(default=0, verbose_name='総休憩時間（秒）'),
+        ),
+        migrations.AddField(
+            model_name='timecardsummary',
+            name='month_date',
+            field=models.DateField(null=True, verbose_name='対象月'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='timecardsummary',
+            name='unique_timecard_summary_user_month',
+        ),
+        migrations.RemoveIndex(
+            model_name='timecardsummary',
+            name='timecard_summary_month_idx',
+        ),
+        migrations.RunPython(convert_to_seconds_and_date, convert_to_hours_str),
+        # 旧カラムの削除を戻す際に既存行へ値を入れられるよう、削除前に初期値を設定しておく
+        migrations.AlterField(
+            model_name='timecardsummary',
+            name='total_work_hours',
+            field=models.CharField(default='', max_length=10, verbose_name='総労働時間'),
+        ),
+        migrations.AlterField(
+            model_name='timecardsummary',
+            name='total_break_hours',
+            field=models.CharField(default='', max_length=10, verbose_name='総休暇時間'),
+        ),
+        migrations.AlterField(
+            model_name='timecardsummary',
+            name='month',
+            field=models.CharField(default='', max_length=6, verbose_name='対象月'),
+        ),
+        migrations.RemoveField(
+            model_name='timecardsummary',
+            name='total_work_hours',
+        ),
+        migrations.RemoveField(
+            model_name='timecardsummary',
+            name='total_break_hours',
+        ),
+        migrations.RemoveField(
+            model_name='timecardsummary',
+            name='month',
+        ),
+        migrations.RenameField(
+            model_name='timecardsummary',
+            old_name='month_date',
+            new_name='month',
+        ),
+        migrations.AlterField(
+            model_name='timecardsummary',
+            name='month',
+            field=models.DateField(verbose_name='対象月'),
+        ),
+        migrations.AddIndex(
+            model_name='timecardsummary',
+            index=models.Index(fields=['month'], name='timecard_summary_month_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timecardsummary',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='unique_timecard_summary_user_month'),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 3.2 on 2026-10-18 17:35
+
+from datetime import datetime, time
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+PROCESSING = '1'
+APPROVED = '2'
+
+
+def create_monthly_submissions(apps, schema_editor):
+    # 打刻ごとのステータスから月ごとの申請状況を作成する（承認済み＞申請中の順に優先）
+    TimeCard = apps.get_model('timecard', 'TimeCard')
+    MonthlySubmission = apps.get_model('timecard', 'MonthlySubmission')
+
+    submission_dict = {}
+    rows = (
+        TimeCard.objects.filter(state__in=[PROCESSING, APPROVED])
+        .annotate(month=TruncMonth('stamped_time'))
+        .values('user', 'month', 'state')
+        .annotate(last_updated_at=Max('updated_at'))
+        .order_by()
+    )
+    for row in rows.iterator():
+        key = (row['user'], row['month'].date())
+        submission = submission_dict.get(key)
+        if submission is None or submission.state < row['state']:
+            submission_dict[key] = MonthlySubmission(
+                user_id=row['user'],
+                month=row['month'].date(),
+                state=row['state'],
+                submitted_at=row['last_updated_at'],
+                approved_at=row['last_updated_at'] if row['state'] == APPROVED else None,
+            )
+
+    MonthlySubmission.objects.bulk_create(submission_dict.values(), batch_size=BATCH_SIZE)
+
+
+def restore_timecard_states(apps, schema_editor):
+    TimeCard = apps.get_model('timecard', 'TimeCard')
+    MonthlySubmission = apps.get_model('timecard', 'MonthlySubmission')
+
+    for submission in MonthlySubmission.objects.filter(state__in=[PROCESSING, APPROVED]).iterator():
+        BOM = timezone.make_aware(datetime.combine(submission.month, time()))
+        TimeCard.objects.filter(
+            user_id=submission.user_id, stamped_time__gte=BOM, stamped_time__lt=BOM + relativedelta(months=1)
+        ).update(state=submission.state)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('timecard', '0011_timecardsummary_seconds_month_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='対象月')),
+                ('state', models.CharField(choices=[('0', '新規'), ('1', '申請中'), ('2', '承認済み'), ('3', '修正依頼')], default='0', max_length=1, verbose_name='ステータス')),
+                ('submitted_at', models.DateTimeField(blank=True, null=True, verbose_name='申請日時')),
+                ('approved_at', models.DateTimeField(blank=True, null=True, verbose_name='承認日時')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='登録日時')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+            ],
+            options={
+                'verbose_name': '月次申請',
+                'db_table': 'monthly_submission',
+            },
+        ),
+        migrations.AddField(
+            model_name='monthlysubmission',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_submission', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlysubmission',
+            index=models.Index(fields=['state', 'month'], name='monthly_submission_state_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlysubmission',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='unique_monthly_submission_user_month'),
+        ),
+        migrations.RunPython(create_monthly_submissions, restore_timecard_states),
+        migrations.RemoveIndex(
+            model_name='timecard',
+            name='timecard_processing_idx',
+        ),
+        migrations.RemoveField(
+            model_name='timecard',
+            name='state',
+        ),
+    ]
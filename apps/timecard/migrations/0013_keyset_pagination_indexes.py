@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timecard', '0012_monthlysubmission'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='monthlysubmission',
+            name='monthly_submission_state_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='timecardsummary',
+            name='timecard_summary_month_idx',
+        ),
+        migrations.AddIndex(
+            model_name='monthlysubmission',
+            index=models.Index(fields=['state', 'month', 'user'], name='monthly_submission_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timecardsummary',
+            index=models.Index(fields=['month', 'work_seconds', 'user'], name='timecard_summary_work_idx'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 3.2 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+
+
+def rebuild_monthly_attendance(apps, schema_editor):
+    # 月次勤怠は日次勤怠から作成できるため、対象月を日付に変えるついでにユーザー単位で一定件数ずつ作成し直す
+    User = apps.get_model('accounts', 'User')
+    DailyAttendance = apps.get_model('timecard', 'DailyAttendance')
+    MonthlyAttendance = apps.get_model('timecard', 'MonthlyAttendance')
+
+    MonthlyAttendance.objects.all().delete()
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    for index in range(0, len(user_ids), CHUNK_SIZE):
+        totals_dict = {}
+        daily_attendances = (
+            DailyAttendance.objects.filter(user_id__in=user_ids[index : index + CHUNK_SIZE])
+            .order_by()
+            .values_list('user_id', 'date', 'work_seconds', 'break_seconds')
+        )
+        for user_id, target_date, work_seconds, break_seconds in daily_attendances.iterator():
+            month = target_date.replace(day=1)
+            totals = totals_dict.setdefault((user_id, month), [0, 0, 0])
+            totals[0] += work_seconds
+            totals[1] += break_seconds
+            totals[2] |= 1 << (target_date.day - 1)
+
+        MonthlyAttendance.objects.bulk_create(
+            [
+                MonthlyAttendance(
+                    user_id=user_id,
+                    month=month.strftime('%Y%m'),
+                    month_date=month,
+                    work_seconds=work_seconds,
+                    break_seconds=break_seconds,
+                    work_days_flag=work_days_flag,
+                )
+                for (user_id, month), (work_seconds, break_seconds, work_days_flag) in totals_dict.items()
+            ],
+            batch_size=CHUNK_SIZE,
+        )
+
+
+def convert_to_month_str(apps, schema_editor):
+    MonthlyAttendance = apps.get_model('timecard', 'MonthlyAttendance')
+    last_id = 0
+    while True:
+        monthly_attendances = list(MonthlyAttendance.objects.filter(id__gt=last_id).order_by('id')[:CHUNK_SIZE])
+        if not monthly_attendances:
+            return
+
+        for monthly_attendance in monthly_attendances:
+            monthly_attendance.month = monthly_attendance.month_date.strftime('%Y%m')
+
+        MonthlyAttendance.objects.bulk_update(monthly_attendances, ['month'])
+        last_id = monthly_attendances[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_email_pattern_index'),
+        ('timecard', '0013_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyattendance',
+            name='month_date',
+            field=models.DateField(null=True, verbose_name='対象月'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='monthlyattendance',
+            name='unique_monthly_attendance_user_month',
+        ),
+        migrations.RunPython(rebuild_monthly_attendance, convert_to_month_str),
+        # 旧カラムの削除を戻す際に既存行へ値を入れられるよう、削除前に初期値を設定しておく
+        migrations.AlterField(
+            model_name='monthlyattendance',
+            name='month',
+            field=models.CharField(default='', max_length=6, verbose_name='対象月'),
+        ),
+        migrations.RemoveField(
+            model_name='monthlyattendance',
+            name='month',
+        ),
+        migrations.RenameField(
+            model_name='monthlyattendance',
+            old_name='month_date',
+            new_name='month',
+        ),
+        migrations.AlterField(
+            model_name='monthlyattendance',
+            name='month',
+            field=models.DateField(verbose_name='対象月'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyattendance',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='unique_monthly_attendance_user_month'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 3.2 on 2026-10-18 19:40
+
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+CHUNK_SIZE = 1000
+
+KIND_FIELD = {
+    '0': 'start_work',
+    '1': 'end_work',
+    '5': 'enter_break',
+    '6': 'end_break',
+}
+
+
+def calculate_seconds(attendance):
+    work_hours = break_hours = timedelta()
+    if attendance.start_work and attendance.end_work and attendance.start_work < attendance.end_work:
+        work_hours = attendance.end_work - attendance.start_work
+
+    if attendance.enter_break and attendance.end_break and attendance.enter_break < attendance.end_break:
+        break_hours = attendance.end_break - attendance.enter_break
+
+    if break_hours > timedelta() and work_hours > break_hours:
+        work_hours -= break_hours
+
+    attendance.work_seconds = int(work_hours.total_seconds())
+    attendance.break_seconds = int(break_hours.total_seconds())
+
+
+def rebuild_attendance(apps, schema_editor):
+    # 日次勤怠の追加前の打刻は集計されていないため、打刻から日次勤怠・月次勤怠をユーザー単位で一定件数ずつ作成し直す
+    User = apps.get_model('accounts', 'User')
+    TimeCard = apps.get_model('timecard', 'TimeCard')
+    DailyAttendance = apps.get_model('timecard', 'DailyAttendance')
+    MonthlyAttendance = apps.get_model('timecard', 'MonthlyAttendance')
+
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    for index in range(0, len(user_ids), CHUNK_SIZE):
+        chunk_user_ids = user_ids[index : index + CHUNK_SIZE]
+
+        attendance_dict = {}
+        stamps = (
+            TimeCard.objects.filter(user_id__in=chunk_user_ids)
+            .order_by('stamped_time')
+            .values_list('user_id', 'kind', 'stamped_time')
+        )
+        for user_id, kind, stamped_time in stamps.iterator():
+            key = (user_id, timezone.localdate(stamped_time))
+            attendance = attendance_dict.get(key)
+            if attendance is None:
+                attendance = attendance_dict[key] = DailyAttendance(user_id=user_id, date=key[1])
+
+            field = KIND_FIELD.get(kind)
+            if field and getattr(attendance, field) is None:
+                setattr(attendance, field, stamped_time)
+
+        totals_dict = {}
+        for (user_id, target_date), attendance in attendance_dict.items():
+            calculate_seconds(attendance)
+            totals = totals_dict.setdefault((user_id, target_date.replace(day=1)), [0, 0, 0])
+            totals[0] += attendance.work_seconds
+            totals[1] += attendance.break_seconds
+            totals[2] |= 1 << (target_date.day - 1)
+
+        DailyAttendance.objects.filter(user_id__in=chunk_user_ids).delete()
+        DailyAttendance.objects.bulk_create(attendance_dict.values(), batch_size=CHUNK_SIZE)
+        MonthlyAttendance.objects.filter(user_id__in=chunk_user_ids).delete()
+        MonthlyAttendance.objects.bulk_create(
+            [
+                MonthlyAttendance(
+                    user_id=user_id,
+                    month=month,
+                    work_seconds=work_seconds,
+                    break_seconds=break_seconds,
+                    work_days_flag=work_days_flag,
+                )
+                for (user_id, month), (work_seconds, break_seconds, work_days_flag) in totals_dict.items()
+            ],
+            batch_size=CHUNK_SIZE,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_email_pattern_index'),
+        ('timecard', '0014_monthlyattendance_month_date'),
+    ]
+
+    operations = [
+        # 日次勤怠は打刻から作り直せるため、戻す場合は何もしない
+        migrations.RunPython(rebuild_attendance, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,67 @@
-from django.db import models
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from dateutil.relativedelta import relativedelta
+from django.db import IntegrityError, models, transaction
+from django.db.models import (Avg, Case, Count, F, Max, OuterRef, Q, Subquery,
+                              Sum, Value, When)
+from django.db.models.functions import (Coalesce, ExtractDay, Greatest,
+                                        TruncMonth)
 from django.utils import timezone
 
 from apps.accounts.models import User
 
 
+class TimeCardQuerySet(models.QuerySet):
+    # 日次勤怠に影響する項目
+    ATTENDANCE_FIELDS = {"user", "user_id", "kind", "stamped_time"}
+
+    def update(self, **kwargs):
+        if not self.ATTENDANCE_FIELDS & kwargs.keys():
+            return super().update(**kwargs)
+
+        with transaction.atomic(), DailyAttendance.objects.bulk_refresh():
+            DailyAttendance.objects.request_refresh(self._get_attendance_keys())
+            stamp_ids = list(self.values_list("id", flat=True))
+            rows = super().update(**kwargs)
+            DailyAttendance.objects.request_refresh(TimeCard.objects.filter(id__in=stamp_ids)._get_attendance_keys())
+
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic():
+            objs = super().bulk_create(objs, *args, **kwargs)
+            DailyAttendance.objects.request_refresh(
+                {(obj.user_id, timezone.localdate(obj.stamped_time)) for obj in objs}
+            )
+
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if not self.ATTENDANCE_FIELDS & set(fields):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+        with transaction.atomic(), DailyAttendance.objects.bulk_refresh():
+            DailyAttendance.objects.request_refresh(
+                TimeCard.objects.filter(id__in=[obj.id for obj in objs])._get_attendance_keys()
+            )
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            DailyAttendance.objects.request_refresh(
+                {(obj.user_id, timezone.localdate(obj.stamped_time)) for obj in objs}
+            )
+
+        return rows
+
+    def _get_attendance_keys(self):
+        return {
+            (user_id, timezone.localdate(stamped_time))
+            for user_id, stamped_time in self.order_by().values_list("user", "stamped_time")
+        }
+
+
 class TimeCard(models.Model):
     class Kind(models.TextChoices):
         IN = "0", "出勤"
@@ -14,44 +72,601 @@ class TimeCard(models.Model):
         ENTER_BREAK = "5", "休憩開始"
         END_BREAK = "6", "休憩終了"
 
+    # ユーザーの検索は複合インデックスの先頭列で行うため、外部キー単体のインデックスは作成しない
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="timecard", verbose_name="ユーザー", db_index=False
+    )
+    kind = models.CharField(verbose_name="打刻区分", max_length=1, choices=Kind.choices)
+    stamped_time = models.DateTimeField(verbose_name="打刻時刻", default=timezone.now)
+
+    created_at = models.DateTimeField(verbose_name="登録日時", auto_now_add=True)
+    updated_at = models.DateTimeField(verbose_name="更新日時", auto_now=True)
+
+    objects = TimeCardQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # 打刻の保存と、シグナルで行う日次・月次勤怠の再集計を同じトランザクションで行う
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    class Meta:
+        db_table = "timecard"
+        verbose_name = "タイムカード"
+        indexes = [
+            models.Index(fields=["user", "stamped_time"], name="timecard_user_stamped_idx"),
+            models.Index(fields=["user", "kind", "stamped_time"], name="timecard_user_kind_stamped_idx"),
+            models.Index(fields=["stamped_time"], name="timecard_stamped_idx"),
+        ]
+
+
+class MonthlySubmissionManager(models.Manager):
+    # 状態の確認・遷移はいずれも(ユーザー, 対象月)の1行のみを読み書きする
+    def get_state(self, user, month):
+        state = self.filter(user=user, month=month).values_list("state", flat=True).first()
+        return state or MonthlySubmission.State.NEW
+
+    def promote(self, user, month) -> bool:
+        now = timezone.now()
+        if self.filter(user=user, month=month, state=MonthlySubmission.State.NEW).update(
+            state=MonthlySubmission.State.PROCESSING, submitted_at=now, updated_at=now
+        ):
+            return True
+
+        try:
+            with transaction.atomic():
+                self.create(user=user, month=month, state=MonthlySubmission.State.PROCESSING, submitted_at=now)
+        except IntegrityError:
+            # すでに申請済み・承認済みの行がある
+            return False
+
+        return True
+
+    def approve(self, user, month) -> bool:
+        now = timezone.now()
+        return bool(
+            self.filter(user=user, month=month, state=MonthlySubmission.State.PROCESSING).update(
+                state=MonthlySubmission.State.APPROVED, approved_at=now, updated_at=now
+            )
+        )
+
+    def demote(self, user, month) -> bool:
+        return bool(
+            self.filter(user=user, month=month, state=MonthlySubmission.State.PROCESSING).update(
+                state=MonthlySubmission.State.NEW, submitted_at=None, updated_at=timezone.now()
+            )
+        )
+
+
+class MonthlySubmission(models.Model):
     class State(models.TextChoices):
         NEW = "0", "新規"
         PROCESSING = "1", "申請中"
         APPROVED = "2", "承認済み"
         REVISION_REQUEST = "3", "修正依頼"
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timecard", verbose_name="ユーザー")
-    kind = models.CharField(verbose_name="打刻区分", max_length=1, choices=Kind.choices)
-    stamped_time = models.DateTimeField(verbose_name="打刻時刻", default=timezone.now)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="monthly_submission", verbose_name="ユーザー", db_index=False
+    )
+    month = models.DateField(verbose_name="対象月")
     state = models.CharField(verbose_name="ステータス", max_length=1, choices=State.choices, default=State.NEW)
-
+    submitted_at = models.DateTimeField(verbose_name="申請日時", null=True, blank=True)
+    approved_at = models.DateTimeField(verbose_name="承認日時", null=True, blank=True)
     created_at = models.DateTimeField(verbose_name="登録日時", auto_now_add=True)
     updated_at = models.DateTimeField(verbose_name="更新日時", auto_now=True)
 
+    objects = MonthlySubmissionManager()
+
     class Meta:
-        db_table = "timecard"
-        verbose_name = "タイムカード"
+        db_table = "monthly_submission"
+        verbose_name = "月次申請"
+        # 申請一覧はステータスで絞り込み、(month, user)順にページングする
+        indexes = [models.Index(fields=["state", "month", "user"], name="monthly_submission_state_idx")]
+        constraints = [models.UniqueConstraint(fields=["user", "month"], name="unique_monthly_submission_user_month")]
+
+
+def seconds2hours_str(seconds) -> str:
+    return str(float("{:.2f}".format(seconds / (60 * 60))))
+
+
+def get_work_days_mask(first_day=1, last_day=31) -> int:
+    # first_day〜last_day日のビットが立ったマスク（1日目が最下位ビット）
+    return (1 << last_day) - (1 << (first_day - 1))
+
+
+class BitCount(models.Func):
+    # 出勤日フラグ（31ビット以内の整数）の立っているビット数
+    output_field = models.IntegerField()
+    BIT_LENGTH = 31
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # bit_countはDBによって有無や対応する型が異なるため、各ビットを取り出して合計する
+        sql, params = compiler.compile(self.get_source_expressions()[0])
+        bits_sql = " + ".join("(({}) >> {} & 1)".format(sql, bit_index) for bit_index in range(self.BIT_LENGTH))
+        return "(" + bits_sql + ")", list(params) * self.BIT_LENGTH
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # bit_countはPostgreSQL 14以降のため、bit型の文字列表現に含まれる1の数を数える
+        return super().as_sql(
+            compiler,
+            connection,
+            template="length(replace((%(expressions)s)::bit(32)::text, '0', ''))",
+            **extra_context,
+        )
+
+
+class TimeCardSummaryQuerySet(models.QuerySet):
+    # 1日8時間を超えた労働時間を残業時間とする
+    STANDARD_DAILY_SECONDS = 8 * 60 * 60
+
+    def with_overtime(self):
+        overtime_qs = (
+            DailyAttendance.objects.filter(user=OuterRef("user"))
+            .annotate(month=TruncMonth("date"))
+            .filter(month=OuterRef("month"))
+            .values("user")
+            .annotate(
+                overtime_seconds=Sum(
+                    Greatest(F("work_seconds") - self.STANDARD_DAILY_SECONDS, Value(0)),
+                )
+            )
+            .values("overtime_seconds")
+        )
+        return self.annotate(
+            overtime_seconds=Coalesce(Subquery(overtime_qs, output_field=models.IntegerField()), Value(0))
+        )
+
+    def org_totals(self):
+        # 対象のサマリ全体の合計・平均をDB側で集計する
+        return self.aggregate(
+            headcount=Count("user", distinct=True),
+            total_work_seconds=Coalesce(Sum("work_seconds"), Value(0)),
+            avg_work_seconds=Coalesce(Avg("work_seconds"), Value(0.0)),
+            max_work_seconds=Coalesce(Max("work_seconds"), Value(0)),
+            total_break_seconds=Coalesce(Sum("break_seconds"), Value(0)),
+        )
+
+    def top_overtime(self, count):
+        return self.with_overtime().filter(overtime_seconds__gt=0).order_by("-overtime_seconds", "user")[:count]
+
+    # 以下は出勤日フラグのビット演算のみで判定し、打刻テーブルは参照しない
+    def with_work_days(self):
+        return self.annotate(work_days=BitCount("work_days_flag"))
+
+    def worked_on(self, day):
+        return self.alias(worked_flag=F("work_days_flag").bitand(1 << (day - 1))).filter(worked_flag__gt=0)
+
+    def work_days_lt(self, count):
+        return self.with_work_days().filter(work_days__lt=count)
+
+    def work_days_in_range(self, start_date, end_date):
+        # 期間の開始月・終了月は期間外の日のビットを落としてから数える
+        start_month = start_date.replace(day=1)
+        end_month = end_date.replace(day=1)
+        if start_month == end_month:
+            masks = [When(month=start_month, then=get_work_days_mask(start_date.day, end_date.day))]
+        else:
+            masks = [
+                When(month=start_month, then=get_work_days_mask(first_day=start_date.day)),
+                When(month=end_month, then=get_work_days_mask(last_day=end_date.day)),
+            ]
+        mask = Case(*masks, default=get_work_days_mask(), output_field=models.IntegerField())
+
+        return (
+            self.filter(month__gte=start_month, month__lte=end_month)
+            .values("user")
+            .annotate(work_days=Sum(BitCount(F("work_days_flag").bitand(mask))))
+            .order_by("user")
+        )
 
 
 class TimeCardSummary(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timecardsummary", verbose_name="ユーザー")
-    total_work_hours = models.CharField(verbose_name="総労働時間", max_length=10)
-    total_break_hours = models.CharField(verbose_name="総休暇時間", max_length=10)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="timecardsummary", verbose_name="ユーザー", db_index=False
+    )
+    work_seconds = models.PositiveIntegerField(verbose_name="総労働時間（秒）", default=0)
+    break_seconds = models.PositiveIntegerField(verbose_name="総休憩時間（秒）", default=0)
     work_days_flag = models.PositiveIntegerField(verbose_name="出勤日フラグ")
-    month = models.CharField(verbose_name="対象月", max_length=6)
+    month = models.DateField(verbose_name="対象月")
     created_at = models.DateTimeField(verbose_name="登録日時", auto_now_add=True)
     updated_at = models.DateTimeField(verbose_name="更新日時", auto_now=True)
 
+    objects = TimeCardSummaryQuerySet.as_manager()
+
     @property
-    def work_days_count(self):
-        count = 0
-        work_days_bin = format(self.work_days_flag, "b")
-        for bit_index in range(len(work_days_bin)):
-            if self.work_days_flag & (1 << bit_index):
-                count += 1
+    def total_work_hours(self):
+        return seconds2hours_str(self.work_seconds)
 
-        return count
+    @property
+    def total_break_hours(self):
+        return seconds2hours_str(self.break_seconds)
+
+    @property
+    def work_days_count(self):
+        return bin(self.work_days_flag).count("1")
 
     class Meta:
         db_table = "timecard_summary"
         verbose_name = "サマリ"
+        # 承認済み一覧は対象月で絞り込み、総勤務時間順にページングする
+        indexes = [models.Index(fields=["month", "work_seconds", "user"], name="timecard_summary_work_idx")]
+        constraints = [models.UniqueConstraint(fields=["user", "month"], name="unique_timecard_summary_user_month")]
+
+
+class DailyAttendanceManager(models.Manager):
+    KIND_FIELD = {
+        TimeCard.Kind.IN: "start_work",
+        TimeCard.Kind.OUT: "end_work",
+        TimeCard.Kind.ENTER_BREAK: "enter_break",
+        TimeCard.Kind.END_BREAK: "end_break",
+    }
+    UPDATE_FIELDS = [
+        "start_work",
+        "end_work",
+        "enter_break",
+        "end_break",
+        "work_seconds",
+        "break_seconds",
+        "updated_at",
+    ]
+    BATCH_SIZE = 1000
+
+    _local = threading.local()
+
+    @contextmanager
+    def bulk_refresh(self):
+        # ブロック内で発生した再集計をまとめ、ブロックを抜けた時に1回で再集計する
+        if getattr(self._local, "pending_keys", None) is not None:
+            yield
+            return
+
+        # 打刻の更新と再集計を同じトランザクションで行う
+        with transaction.atomic():
+            self._local.pending_keys = set()
+            try:
+                yield
+                pending_keys = self._local.pending_keys
+            finally:
+                self._local.pending_keys = None
+
+            self.refresh(pending_keys)
+
+    def begin_user_delete(self, user_id):
+        # 削除するユーザーの打刻はカスケードで削除されるため、再集計で月次勤怠・在席状況を作り直さない
+        self._get_deleting_user_ids().add(user_id)
+
+    def end_user_delete(self, user_id):
+        self._get_deleting_user_ids().discard(user_id)
+
+    def filter_existing_user_ids(self, user_ids):
+        user_ids = set(user_ids) - self._get_deleting_user_ids()
+        if not user_ids:
+            return set()
+
+        return set(User.objects.filter(id__in=user_ids).values_list("id", flat=True))
+
+    def _get_deleting_user_ids(self):
+        if not hasattr(self._local, "deleting_user_ids"):
+            self._local.deleting_user_ids = set()
+
+        return self._local.deleting_user_ids
+
+    def request_refresh(self, keys):
+        pending_keys = getattr(self._local, "pending_keys", None)
+        if pending_keys is None:
+            return self.refresh(keys)
+
+        pending_keys.update(keys)
+
+    def refresh(self, keys):
+        # keys: (ユーザーID, 日付)の集合
+        user_ids = self.filter_existing_user_ids(user_id for user_id, _ in keys)
+        keys = {(user_id, date) for user_id, date in keys if user_id in user_ids}
+        if not keys:
+            return
+
+        with transaction.atomic():
+            # 同じユーザー・月の再集計が同時に行われないよう、打刻を読み込む前に月次勤怠の行をロックする
+            monthly_attendances = MonthlyAttendance.objects.lock(
+                {(user_id, date.replace(day=1)) for user_id, date in keys}
+            )
+
+            stamps_q = Q()
+            attendance_q = Q()
+            for user_id, user_keys in groupby(sorted(keys), key=itemgetter(0)):
+                dates = [date for _, date in user_keys]
+                stamps_q |= Q(
+                    user_id=user_id,
+                    stamped_time__gte=self._start_of_day(dates[0]),
+                    stamped_time__lt=self._start_of_day(dates[-1] + timedelta(days=1)),
+                )
+                attendance_q |= Q(user_id=user_id, date__in=dates)
+
+            new_attendance_dict = self._build(TimeCard.objects.filter(stamps_q), keys)
+            update_attendances = []
+            delete_attendance_ids = []
+            for attendance in self.select_for_update().filter(attendance_q):
+                new_attendance = new_attendance_dict.pop((attendance.user_id, attendance.date), None)
+                if new_attendance is None:
+                    delete_attendance_ids.append(attendance.id)
+                elif attendance.copy_from(new_attendance):
+                    update_attendances.append(attendance)
+
+            self.filter(id__in=delete_attendance_ids).delete()
+            self.bulk_update(update_attendances, self.UPDATE_FIELDS, batch_size=self.BATCH_SIZE)
+            self.bulk_create(new_attendance_dict.values(), batch_size=self.BATCH_SIZE)
+            MonthlyAttendance.objects.refresh(monthly_attendances)
+
+            # 当日の打刻が変わったユーザーは在席状況も更新する
+            today = timezone.localdate()
+            Presence.objects.refresh({user_id for user_id, date in keys if date == today}, today)
+
+    def rebuild(self, user_ids):
+        self.filter(user_id__in=user_ids).delete()
+        attendance_dict = self._build(TimeCard.objects.filter(user_id__in=user_ids))
+        self.bulk_create(attendance_dict.values(), batch_size=self.BATCH_SIZE)
+        MonthlyAttendance.objects.rebuild(user_ids)
+        Presence.objects.refresh(set(user_ids), timezone.localdate())
+        return len(attendance_dict)
+
+    def monthly_totals(self, condition):
+        # 1日1行のため、各日のビットの合計が出勤日フラグになる
+        return (
+            self.filter(condition)
+            .annotate(month=TruncMonth("date"))
+            .values("user", "month")
+            .annotate(
+                total_work_seconds=Sum("work_seconds"),
+                total_break_seconds=Sum("break_seconds"),
+                total_work_days_flag=Sum(Value(1).bitleftshift(ExtractDay("date") - 1)),
+            )
+            .order_by("user", "month")
+        )
+
+    def _build(self, stamps_qs, keys=None):
+        attendance_dict = {}
+        stamps = stamps_qs.order_by("stamped_time").values_list("user", "kind", "stamped_time")
+        for user_id, kind, stamped_time in stamps.iterator():
+            key = (user_id, timezone.localdate(stamped_time))
+            if keys is not None and key not in keys:
+                continue
+
+            attendance = attendance_dict.get(key)
+            if attendance is None:
+                attendance = attendance_dict[key] = self.model(user_id=user_id, date=key[1])
+
+            field = self.KIND_FIELD.get(kind)
+            if field and getattr(attendance, field) is None:
+                setattr(attendance, field, stamped_time)
+
+        for attendance in attendance_dict.values():
+            attendance.calculate_seconds()
+
+        return attendance_dict
+
+    def _start_of_day(self, date):
+        return timezone.make_aware(datetime.combine(date, time.min))
+
+
+class DailyAttendance(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="daily_attendance", verbose_name="ユーザー", db_index=False
+    )
+    date = models.DateField(verbose_name="対象日")
+    start_work = models.DateTimeField(verbose_name="出勤時刻", null=True, blank=True)
+    end_work = models.DateTimeField(verbose_name="退勤時刻", null=True, blank=True)
+    enter_break = models.DateTimeField(verbose_name="休憩開始時刻", null=True, blank=True)
+    end_break = models.DateTimeField(verbose_name="休憩終了時刻", null=True, blank=True)
+    work_seconds = models.PositiveIntegerField(verbose_name="労働時間（秒）", default=0)
+    break_seconds = models.PositiveIntegerField(verbose_name="休憩時間（秒）", default=0)
+    created_at = models.DateTimeField(verbose_name="登録日時", auto_now_add=True)
+    updated_at = models.DateTimeField(verbose_name="更新日時", auto_now=True)
+
+    objects = DailyAttendanceManager()
+
+    def calculate_seconds(self):
+        work_hours = break_hours = timedelta()
+        if self.start_work and self.end_work and self.start_work < self.end_work:
+            work_hours = self.end_work - self.start_work
+
+        if self.enter_break and self.end_break and self.enter_break < self.end_break:
+            break_hours = self.end_break - self.enter_break
+
+        if break_hours > timedelta() and work_hours > break_hours:
+            work_hours -= break_hours
+
+        self.work_seconds = int(work_hours.total_seconds())
+        self.break_seconds = int(break_hours.total_seconds())
+
+    def copy_from(self, attendance):
+        changed = False
+        for field in DailyAttendanceManager.UPDATE_FIELDS[:-1]:
+            if getattr(self, field) != getattr(attendance, field):
+                setattr(self, field, getattr(attendance, field))
+                changed = True
+
+        if changed:
+            self.updated_at = timezone.now()
+
+        return changed
+
+    @property
+    def work_hours(self):
+        return timedelta(seconds=self.work_seconds)
+
+    @property
+    def break_hours(self):
+        return timedelta(seconds=self.break_seconds)
+
+    class Meta:
+        db_table = "daily_attendance"
+        verbose_name = "日次勤怠"
+        constraints = [models.UniqueConstraint(fields=["user", "date"], name="unique_daily_attendance_user_date")]
+
+
+class MonthlyAttendanceManager(models.Manager):
+    def lock(self, month_keys):
+        # month_keys: (ユーザーID, 対象月の1日)の集合
+        # 行がない月は先に作成し、デッドロックしないよう常に同じ順序でロックする
+        month_keys = sorted(month_keys)
+        self.bulk_create(
+            [self.model(user_id=user_id, month=month) for user_id, month in month_keys], ignore_conflicts=True
+        )
+
+        condition = Q(pk__in=[])
+        for user_id, month in month_keys:
+            condition |= Q(user_id=user_id, month=month)
+
+        return list(self.select_for_update().filter(condition).order_by("user", "month"))
+
+    def refresh(self, monthly_attendances):
+        # 差分を積み上げず、日次勤怠から対象月を集計し直す
+        condition = Q(pk__in=[])
+        for monthly_attendance in monthly_attendances:
+            condition |= Q(
+                user_id=monthly_attendance.user_id,
+                date__gte=monthly_attendance.month,
+                date__lt=monthly_attendance.month + relativedelta(months=1),
+            )
+
+        totals_dict = {
+            (totals["user"], totals["month"]): totals for totals in DailyAttendance.objects.monthly_totals(condition)
+        }
+        now = timezone.now()
+        for monthly_attendance in monthly_attendances:
+            totals = totals_dict.get((monthly_attendance.user_id, monthly_attendance.month), {})
+            monthly_attendance.work_seconds = totals.get("total_work_seconds", 0)
+            monthly_attendance.break_seconds = totals.get("total_break_seconds", 0)
+            monthly_attendance.work_days_flag = totals.get("total_work_days_flag", 0)
+            monthly_attendance.updated_at = now
+
+        self.bulk_update(
+            monthly_attendances,
+            ["work_seconds", "break_seconds", "work_days_flag", "updated_at"],
+            batch_size=DailyAttendanceManager.BATCH_SIZE,
+        )
+
+    def rebuild(self, user_ids):
+        self.filter(user_id__in=user_ids).delete()
+        self.bulk_create(
+            [
+                self.model(
+                    user_id=totals["user"],
+                    month=totals["month"],
+                    work_seconds=totals["total_work_seconds"],
+                    break_seconds=totals["total_break_seconds"],
+                    work_days_flag=totals["total_work_days_flag"],
+                )
+                for totals in DailyAttendance.objects.monthly_totals(Q(user_id__in=user_ids))
+            ],
+            batch_size=DailyAttendanceManager.BATCH_SIZE,
+        )
+
+
+class MonthlyAttendance(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="monthly_attendance", verbose_name="ユーザー", db_index=False
+    )
+    month = models.DateField(verbose_name="対象月")
+    work_seconds = models.PositiveIntegerField(verbose_name="労働時間（秒）", default=0)
+    break_seconds = models.PositiveIntegerField(verbose_name="休憩時間（秒）", default=0)
+    work_days_flag = models.PositiveIntegerField(verbose_name="出勤日フラグ", default=0)
+    created_at = models.DateTimeField(verbose_name="登録日時", auto_now_add=True)
+    updated_at = models.DateTimeField(verbose_name="更新日時", auto_now=True)
+
+    objects = MonthlyAttendanceManager()
+
+    @property
+    def work_hours(self):
+        return timedelta(seconds=self.work_seconds)
+
+    @property
+    def break_hours(self):
+        return timedelta(seconds=self.break_seconds)
+
+    @property
+    def work_days(self):
+        return [bit_index + 1 for bit_index in range(31) if self.work_days_flag & (1 << bit_index)]
+
+    class Meta:
+        db_table = "monthly_attendance"
+        verbose_name = "月次勤怠"
+        constraints = [models.UniqueConstraint(fields=["user", "month"], name="unique_monthly_attendance_user_month")]
+
+
+class PresenceManager(models.Manager):
+    def refresh(self, user_ids, date):
+        # 削除済み・削除中のユーザーの在席状況は作成しない
+        user_ids = DailyAttendance.objects.filter_existing_user_ids(user_ids)
+        if not user_ids:
+            return
+
+        start_of_day = timezone.make_aware(datetime.combine(date, time.min))
+        stamps = (
+            TimeCard.objects.filter(
+                user__in=user_ids, stamped_time__gte=start_of_day, stamped_time__lt=start_of_day + timedelta(days=1)
+            )
+            .order_by("stamped_time")
+            .values_list("user", "kind", "stamped_time")
+        )
+
+        now = timezone.now()
+        presence_dict = self.in_bulk(user_ids)
+        new_presences = []
+        for user_id in user_ids:
+            presence = presence_dict.get(user_id)
+            if presence is None:
+                presence = self.model(user_id=user_id)
+                new_presences.append(presence)
+
+            presence.date = date
+            presence.state = Presence.State.ABSENT
+            presence.start_work = presence.end_work = presence.last_stamped_time = None
+            presence.updated_at = now
+
+        presences = {presence.user_id: presence for presence in [*presence_dict.values(), *new_presences]}
+        for user_id, kind, stamped_time in stamps:
+            presences[user_id].add_stamp(kind, stamped_time)
+
+        with transaction.atomic():
+            self.bulk_update(presence_dict.values(), Presence.UPDATE_FIELDS)
+            self.bulk_create(new_presences)
+
+    def get_version(self):
+        # 在席状況のいずれかが更新されると変わる値
+        return self.aggregate(updated_at=models.Max("updated_at"), count=models.Count("pk"))
+
+
+class Presence(models.Model):
+    class State(models.TextChoices):
+        ABSENT = "0", "未出勤"
+        AT_WORK = "1", "勤務中"
+        LEFT = "2", "退勤済み"
+
+    UPDATE_FIELDS = ["date", "state", "start_work", "end_work", "last_stamped_time", "updated_at"]
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="presence", verbose_name="ユーザー"
+    )
+    date = models.DateField(verbose_name="対象日")
+    state = models.CharField(verbose_name="在席状況", max_length=1, choices=State.choices, default=State.ABSENT)
+    start_work = models.DateTimeField(verbose_name="出勤時刻", null=True, blank=True)
+    end_work = models.DateTimeField(verbose_name="退勤時刻", null=True, blank=True)
+    last_stamped_time = models.DateTimeField(verbose_name="最終打刻時刻", null=True, blank=True)
+    updated_at = models.DateTimeField(verbose_name="更新日時", auto_now=True, db_index=True)
+
+    objects = PresenceManager()
+
+    def add_stamp(self, kind, stamped_time):
+        # 出勤は最初の打刻、退勤は最後の打刻を保持する
+        if kind == TimeCard.Kind.IN:
+            self.start_work = self.start_work or stamped_time
+            self.state = Presence.State.AT_WORK
+        elif kind == TimeCard.Kind.OUT:
+            self.end_work = stamped_time
+            self.state = Presence.State.LEFT
+
+        self.last_stamped_time = stamped_time
+
+    class Meta:
+        db_table = "presence"
+        verbose_name = "在席状況"
@@ -0,0 +1,49 @@
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+import jpholiday
+from dateutil.relativedelta import relativedelta
+from django.utils import timezone
+
+DOW_LABELS = ["月", "火", "水", "木", "金", "土", "日"]
+
+# 前後12ヶ月分を保持できるサイズ
+CACHE_SIZE = 64
+WARM_UP_MONTHS = 12
+
+CalendarDay = namedtuple("CalendarDay", ["date", "DOW", "day_kind", "holiday_name"])
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_month_calendar(year, month) -> tuple:
+    # 対象月の日付・曜日・区分・祝日名を1日から末日まで並べたタプルを返す
+    holiday_dict = dict(jpholiday.month_holidays(year, month))
+
+    month_calendar = []
+    target_date = date(year, month, 1)
+    while target_date.month == month:
+        DOW = DOW_LABELS[target_date.weekday()]
+        holiday_name = holiday_dict.get(target_date)
+        if holiday_name:
+            day_kind = "祝日"
+        elif target_date.weekday() >= 5:
+            day_kind = "休日"
+        else:
+            day_kind = "平日"
+
+        month_calendar.append(CalendarDay(target_date, DOW, day_kind, holiday_name))
+        target_date += relativedelta(days=1)
+
+    return tuple(month_calendar)
+
+
+def get_calendar_day(target_date) -> CalendarDay:
+    return get_month_calendar(target_date.year, target_date.month)[target_date.day - 1]
+
+
+def warm_up(months=WARM_UP_MONTHS):
+    today = timezone.localdate()
+    for month_index in range(-months, months + 1):
+        target_date = today + relativedelta(months=month_index)
+        get_month_calendar(target_date.year, target_date.month)
@@ -0,0 +1,48 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.timecard.models import DailyAttendance, TimeCard
+
+
+def get_attendance_key(stamp):
+    return stamp.user_id, timezone.localdate(stamp.stamped_time)
+
+
+@receiver(pre_save, sender=TimeCard)
+def keep_old_attendance_key(sender, instance, raw, **kwargs):
+    # 打刻日時・ユーザーの変更で集計対象から外れる日も再集計するため、変更前の値を保持する
+    instance._old_attendance_key = None
+    if raw or instance.pk is None:
+        return
+
+    old_stamp = TimeCard.objects.filter(pk=instance.pk).only("user", "stamped_time").first()
+    if old_stamp:
+        instance._old_attendance_key = get_attendance_key(old_stamp)
+
+
+@receiver(post_save, sender=TimeCard)
+def refresh_daily_attendance_on_save(sender, instance, **kwargs):
+    keys = {get_attendance_key(instance)}
+    if getattr(instance, "_old_attendance_key", None):
+        keys.add(instance._old_attendance_key)
+
+    DailyAttendance.objects.request_refresh(keys)
+
+
+@receiver(post_delete, sender=TimeCard)
+def refresh_daily_attendance_on_delete(sender, instance, **kwargs):
+    DailyAttendance.objects.request_refresh({get_attendance_key(instance)})
+
+
+@receiver(pre_delete, sender=User)
+def begin_user_delete(sender, instance, **kwargs):
+    # 削除の前に全インスタンスのpre_deleteが送られ、打刻のpost_deleteはユーザーの行を削除する前に送られる
+    DailyAttendance.objects.begin_user_delete(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def end_user_delete(sender, instance, **kwargs):
+    DailyAttendance.objects.end_user_delete(instance.pk)
@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.contrib.messages import get_messages
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -60,6 +61,13 @@ class BaseTestCase(TestCase):
     def str2datetime(self, datetime_str, format="%Y/%m/%d %H:%M:%S"):
         return timezone.datetime.strptime(datetime_str, format).astimezone(timezone.get_default_timezone())
 
+    def get_toast_msg(self, response):
+        return {
+            message.level_tag: message.message
+            for message in get_messages(response.wsgi_request)
+            if not message.extra_tags
+        }
+
 
 class BaseTestCaseNeedSuperUser(BaseTestCase):
     def setUp(self):
@@ -0,0 +1,6 @@
+from .test_daily_attendance import TestDailyAttendance
+from .test_indexes import TestIndexes
+from .test_monthly_submission import TestMonthlySubmission
+from .test_timecard_summary import TestTimeCardSummary
+
+__all__ = ["TestDailyAttendance", "TestIndexes", "TestMonthlySubmission", "TestTimeCardSummary"]
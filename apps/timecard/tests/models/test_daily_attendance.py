@@ -0,0 +1,182 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+
+from apps.accounts.models import User
+from apps.timecard.models import DailyAttendance, MonthlyAttendance, TimeCard
+
+from ..base import BaseTestCase
+
+
+class TestDailyAttendance(BaseTestCase):
+    def test_create_by_stamps(self):
+        """
+        打刻を登録する
+        日次勤怠が1日1件作成され、労働時間・休憩時間が集計されることを確認
+        :return:
+        """
+        attendance = DailyAttendance.objects.get(user=self.user)
+        self.assertEqual(date(2023, 1, 2), attendance.date)
+        self.assertEqual(self.stamp_in.stamped_time, attendance.start_work)
+        self.assertEqual(self.stamp_out.stamped_time, attendance.end_work)
+        self.assertEqual(self.stamp_enter_break.stamped_time, attendance.enter_break)
+        self.assertEqual(self.stamp_end_break.stamped_time, attendance.end_break)
+        self.assertEqual(9 * 60 * 60, attendance.work_seconds)
+        self.assertEqual(1 * 60 * 60, attendance.break_seconds)
+
+    def test_update_stamp(self):
+        """
+        打刻日時を別の日に変更する
+        変更前・変更後の両方の日の日次勤怠が再集計されることを確認
+        :return:
+        """
+        self.stamp_out.stamped_time = self.str2datetime("2023/01/03 18:00:00")
+        self.stamp_out.save()
+
+        attendance = DailyAttendance.objects.get(user=self.user, date=date(2023, 1, 2))
+        self.assertIsNone(attendance.end_work)
+        self.assertEqual(0, attendance.work_seconds)
+
+        attendance = DailyAttendance.objects.get(user=self.user, date=date(2023, 1, 3))
+        self.assertEqual(self.stamp_out.stamped_time, attendance.end_work)
+
+    def test_delete_stamps(self):
+        """
+        対象日の打刻をすべて削除する
+        日次勤怠が削除されることを確認
+        :return:
+        """
+        self.stamp_in.delete()
+        self.assertTrue(DailyAttendance.objects.filter(user=self.user).exists())
+
+        TimeCard.objects.filter(user=self.user).delete()
+        self.assertFalse(DailyAttendance.objects.filter(user=self.user).exists())
+
+    def test_bulk_paths(self):
+        """
+        bulk_create・update・bulk_updateで打刻を変更する
+        日次勤怠に反映されることを確認
+        :return:
+        """
+        TimeCard.objects.bulk_create(
+            [
+                TimeCard(user=self.user, kind=TimeCard.Kind.IN, stamped_time=self.str2datetime("2023/01/04 10:00:00")),
+                TimeCard(user=self.user, kind=TimeCard.Kind.OUT, stamped_time=self.str2datetime("2023/01/04 15:00:00")),
+            ]
+        )
+        self.assertEqual(5 * 60 * 60, DailyAttendance.objects.get(user=self.user, date=date(2023, 1, 4)).work_seconds)
+
+        TimeCard.objects.filter(id=self.stamp_out.id).update(stamped_time=self.str2datetime("2023/01/02 20:00:00"))
+        self.assertEqual(10 * 60 * 60, DailyAttendance.objects.get(user=self.user, date=date(2023, 1, 2)).work_seconds)
+
+        self.stamp_end_break.stamped_time = self.str2datetime("2023/01/02 12:30:00")
+        TimeCard.objects.bulk_update([self.stamp_end_break], ["stamped_time"])
+        attendance = DailyAttendance.objects.get(user=self.user, date=date(2023, 1, 2))
+        self.assertEqual(30 * 60, attendance.break_seconds)
+        self.assertEqual(int(10.5 * 60 * 60), attendance.work_seconds)
+
+    def test_rebuild_daily_attendance(self):
+        """
+        日次勤怠を削除した状態でコマンドを実行する
+        打刻情報から日次勤怠が再作成されることを確認
+        :return:
+        """
+        DailyAttendance.objects.all().delete()
+        call_command("rebuild_daily_attendance", chunk_size=1, stdout=StringIO())
+
+        attendance = DailyAttendance.objects.get(user=self.user)
+        self.assertEqual(date(2023, 1, 2), attendance.date)
+        self.assertEqual(9 * 60 * 60, attendance.work_seconds)
+
+    def test_monthly_attendance(self):
+        """
+        打刻の追加・変更・削除を行う
+        月次勤怠の労働時間・休憩時間・出勤日フラグが日次勤怠から集計し直されることを確認
+        :return:
+        """
+        monthly_attendance = MonthlyAttendance.objects.get(user=self.user, month=date(2023, 1, 1))
+        self.assertEqual(9 * 60 * 60, monthly_attendance.work_seconds)
+        self.assertEqual(1 * 60 * 60, monthly_attendance.break_seconds)
+        self.assertEqual([2], monthly_attendance.work_days)
+
+        TimeCard.objects.create(
+            user=self.user, kind=TimeCard.Kind.IN, stamped_time=self.str2datetime("2023/01/31 09:00:00")
+        )
+        TimeCard.objects.create(
+            user=self.user, kind=TimeCard.Kind.OUT, stamped_time=self.str2datetime("2023/01/31 12:00:00")
+        )
+        self.stamp_end_break.stamped_time = self.str2datetime("2023/01/02 12:30:00")
+        self.stamp_end_break.save()
+
+        monthly_attendance.refresh_from_db()
+        self.assertEqual(int(12.5 * 60 * 60), monthly_attendance.work_seconds)
+        self.assertEqual(30 * 60, monthly_attendance.break_seconds)
+        self.assertEqual([2, 31], monthly_attendance.work_days)
+
+        TimeCard.objects.filter(id__in=[self.stamp_in.id, self.stamp_out.id]).delete()
+        TimeCard.objects.filter(id__in=[self.stamp_enter_break.id, self.stamp_end_break.id]).delete()
+
+        monthly_attendance.refresh_from_db()
+        self.assertEqual(3 * 60 * 60, monthly_attendance.work_seconds)
+        self.assertEqual(0, monthly_attendance.break_seconds)
+        self.assertEqual([31], monthly_attendance.work_days)
+
+        fields = ["user", "month", "work_seconds", "break_seconds", "work_days_flag"]
+        incremental = sorted(MonthlyAttendance.objects.values_list(*fields))
+        call_command("rebuild_daily_attendance", stdout=StringIO())
+        self.assertEqual(incremental, sorted(MonthlyAttendance.objects.values_list(*fields)))
+
+    def test_monthly_attendance_recalculated(self):
+        """
+        月次勤怠の値がずれた状態で打刻を変更する
+        差分ではなく日次勤怠の合計で月次勤怠が作り直されることを確認
+        :return:
+        """
+        MonthlyAttendance.objects.filter(user=self.user).update(work_seconds=1, break_seconds=1, work_days_flag=0)
+
+        self.stamp_out.stamped_time = self.str2datetime("2023/01/02 18:00:00")
+        self.stamp_out.save()
+
+        monthly_attendance = MonthlyAttendance.objects.get(user=self.user, month=date(2023, 1, 1))
+        self.assertEqual(8 * 60 * 60, monthly_attendance.work_seconds)
+        self.assertEqual(1 * 60 * 60, monthly_attendance.break_seconds)
+        self.assertEqual([2], monthly_attendance.work_days)
+
+    def test_rollback_stamp_on_refresh_error(self):
+        """
+        再集計中にエラーが発生する
+        打刻の保存も取り消され、打刻と日次・月次勤怠がずれないことを確認
+        :return:
+        """
+        with mock.patch.object(MonthlyAttendance.objects, "refresh", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                TimeCard.objects.create(
+                    user=self.user, kind=TimeCard.Kind.IN, stamped_time=self.str2datetime("2023/01/31 09:00:00")
+                )
+
+        self.assertFalse(TimeCard.objects.filter(stamped_time=self.str2datetime("2023/01/31 09:00:00")).exists())
+        self.assertFalse(DailyAttendance.objects.filter(user=self.user, date=date(2023, 1, 31)).exists())
+        self.assertEqual([2], MonthlyAttendance.objects.get(user=self.user, month=date(2023, 1, 1)).work_days)
+
+    def test_delete_user(self):
+        """
+        複数の月に打刻があるユーザーを削除する
+        打刻の削除による再集計で月次勤怠が作り直されず、ユーザーを削除できることを確認
+        :return:
+        """
+        for stamped_time in ["2023/02/01 09:00:00", "2023/03/01 09:00:00"]:
+            TimeCard.objects.create(user=self.user, kind=TimeCard.Kind.IN, stamped_time=self.str2datetime(stamped_time))
+        self.assertEqual(3, MonthlyAttendance.objects.filter(user=self.user).count())
+
+        User.objects.filter(id=self.user.id).delete()
+        connection.check_constraints()
+
+        self.assertFalse(DailyAttendance.objects.filter(user_id=self.user.id).exists())
+        self.assertFalse(MonthlyAttendance.objects.filter(user_id=self.user.id).exists())
+
+        # 削除後も他のユーザーの打刻は集計される
+        TimeCard.objects.create(user_id=3, kind=TimeCard.Kind.IN, stamped_time=self.str2datetime("2023/01/02 09:00:00"))
+        self.assertTrue(MonthlyAttendance.objects.filter(user_id=3, month=date(2023, 1, 1)).exists())
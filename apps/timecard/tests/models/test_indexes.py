@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.db.models import Q
+
+from apps.accounts.models import User
+from apps.timecard.models import (DailyAttendance, MonthlySubmission, TimeCard,
+                                  TimeCardSummary)
+
+from ..base import BaseTestCase
+
+
+class TestIndexes(BaseTestCase):
+    SEED_DAYS = 365
+
+    def setUp(self):
+        super().setUp()
+
+        # 1年分の打刻・サマリ・申請を登録し、インデックスが選択される件数にする
+        first_day = date(2022, 1, 1)
+        stamps = []
+        summaries = []
+        submissions = []
+        for user in User.objects.all():
+            for day_index in range(self.SEED_DAYS):
+                stamped_date = first_day + timedelta(days=day_index)
+                for kind, hour in [(TimeCard.Kind.IN, 9), (TimeCard.Kind.OUT, 18)]:
+                    stamped_time = self.str2datetime("{} {:02}:00:00".format(stamped_date, hour), "%Y-%m-%d %H:%M:%S")
+                    stamps.append(TimeCard(user=user, kind=kind, stamped_time=stamped_time))
+
+            for month_index in range(12):
+                summaries.append(
+                    TimeCardSummary(
+                        user=user,
+                        month=first_day + relativedelta(months=month_index),
+                        work_seconds=160 * 3600,
+                        work_days_flag=0,
+                    )
+                )
+                submissions.append(
+                    MonthlySubmission(
+                        user=user,
+                        month=first_day + relativedelta(months=month_index),
+                        state=MonthlySubmission.State.APPROVED,
+                    )
+                )
+
+        TimeCard.objects.bulk_create(stamps)
+        TimeCardSummary.objects.bulk_create(summaries)
+        MonthlySubmission.objects.bulk_create(submissions)
+
+    def test_hot_queries_use_index(self):
+        """
+        主要な画面で発行する検索クエリの実行計画を取得する
+        いずれもテーブルの全件走査にならないことを確認
+        :return:
+        """
+        BOM = self.str2datetime("2022/06/01 00:00:00")
+        EOM = BOM + relativedelta(months=1)
+        hot_queries = {
+            "monthly_report": TimeCard.objects.filter(
+                user=self.user, stamped_time__gte=BOM, stamped_time__lt=EOM
+            ).order_by("stamped_time"),
+            "monthly_submission": MonthlySubmission.objects.filter(user=self.user, month=BOM.date()),
+            "stamped_time_today": TimeCard.objects.filter(
+                user=self.user,
+                kind=TimeCard.Kind.IN,
+                stamped_time__gte=BOM,
+                stamped_time__lt=BOM + relativedelta(days=1),
+            ),
+            "work_condition": TimeCard.objects.filter(
+                Q(kind=TimeCard.Kind.IN) | Q(kind=TimeCard.Kind.OUT),
+                stamped_time__gte=BOM,
+                stamped_time__lt=BOM + relativedelta(days=1),
+            ),
+            "process_month_list": MonthlySubmission.objects.filter(
+                ~Q(user=self.super_user), state=MonthlySubmission.State.PROCESSING
+            ).order_by("month", "user"),
+            "summary": TimeCardSummary.objects.filter(user=self.user, month=date(2022, 6, 1)),
+            "approved_month_list": TimeCardSummary.objects.filter(
+                ~Q(user=self.super_user), month=date(2022, 6, 1)
+            ).order_by("-work_seconds", "user"),
+            "daily_attendance": DailyAttendance.objects.filter(
+                user=self.user, date__gte=BOM.date(), date__lt=EOM.date()
+            ),
+        }
+
+        for name, queryset in hot_queries.items():
+            with self.subTest(name):
+                plan = self._explain(queryset)
+                self.assertFalse(self._has_full_scan(plan, queryset.model._meta.db_table), plan)
+
+    def _explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # 少量のデータでも全件走査を選ばないよう、インデックスが使えない場合のみ全件走査にする
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql, params)
+            else:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def _has_full_scan(self, plan, db_table):
+        if connection.vendor == "postgresql":
+            return "Seq Scan on {}".format(db_table) in plan
+
+        return any(
+            line.strip() in ["SCAN {}".format(db_table), "SCAN TABLE {}".format(db_table)] for line in plan.splitlines()
+        )
@@ -0,0 +1,42 @@
+from datetime import date
+
+from apps.timecard.models import MonthlySubmission
+
+from ..base import BaseTestCase
+
+
+class TestMonthlySubmission(BaseTestCase):
+    month = date(2023, 1, 1)
+
+    def test_get_state_not_exist(self):
+        """
+        申請が存在しない月の状態を取得する
+        新規として扱われることを確認
+        :return:
+        """
+        self.assertEqual(MonthlySubmission.State.NEW, MonthlySubmission.objects.get_state(self.user, self.month))
+
+    def test_transition(self):
+        """
+        申請・差戻・再申請・承認の順に状態を遷移させる
+        各遷移で1行のみ更新され、申請中以外からの承認・差戻ができないことを確認
+        :return:
+        """
+        self.assertFalse(MonthlySubmission.objects.approve(self.user, self.month))
+        self.assertTrue(MonthlySubmission.objects.promote(self.user, self.month))
+        self.assertFalse(MonthlySubmission.objects.promote(self.user, self.month))
+
+        self.assertTrue(MonthlySubmission.objects.demote(self.user, self.month))
+        submission = MonthlySubmission.objects.get(user=self.user, month=self.month)
+        self.assertEqual(MonthlySubmission.State.NEW, submission.state)
+        self.assertIsNone(submission.submitted_at)
+
+        self.assertTrue(MonthlySubmission.objects.promote(self.user, self.month))
+        self.assertTrue(MonthlySubmission.objects.approve(self.user, self.month))
+        self.assertFalse(MonthlySubmission.objects.demote(self.user, self.month))
+
+        submission = MonthlySubmission.objects.get(user=self.user, month=self.month)
+        self.assertEqual(MonthlySubmission.State.APPROVED, submission.state)
+        self.assertIsNotNone(submission.submitted_at)
+        self.assertIsNotNone(submission.approved_at)
+        self.assertEqual(1, MonthlySubmission.objects.count())
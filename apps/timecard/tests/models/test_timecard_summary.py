@@ -0,0 +1,68 @@
+from datetime import date
+
+from apps.timecard.models import TimeCardSummary
+
+from ..base import BaseTestCase
+
+
+class TestTimeCardSummary(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # ユーザー1: 1月は1,2,31日、2月は1日に出勤
+        # ユーザー2: 1月は2,3日に出勤
+        # ユーザー3: 1月は出勤なし
+        for user_id, month, work_days in [
+            (1, date(2023, 1, 1), [1, 2, 31]),
+            (1, date(2023, 2, 1), [1]),
+            (2, date(2023, 1, 1), [2, 3]),
+            (3, date(2023, 1, 1), []),
+        ]:
+            TimeCardSummary.objects.create(
+                user_id=user_id,
+                month=month,
+                work_days_flag=sum(1 << (work_day - 1) for work_day in work_days),
+            )
+
+        self.summary_qs = TimeCardSummary.objects.filter(month=date(2023, 1, 1))
+
+    def test_with_work_days(self):
+        """
+        出勤日フラグから出勤日数を集計する
+        立っているビットの数が出勤日数になることを確認
+        :return:
+        """
+        summary_list = self.summary_qs.with_work_days().order_by("user")
+        self.assertEqual([3, 2, 0], [summary.work_days for summary in summary_list])
+        self.assertEqual([3, 2, 0], [summary.work_days_count for summary in summary_list])
+
+    def test_worked_on(self):
+        """
+        指定した日に出勤したユーザーを取得する
+        :return:
+        """
+        self.assertEqual([1, 2], list(self.summary_qs.worked_on(2).order_by("user").values_list("user", flat=True)))
+        self.assertEqual([1], list(self.summary_qs.worked_on(31).values_list("user", flat=True)))
+        self.assertEqual([], list(self.summary_qs.worked_on(15).values_list("user", flat=True)))
+
+    def test_work_days_lt(self):
+        """
+        出勤日数が指定した日数未満のユーザーを取得する
+        :return:
+        """
+        self.assertEqual([2, 3], list(self.summary_qs.work_days_lt(3).order_by("user").values_list("user", flat=True)))
+        self.assertEqual([3], list(self.summary_qs.work_days_lt(1).values_list("user", flat=True)))
+
+    def test_work_days_in_range(self):
+        """
+        期間内の出勤日数をユーザーごとに集計する
+        開始月・終了月の期間外の日は数えないことを確認
+        :return:
+        """
+        self.assertEqual(
+            [{"user": 1, "work_days": 3}, {"user": 2, "work_days": 2}, {"user": 3, "work_days": 0}],
+            list(TimeCardSummary.objects.work_days_in_range(date(2023, 1, 2), date(2023, 2, 1))),
+        )
+        self.assertEqual(
+            [{"user": 1, "work_days": 1}, {"user": 2, "work_days": 2}, {"user": 3, "work_days": 0}],
+            list(TimeCardSummary.objects.work_days_in_range(date(2023, 1, 2), date(2023, 1, 3))),
+        )
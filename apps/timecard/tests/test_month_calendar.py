@@ -0,0 +1,57 @@
+from datetime import date
+
+import jpholiday
+from dateutil.relativedelta import relativedelta
+from django.test import SimpleTestCase
+
+from apps.timecard.month_calendar import (WARM_UP_MONTHS, get_calendar_day,
+                                          get_month_calendar, warm_up)
+
+
+class TestMonthCalendar(SimpleTestCase):
+    def test_same_as_jpholiday(self):
+        """
+        2020年〜2025年の各日の曜日・区分・祝日名を取得する
+        jpholidayで1日ずつ判定した結果と一致することを確認
+        :return:
+        """
+        target_date = date(2020, 1, 1)
+        while target_date.year < 2026:
+            calendar_day = get_calendar_day(target_date)
+            holiday_name = jpholiday.is_holiday_name(target_date)
+
+            if holiday_name:
+                day_kind = "祝日"
+            elif target_date.isoweekday() in [6, 7]:
+                day_kind = "休日"
+            else:
+                day_kind = "平日"
+
+            self.assertEqual(target_date, calendar_day.date)
+            self.assertEqual("月火水木金土日"[target_date.weekday()], calendar_day.DOW)
+            self.assertEqual(day_kind, calendar_day.day_kind)
+            self.assertEqual(holiday_name, calendar_day.holiday_name)
+            target_date += relativedelta(days=1)
+
+    def test_days_of_month(self):
+        """
+        うるう年の2月のカレンダーを取得する
+        1日から29日まで順に並んでいることを確認
+        :return:
+        """
+        month_calendar = get_month_calendar(2024, 2)
+        self.assertEqual(list(range(1, 30)), [calendar_day.date.day for calendar_day in month_calendar])
+
+    def test_warm_up(self):
+        """
+        キャッシュを削除してから起動時の作成処理を実行する
+        前後12ヶ月分がキャッシュされ、再取得時にjpholidayを呼び出さないことを確認
+        :return:
+        """
+        get_month_calendar.cache_clear()
+        warm_up()
+        self.assertEqual(WARM_UP_MONTHS * 2 + 1, get_month_calendar.cache_info().currsize)
+
+        hits = get_month_calendar.cache_info().hits
+        get_calendar_day(date.today())
+        self.assertEqual(hits + 1, get_month_calendar.cache_info().hits)
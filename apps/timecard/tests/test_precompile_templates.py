@@ -0,0 +1,69 @@
+from django.template import TemplateSyntaxError
+from django.test import SimpleTestCase, override_settings
+
+from config.templates import compile_templates, precompile_templates
+
+LOCMEM_TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.locmem.Loader",
+                    {
+                        "base.html": "{% block content %}{% endblock %}",
+                        "child.html": (
+                            '{% extends "base.html" %}{% block content %}{% include "part.html" %}{% endblock %}'
+                        ),
+                        "part.html": "{{ value }}",
+                        "dynamic.html": "{% include name %}",
+                        "broken.html": '{% extends "base.html" %}{% block content %}{% if %}{% endblock %}',
+                    },
+                )
+            ],
+        },
+    }
+]
+
+
+class TestPrecompileTemplates(SimpleTestCase):
+    def test_precompile_templates(self):
+        """
+        起動時のテンプレートのコンパイルを実行する
+        各画面のテンプレートと、extends・includeで参照するテンプレートがコンパイルされることを確認
+        :return:
+        """
+        compiled = precompile_templates()
+
+        for template_name in [
+            "403.html",
+            "material-dashboard-master/pages/sign-in.html",
+            "material-dashboard-master/pages/dashboard.html",
+            "material-dashboard-master/pages/new_list.html",
+            "material-dashboard-master/pages/base_list.html",
+            "material-dashboard-master/pages/base.html",
+            "material-dashboard-master/pages/includes/sidebar.html",
+            "material-dashboard-master/pages/includes/keyset_pager.html",
+        ]:
+            self.assertIn(template_name, compiled)
+        self.assertEqual(len(compiled), len(set(compiled)))
+
+    @override_settings(TEMPLATES=LOCMEM_TEMPLATES)
+    def test_compile_templates(self):
+        """
+        extendsとincludeを含むテンプレートをコンパイルする
+        名前が固定の参照先だけを辿ることを確認
+        :return:
+        """
+        self.assertEqual(["child.html", "part.html", "base.html"], compile_templates(["child.html"]))
+        self.assertEqual(["dynamic.html"], compile_templates(["dynamic.html"]))
+
+    @override_settings(TEMPLATES=LOCMEM_TEMPLATES)
+    def test_compile_templates_syntax_error(self):
+        """
+        構文エラーのあるテンプレートをコンパイルする
+        TemplateSyntaxErrorが送出されることを確認
+        :return:
+        """
+        with self.assertRaises(TemplateSyntaxError):
+            compile_templates(["broken.html"])
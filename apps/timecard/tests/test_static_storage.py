@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+import tempfile
+
+import brotli
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+CSS = """
+/* コメント */
+.card {
+    color: #000000;
+    background: url("../img/bg.png");
+}
+""" * 100
+
+JS = """
+// コメント
+function hello(name) {
+    return "hello " + name;
+}
+""" * 100
+
+
+class TestCompressedManifestStaticFilesStorage(SimpleTestCase):
+    def setUp(self):
+        self.source_dir = tempfile.TemporaryDirectory()
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.source_dir.cleanup)
+        self.addCleanup(self.static_root.cleanup)
+
+        for name, content in [
+            ("css/style.css", CSS),
+            ("js/app.js", JS),
+            ("js/lib.min.js", JS),
+            ("img/bg.png", "png"),
+        ]:
+            path = os.path.join(self.source_dir.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(content)
+
+    def collectstatic(self):
+        with override_settings(
+            STATIC_ROOT=self.static_root.name,
+            STATICFILES_DIRS=[self.source_dir.name],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATICFILES_STORAGE="config.storage.CompressedManifestStaticFilesStorage",
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+
+        with open(os.path.join(self.static_root.name, "staticfiles.json")) as file:
+            return json.load(file)["paths"]
+
+    def read(self, name):
+        with open(os.path.join(self.static_root.name, name), "rb") as file:
+            return file.read()
+
+    def test_collectstatic(self):
+        """
+        CSS・JSを含むファイルをcollectstaticする
+        ハッシュ付きのファイルが圧縮され、gzip・brotliの圧縮済みファイルが作成されることを確認
+        :return:
+        """
+        paths = self.collectstatic()
+
+        css = self.read(paths["css/style.css"])
+        self.assertNotIn(b"/*", css)
+        self.assertLess(len(css), len(CSS.encode()))
+        self.assertIn(paths["img/bg.png"].split("/")[-1].encode(), css)
+        self.assertEqual(css, gzip.decompress(self.read(paths["css/style.css"] + ".gz")))
+        self.assertEqual(css, brotli.decompress(self.read(paths["css/style.css"] + ".br")))
+
+        js = self.read(paths["js/app.js"])
+        self.assertNotIn(b"//", js)
+        self.assertEqual(js, gzip.decompress(self.read(paths["js/app.js"] + ".gz")))
+
+        # 圧縮済みのファイルはそのままコピーする
+        self.assertEqual(JS.encode(), self.read(paths["js/lib.min.js"]))
+
+        # 小さいファイルや圧縮対象外のファイルは圧縮済みファイルを作成しない
+        self.assertFalse(os.path.exists(os.path.join(self.static_root.name, paths["img/bg.png"] + ".gz")))
+
+    def test_collectstatic_twice(self):
+        """
+        collectstaticを2回実行する
+        圧縮済みファイルが上書きされ、別名のファイルが作成されないことを確認
+        :return:
+        """
+        paths = self.collectstatic()
+        self.collectstatic()
+
+        css_dir = os.path.join(self.static_root.name, "css")
+        name = paths["css/style.css"].split("/")[-1]
+        self.assertEqual(
+            sorted(["style.css", name, name + ".gz", name + ".br"]),
+            sorted(os.listdir(css_dir)),
+        )
@@ -1,3 +1,5 @@
+from .test_database_pool_stats_view import (TestConnectionPool,
+                                            TestDatabasePoolStatsView)
 from .test_timecard_approved_month_list_view import \
     TestTimeCardApprovedMonthListView
 from .test_timecard_approved_monthly_report_view import \
@@ -20,4 +22,6 @@ __all__ = [
     "TestTimeCardProcessMonthlyReportView",
     "TestTimeCardApprovedMonthListView",
     "TestTimeCardApprovedMonthlyReportView",
+    "TestDatabasePoolStatsView",
+    "TestConnectionPool",
 ]
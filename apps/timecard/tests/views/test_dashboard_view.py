@@ -0,0 +1,266 @@
+from http import HTTPStatus
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.timecard.models import (MonthlySubmission, Presence, TimeCard,
+                                  TimeCardSummary)
+from apps.timecard.views.dashboard import WORK_CONDITION_PAGE_SIZE
+
+from ..base import BaseTestCaseNeedSuperUser
+
+
+class TestDashboardView(BaseTestCaseNeedSuperUser):
+    url = reverse("timecard:dashboard")
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def test_get_not_login(self):
+        """
+        ログイン前に画面にアクセスする
+        ログイン画面にリダイレクトされることを確認
+        :return:
+        """
+        super().base_test_get_not_login()
+
+    def test_snapshot(self):
+        """
+        今週の打刻がある状態で画面にアクセスする
+        打刻ボタン・週間グラフ・締め処理の判定が1回の打刻取得から作成されることを確認
+        :return:
+        """
+        for kind, hours in [
+            (TimeCard.Kind.IN, 9),
+            (TimeCard.Kind.ENTER_BREAK, 12),
+            (TimeCard.Kind.END_BREAK, 13),
+            (TimeCard.Kind.OUT, 18),
+        ]:
+            TimeCard.objects.create(
+                user=self.super_user, kind=kind, stamped_time=self.today + relativedelta(hours=hours)
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(1, len([query for query in queries if 'FROM "timecard"' in query["sql"]]))
+        self.assertFalse(response.context_data["is_promoted"])
+        self.assertEqual(self.today + relativedelta(hours=9), response.context_data["stamped_time"][TimeCard.Kind.IN])
+        self.assertEqual(self.today + relativedelta(hours=18), response.context_data["stamped_time"][TimeCard.Kind.OUT])
+
+        work_hour = [0.0] * 7
+        work_hour[self.today.isoweekday() - 1] = 8.0
+        self.assertEqual(work_hour, response.context_data["bar_chart_data"]["work_hour"])
+
+    def test_stamp_promoted(self):
+        """
+        当月が申請済みの状態で打刻する
+        打刻されずにエラーメッセージが表示されることを確認
+        :return:
+        """
+        TimeCard.objects.create(
+            user=self.super_user,
+            kind=TimeCard.Kind.IN,
+            stamped_time=self.today + relativedelta(day=1, hours=9),
+        )
+        MonthlySubmission.objects.create(
+            user=self.super_user,
+            month=(self.today + relativedelta(day=1)).date(),
+            state=MonthlySubmission.State.PROCESSING,
+        )
+
+        response = self.client.get(self.url, {"mode": "out"}, follow=True)
+        self.assertEqual("締め処理後のため打刻できません", response.context_data["error"])
+        self.assertTrue(response.context_data["is_promoted"])
+        self.assertFalse(TimeCard.objects.filter(user=self.super_user, kind=TimeCard.Kind.OUT).exists())
+
+    def test_work_condition(self):
+        """
+        当日の打刻がある状態で画面にアクセスする
+        ユーザーごとに当日最初の出勤時刻・最後の退勤時刻が表示されることを確認
+        :return:
+        """
+        for hours, kind in [(9, TimeCard.Kind.IN), (10, TimeCard.Kind.IN), (17, TimeCard.Kind.OUT)]:
+            TimeCard.objects.create(user=self.user, kind=kind, stamped_time=self.today + relativedelta(hours=hours))
+
+        TimeCard.objects.create(
+            user=self.user, kind=TimeCard.Kind.OUT, stamped_time=self.today + relativedelta(hours=18)
+        )
+        TimeCard.objects.create(
+            user_id=3, kind=TimeCard.Kind.IN, stamped_time=self.today - relativedelta(days=1, hours=-9)
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+
+        work_condition = {user.id: user for user in response.context_data["work_condition"]}
+        self.assertNotIn(self.super_user.id, work_condition)
+        self.assertEqual(self.today + relativedelta(hours=9), work_condition[self.user.id].start_work)
+        self.assertEqual(self.today + relativedelta(hours=18), work_condition[self.user.id].end_work)
+        self.assertIsNone(work_condition[3].start_work)
+        self.assertIsNone(work_condition[3].end_work)
+
+    def test_work_condition_not_manager(self):
+        """
+        一般ユーザーで画面にアクセスする
+        勤務状況一覧が作成されないことを確認
+        :return:
+        """
+        self.client.force_login(user=self.user)
+
+        response = self.client.get(self.url)
+        self.assertIsNone(response.context_data["work_condition"])
+
+    def test_work_condition_query_count(self):
+        """
+        ユーザー数を1ページの表示件数より多く増やして画面にアクセスする
+        発行するクエリ数が変わらず、表示件数が上限までになることを確認
+        :return:
+        """
+        with CaptureQueriesContext(connection) as few_users_queries:
+            self.client.get(self.url)
+
+        for i in range(4, WORK_CONDITION_PAGE_SIZE + 10):
+            user = User.objects.create(email="user{}@example.com".format(i), name="テスト{}".format(i))
+            TimeCard.objects.create(user=user, kind=TimeCard.Kind.IN, stamped_time=self.today + relativedelta(hours=9))
+
+        with CaptureQueriesContext(connection) as many_users_queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(few_users_queries), len(many_users_queries))
+        self.assertEqual(WORK_CONDITION_PAGE_SIZE, len(response.context_data["work_condition"]))
+
+        response = self.client.get(self.url, {"page": 2})
+        self.assertEqual(8, len(response.context_data["work_condition"]))
+
+    def test_line_graph_data(self):
+        """
+        2ヶ月前は承認済み、当月は未申請の打刻がある状態で画面にアクセスする
+        承認済みの月はサマリ、その他の月は打刻から集計した勤務時間が古い順に表示されることを確認
+        :return:
+        """
+        BOM = self.today + relativedelta(day=1)
+        TimeCardSummary.objects.create(
+            user=self.super_user,
+            month=(BOM - relativedelta(months=2)).date(),
+            work_seconds=int(150.5 * 3600),
+            break_seconds=20 * 3600,
+            work_days_flag=0,
+        )
+        summary = TimeCardSummary.objects.get(user=self.super_user)
+
+        for kind, hours in [(TimeCard.Kind.IN, 9), (TimeCard.Kind.OUT, 17)]:
+            TimeCard.objects.create(
+                user=self.super_user, kind=kind, stamped_time=BOM + relativedelta(months=-5, hours=hours)
+            )
+            TimeCard.objects.create(user=self.super_user, kind=kind, stamped_time=BOM + relativedelta(hours=hours))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        line_graph_data = response.context_data["line_graph_data"]
+        self.assertEqual(
+            ", ".join((BOM - relativedelta(months=index)).strftime("%Y/%m") for index in reversed(range(6))),
+            line_graph_data["months"],
+        )
+        self.assertEqual([8.0, 0, 0, 150.5, 0, 8.0], line_graph_data["total_work_hours"])
+        self.assertLessEqual(summary.updated_at, line_graph_data["latest_updated_at"])
+
+        trend_queries = [query for query in queries if "timecard_summary" in query["sql"]]
+        self.assertEqual(1, len(trend_queries))
+
+
+class TestWorkConditionView(BaseTestCaseNeedSuperUser):
+    url = reverse("timecard:work_condition")
+
+    def test_get_not_superuser(self):
+        """
+        一般ユーザーでアクセスする
+        403エラーになることを確認
+        :return:
+        """
+        self.client.force_login(user=self.user)
+
+        response = self.client.get(self.url)
+        self.assertEqual(HTTPStatus.FORBIDDEN.value, response.status_code)
+
+    def test_get_json(self):
+        """
+        当日に出勤・退勤したユーザーがいる状態でアクセスする
+        ユーザーごとの在席状況がJSONで返されることを確認
+        :return:
+        """
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        TimeCard.objects.create(user=self.user, kind=TimeCard.Kind.IN, stamped_time=today + relativedelta(hours=9))
+        TimeCard.objects.create(user_id=3, kind=TimeCard.Kind.IN, stamped_time=today + relativedelta(hours=8))
+        TimeCard.objects.create(user_id=3, kind=TimeCard.Kind.OUT, stamped_time=today + relativedelta(hours=17))
+
+        response = self.client.get(self.url)
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertEqual(
+            [
+                {
+                    "id": 3,
+                    "name": "テスト3",
+                    "is_manager": True,
+                    "state": Presence.State.LEFT,
+                    "state_label": "退勤済み",
+                    "start_work": "08:00",
+                    "end_work": "17:00",
+                },
+                {
+                    "id": 2,
+                    "name": "テスト2",
+                    "is_manager": False,
+                    "state": Presence.State.AT_WORK,
+                    "state_label": "勤務中",
+                    "start_work": "09:00",
+                    "end_work": None,
+                },
+            ],
+            response.json()["users"],
+        )
+
+    def test_not_modified(self):
+        """
+        前回のETagを付けて再度アクセスする
+        打刻がなければ304、打刻後は新しい内容が返されることを確認
+        :return:
+        """
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        self.assertEqual(Presence.State.ABSENT, response.json()["users"][1]["state"])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(HTTPStatus.NOT_MODIFIED.value, response.status_code)
+
+        TimeCard.objects.create(user=self.user, kind=TimeCard.Kind.IN)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertNotEqual(etag, response.headers["ETag"])
+        self.assertEqual(Presence.State.AT_WORK, response.json()["users"][1]["state"])
+
+    def test_delete_user_at_work(self):
+        """
+        当日に出勤したユーザーを削除する
+        在席状況が作り直されずにユーザーを削除でき、一覧に表示されないことを確認
+        :return:
+        """
+        TimeCard.objects.create(user=self.user, kind=TimeCard.Kind.IN)
+        self.assertTrue(Presence.objects.filter(user=self.user).exists())
+
+        User.objects.filter(id=self.user.id).delete()
+        connection.check_constraints()
+        self.assertFalse(Presence.objects.filter(user_id=self.user.id).exists())
+
+        Presence.objects.refresh({self.user.id}, timezone.localdate())
+        self.assertFalse(Presence.objects.filter(user_id=self.user.id).exists())
+
+        response = self.client.get(self.url)
+        self.assertNotIn(self.user.id, [user["id"] for user in response.json()["users"]])
@@ -0,0 +1,148 @@
+import threading
+from http import HTTPStatus
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from config.db.pool import ConnectionPool, PoolTimeout
+
+from ..base import BaseTestCaseNeedSuperUser
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestDatabasePoolStatsView(BaseTestCaseNeedSuperUser):
+    url = reverse("timecard:db_pool_stats")
+
+    def test_get_not_login(self):
+        """
+        ログイン前に画面にアクセスする
+        ログイン画面にリダイレクトされることを確認
+        :return:
+        """
+        super().base_test_get_not_login()
+
+    def test_get_not_superuser(self):
+        """
+        一般ユーザーでアクセスする
+        403エラーになることを確認
+        :return:
+        """
+        self.client.logout()
+        self.client.force_login(user=self.user)
+
+        response = self.client.get(self.url)
+        self.assertEqual(HTTPStatus.FORBIDDEN.value, response.status_code)
+
+    def test_get(self):
+        """
+        管理者でアクセスする
+        プロセス内のプールの利用状況が返ることを確認
+        :return:
+        """
+        pool = ConnectionPool(2)
+        pool.getconn(FakeConnection)
+
+        with mock.patch("apps.timecard.views.monitoring.get_pool_stats", return_value={"default": pool.stats()}):
+            response = self.client.get(self.url)
+
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        stats = response.json()["pools"]["default"]
+        self.assertEqual(2, stats["max_size"])
+        self.assertEqual(1, stats["in_use"])
+        self.assertEqual(0, stats["idle"])
+
+
+class TestConnectionPool(SimpleTestCase):
+    def test_reuse(self):
+        """
+        返却した接続を取得する
+        新しく接続せずに返却した接続が再利用されることを確認
+        :return:
+        """
+        pool = ConnectionPool(2)
+        conn = pool.getconn(FakeConnection)
+        pool.putconn(conn)
+
+        self.assertIs(conn, pool.getconn(FakeConnection))
+        self.assertEqual({"in_use": 1, "idle": 0, "checkout_count": 2}, self._pick(pool.stats()))
+
+    def test_discard(self):
+        """
+        切断済み・破棄指定の接続を返却する
+        プールに戻されず、次の取得で新しく接続されることを確認
+        :return:
+        """
+        pool = ConnectionPool(2)
+        conn1 = pool.getconn(FakeConnection)
+        conn2 = pool.getconn(FakeConnection)
+        pool.putconn(conn1, discard=True)
+        conn2.close()
+        pool.putconn(conn2)
+
+        self.assertTrue(conn1.closed)
+        self.assertEqual({"in_use": 0, "idle": 0, "checkout_count": 2}, self._pick(pool.stats()))
+        self.assertIsNot(conn2, pool.getconn(FakeConnection))
+
+    def test_timeout(self):
+        """
+        上限まで貸し出した状態で取得する
+        待ち時間を超えるとPoolTimeoutになり、空きが出れば取得できることを確認
+        :return:
+        """
+        pool = ConnectionPool(1, timeout=0.01)
+        conn = pool.getconn(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+
+        timer = threading.Timer(0.05, pool.putconn, (conn,))
+        timer.start()
+        pool.timeout = 5
+        self.assertIs(conn, pool.getconn(FakeConnection))
+        timer.join()
+
+        stats = pool.stats()
+        self.assertEqual(1, stats["in_use"])
+        self.assertEqual(0, stats["waiting"])
+        self.assertGreater(stats["max_wait_ms"], 0)
+
+    def test_connect_error(self):
+        """
+        接続に失敗する
+        貸し出し数が元に戻ることを確認
+        :return:
+        """
+        pool = ConnectionPool(1, timeout=0.01)
+
+        with self.assertRaises(OSError):
+            pool.getconn(mock.Mock(side_effect=OSError))
+
+        self.assertEqual(0, pool.stats()["in_use"])
+        pool.getconn(FakeConnection)
+
+    def test_closeall(self):
+        """
+        プールを空にする
+        待機中の接続がすべて切断されることを確認
+        :return:
+        """
+        pool = ConnectionPool(2)
+        conn_list = [pool.getconn(FakeConnection) for _ in range(2)]
+        for conn in conn_list:
+            pool.putconn(conn)
+
+        pool.closeall()
+
+        self.assertTrue(all(conn.closed for conn in conn_list))
+        self.assertEqual(0, pool.stats()["idle"])
+
+    def _pick(self, stats):
+        return {key: stats[key] for key in ["in_use", "idle", "checkout_count"]}
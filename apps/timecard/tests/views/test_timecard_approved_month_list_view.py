@@ -1,4 +1,6 @@
+from datetime import date
 from http import HTTPStatus
+from unittest import mock
 
 from dateutil.relativedelta import relativedelta
 from django.urls import reverse
@@ -6,6 +8,7 @@ from django.utils import timezone
 
 from apps.accounts.models import User
 from apps.timecard.models import TimeCardSummary
+from apps.timecard.views import TimeCardApprovedMonthListView
 
 from ..base import BaseTestCaseNeedSuperUser
 
@@ -57,7 +60,7 @@ class TestTimeCardApprovedMonthListView(BaseTestCaseNeedSuperUser):
         response = self.client.get(self.url)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual(self.template, response.templates[0].name)
-        self.assertEqual(0, response.context_data["timecardsummary_list"].count())
+        self.assertEqual(0, len(response.context_data["timecardsummary_list"]))
 
     def test_get_login_has_normally_param(self):
         """
@@ -66,10 +69,10 @@ class TestTimeCardApprovedMonthListView(BaseTestCaseNeedSuperUser):
         """
         for user in User.objects.all():
             TimeCardSummary.objects.create(
-                total_work_hours="1", total_break_hours="2", work_days_flag=3, month="202301", user=user
+                work_seconds=3600, break_seconds=7200, work_days_flag=3, month=date(2023, 1, 1), user=user
             )
             TimeCardSummary.objects.create(
-                total_work_hours="1", total_break_hours="2", work_days_flag=3, month="202302", user=user
+                work_seconds=3600, break_seconds=7200, work_days_flag=3, month=date(2023, 2, 1), user=user
             )
 
         response = self.client.get(self.url, {"month": "202301"})
@@ -81,16 +84,16 @@ class TestTimeCardApprovedMonthListView(BaseTestCaseNeedSuperUser):
         summary_list = response.context_data["timecardsummary_list"]
 
         self.assertEqual(2, len(summary_list))
-        self.assertEqual("1", summary_list[0].total_work_hours)
-        self.assertEqual("2", summary_list[0].total_break_hours)
+        self.assertEqual("1.0", summary_list[0].total_work_hours)
+        self.assertEqual("2.0", summary_list[0].total_break_hours)
         self.assertEqual(3, summary_list[0].work_days_flag)
-        self.assertEqual("202301", summary_list[0].month)
+        self.assertEqual(date(2023, 1, 1), summary_list[0].month)
         self.assertEqual(2, summary_list[0].user.id)
 
-        self.assertEqual("1", summary_list[1].total_work_hours)
-        self.assertEqual("2", summary_list[1].total_break_hours)
+        self.assertEqual("1.0", summary_list[1].total_work_hours)
+        self.assertEqual("2.0", summary_list[1].total_break_hours)
         self.assertEqual(3, summary_list[1].work_days_flag)
-        self.assertEqual("202301", summary_list[1].month)
+        self.assertEqual(date(2023, 1, 1), summary_list[1].month)
         self.assertEqual(3, summary_list[1].user.id)
 
     def test_secondary_access(self):
@@ -104,3 +107,159 @@ class TestTimeCardApprovedMonthListView(BaseTestCaseNeedSuperUser):
 
         response = self.client.get(self.url)
         self.assertEqual("2023-01", response.context_data["search_form"].initial["month"])
+
+    def test_sort_and_filter_by_hours(self):
+        """
+        総勤務時間で並び替え・絞り込みを行う
+        条件に合うサマリのみが指定した順で表示されることを確認
+        :return:
+        """
+        for user, hours in [(self.user, 150), (User.objects.get(id=3), 170)]:
+            TimeCardSummary.objects.create(
+                work_seconds=hours * 3600, break_seconds=0, work_days_flag=3, month=date(2023, 1, 1), user=user
+            )
+
+        response = self.client.get(self.url, {"month": "202301", "sort": "-work_seconds"})
+        self.assertEqual([3, 2], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+        response = self.client.get(self.url, {"month": "202301", "sort": "work_seconds"})
+        self.assertEqual([2, 3], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+        response = self.client.get(self.url, {"month": "202301", "min_hours": "160"})
+        self.assertEqual([3], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+        response = self.client.get(self.url, {"month": "202301", "max_hours": "150"})
+        self.assertEqual([2], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+    def test_invalid_filter(self):
+        """
+        下限＞上限で絞り込みを行う
+        絞り込みは行われず、エラーメッセージが表示されることを確認
+        :return:
+        """
+        TimeCardSummary.objects.create(
+            work_seconds=3600, break_seconds=0, work_days_flag=3, month=date(2023, 1, 1), user=self.user
+        )
+
+        response = self.client.get(self.url, {"month": "202301", "min_hours": "10", "max_hours": "1"})
+        self.assertEqual(1, len(response.context_data["timecardsummary_list"]))
+        self.assertIn("max_hours", response.context_data["filter_form"].errors)
+
+    def test_org_totals_and_top_overtime(self):
+        """
+        対象月の全体集計と残業時間の上位者を表示する
+        1日8時間を超えた勤務時間が残業時間として集計されることを確認
+        :return:
+        """
+        TimeCardSummary.objects.create(
+            work_seconds=9 * 3600, break_seconds=3600, work_days_flag=1 << 1, month=date(2023, 1, 1), user=self.user
+        )
+        TimeCardSummary.objects.create(
+            work_seconds=3 * 3600, break_seconds=0, work_days_flag=0, month=date(2023, 1, 1), user_id=3
+        )
+
+        response = self.client.get(self.url, {"month": "202301", "sort": "-overtime_seconds"})
+        self.assertEqual(
+            {
+                "headcount": 2,
+                "total_work_hours": "12.0",
+                "avg_work_hours": "6.0",
+                "max_work_hours": "9.0",
+                "total_break_hours": "1.0",
+            },
+            response.context_data["org_totals"],
+        )
+
+        top_overtime_list = response.context_data["top_overtime_list"]
+        self.assertEqual([2], [summary.user.id for summary in top_overtime_list])
+        self.assertEqual("1.0", top_overtime_list[0].overtime_hours)
+        self.assertEqual([2, 3], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+    def test_filter_by_work_days(self):
+        """
+        出勤日・出勤日数で絞り込みを行う
+        出勤日フラグが条件に合うサマリのみ表示されることを確認
+        :return:
+        """
+        TimeCardSummary.objects.create(work_days_flag=0b110, month=date(2023, 1, 1), user=self.user)
+        TimeCardSummary.objects.create(work_days_flag=0b001, month=date(2023, 1, 1), user_id=3)
+
+        response = self.client.get(self.url, {"month": "202301", "work_day": "2"})
+        self.assertEqual([2], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+        response = self.client.get(self.url, {"month": "202301", "work_days_lt": "2"})
+        self.assertEqual([3], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+    def test_keyset_pagination(self):
+        """
+        並び順を指定してページを移動する
+        次のページ・前のページのリンクで、同じ総勤務時間のサマリも欠けずに表示されることを確認
+        :return:
+        """
+        for user, hours in [
+            (self.user, 150),
+            (User.objects.get(id=3), 170),
+            (User.objects.create(email="test4@example.com", name="別ユーザー4"), 150),
+            (User.objects.create(email="test5@example.com", name="別ユーザー5"), 160),
+        ]:
+            TimeCardSummary.objects.create(
+                work_seconds=hours * 3600, break_seconds=0, work_days_flag=3, month=date(2023, 1, 1), user=user
+            )
+
+        with mock.patch.object(TimeCardApprovedMonthListView, "paginate_by", 2):
+            response = self.client.get(self.url, {"month": "202301", "sort": "-work_seconds"})
+            self.assertEqual([3, 5], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+            self.assertFalse(response.context_data["page_obj"].has_previous())
+
+            response = self.client.get(self.url + response.context_data["page_obj"].next_query)
+            self.assertEqual([2, 4], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+            self.assertFalse(response.context_data["page_obj"].has_next())
+
+            response = self.client.get(self.url + response.context_data["page_obj"].previous_query)
+            self.assertEqual([3, 5], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+            self.assertFalse(response.context_data["page_obj"].has_previous())
+            self.assertTrue(response.context_data["page_obj"].has_next())
+
+            response = self.client.get(self.url, {"month": "202301", "after": "invalid"})
+            self.assertEqual([2, 3], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+    def test_keyset_pagination_by_overtime(self):
+        """
+        残業時間順でページを移動する
+        集計で追加した残業時間のカーソルでも、次のページ・前のページへ移動できることを確認
+        :return:
+        """
+        for user_id in [2, 3]:
+            TimeCardSummary.objects.create(
+                work_seconds=0, break_seconds=0, work_days_flag=0, month=date(2023, 1, 1), user_id=user_id
+            )
+
+        with mock.patch.object(TimeCardApprovedMonthListView, "paginate_by", 1):
+            response = self.client.get(self.url, {"month": "202301", "sort": "-overtime_seconds"})
+            self.assertEqual([2], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+
+            response = self.client.get(self.url + response.context_data["page_obj"].next_query)
+            self.assertEqual(HTTPStatus.OK.value, response.status_code)
+            self.assertEqual([3], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+            self.assertFalse(response.context_data["page_obj"].has_next())
+
+            response = self.client.get(self.url + response.context_data["page_obj"].previous_query)
+            self.assertEqual(HTTPStatus.OK.value, response.status_code)
+            self.assertEqual([2], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
+            self.assertFalse(response.context_data["page_obj"].has_previous())
+
+    def test_filter_by_name(self):
+        """
+        名前で絞り込みを行う
+        名前が前方一致するサマリのみ表示されることを確認
+        :return:
+        """
+        TimeCardSummary.objects.create(work_days_flag=0, month=date(2023, 1, 1), user=self.user)
+        TimeCardSummary.objects.create(
+            work_days_flag=0,
+            month=date(2023, 1, 1),
+            user=User.objects.create(email="test4@example.com", name="別ユーザー4"),
+        )
+
+        response = self.client.get(self.url, {"month": "202301", "name": "テスト"})
+        self.assertEqual([2], [summary.user.id for summary in response.context_data["timecardsummary_list"]])
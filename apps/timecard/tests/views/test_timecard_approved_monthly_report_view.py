@@ -3,7 +3,7 @@ from http import HTTPStatus
 
 from django.urls import reverse
 
-from apps.timecard.models import TimeCard, TimeCardSummary
+from apps.timecard.models import MonthlySubmission, TimeCard, TimeCardSummary
 
 from ..base import BaseTestCaseNeedSuperUser
 
@@ -78,15 +78,17 @@ class TestTimeCardApprovedMonthlyReportView(BaseTestCaseNeedSuperUser):
         承認済みの打刻情報が表示されることを確認
         :return:
         """
-        TimeCard.objects.all().update(state=TimeCard.State.APPROVED)
+        MonthlySubmission.objects.create(
+            user=self.user, month=datetime(2023, 1, 1).date(), state=MonthlySubmission.State.APPROVED
+        )
         TimeCardSummary.objects.create(
-            total_work_hours="1", total_break_hours="2", work_days_flag=3, month="202301", user=self.user
+            work_seconds=3600, break_seconds=7200, work_days_flag=3, month=datetime(2023, 1, 1).date(), user=self.user
         )
 
         response = self.client.get(self.url, {"user": self.user.id, "month": "202301"}, follow=True)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual("テスト2", response.context_data["user_name"])
-        self.assertEqual("1", response.context_data["total_work_hours"])
+        self.assertEqual("1.0", response.context_data["total_work_hours"])
         self.assertEqual(datetime.strptime("2023/01/01", "%Y/%m/%d").date(), response.context_data["BOM"])
         self.assertEqual(datetime.strptime("2023/01/31", "%Y/%m/%d").date(), response.context_data["EOM"])
 
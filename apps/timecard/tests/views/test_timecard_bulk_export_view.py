@@ -0,0 +1,88 @@
+import urllib
+import zipfile
+from http import HTTPStatus
+from io import BytesIO
+
+import openpyxl
+from django.urls import reverse
+
+from ..base import BaseTestCaseNeedSuperUser
+
+
+class TestTimeCardBulkExportView(BaseTestCaseNeedSuperUser):
+    url = reverse("timecard:timecard_bulk_export")
+
+    def test_get_not_login(self):
+        """
+        ログイン前に画面にアクセスする
+        ログイン画面にリダイレクトされることを確認
+        :return:
+        """
+        super().base_test_get_not_login()
+
+    def test_get_not_superuser(self):
+        """
+        一般ユーザーで画面にアクセスする
+        403エラーになることを確認
+        :return:
+        """
+        self.client.logout()
+        self.client.force_login(user=self.user)
+
+        response = self.client.get(self.url, {"month": "202301"})
+        self.assertEqual(HTTPStatus.FORBIDDEN.value, response.status_code)
+
+    def test_export_file_not_param(self):
+        """
+        クエリパラメーターなしでアクセスする
+        承認一覧画面にリダイレクトされることを確認
+        :return:
+        """
+        response = self.client.get(self.url, follow=True)
+        self.assertEqual("不正な操作を検知しました", response.context_data["error"])
+        self.assertIn(reverse("timecard:timecard_approved_month_list"), response.redirect_chain[0][0])
+        self.assertEqual(HTTPStatus.FOUND.value, response.redirect_chain[0][1])
+
+    def test_export_all_users(self):
+        """
+        ユーザー指定なしでアクセスする
+        全ユーザー分のExcelがZIPに含まれ、個別出力と同じ内容であることを確認
+        :return:
+        """
+        zip_file = self._get_zip_by_response(month="202301")
+        self.assertEqual(
+            ["勤怠_テスト1_2023年01月.xlsx", "勤怠_テスト2_2023年01月.xlsx", "勤怠_テスト3_2023年01月.xlsx"],
+            zip_file.namelist(),
+        )
+
+        ws = openpyxl.load_workbook(BytesIO(zip_file.read("勤怠_テスト2_2023年01月.xlsx")))["一覧"]
+        self.assertEqual("勤務報告書　2023年01月", ws["A2"].value)
+        self.assertEqual("氏名　テスト2", ws["A4"].value)
+        self.assertEqual("09:00", ws["D7"].value)
+        self.assertEqual("19:00", ws["E7"].value)
+        self.assertEqual("12:00", ws["F7"].value)
+        self.assertEqual("13:00", ws["G7"].value)
+
+        ws = openpyxl.load_workbook(BytesIO(zip_file.read("勤怠_テスト3_2023年01月.xlsx")))["一覧"]
+        self.assertEqual("氏名　テスト3", ws["A4"].value)
+        self.assertIsNone(ws["D7"].value)
+
+    def test_export_selected_users(self):
+        """
+        ユーザーを指定してアクセスする
+        指定したユーザーのExcelのみZIPに含まれることを確認
+        :return:
+        """
+        zip_file = self._get_zip_by_response(month="202301", user=[self.user.id, 3])
+        self.assertEqual(["勤怠_テスト2_2023年01月.xlsx", "勤怠_テスト3_2023年01月.xlsx"], zip_file.namelist())
+
+    def _get_zip_by_response(self, **get_params):
+        """
+        ダウンロードしたZIPのファイル名を確認
+        :return::class:`zipfile.ZipFile`
+        """
+        response = self.client.get(self.url, get_params)
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertIn("勤怠_2023年01月.zip", urllib.parse.unquote(response.headers.get("Content-Disposition")))
+
+        return zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
@@ -1,10 +1,10 @@
-from datetime import datetime
+from datetime import date, datetime
 from http import HTTPStatus
 
 from dateutil.relativedelta import relativedelta
 from django.urls import reverse
 
-from apps.timecard.models import TimeCard
+from apps.timecard.models import MonthlySubmission, TimeCard
 
 from ..base import BaseTestCase
 
@@ -26,38 +26,40 @@ class TestTimeCardEditView(BaseTestCase):
     def test_get_failure_not_param(self):
         """
         クエリパラメーターなしでアクセスする
-        セッションのエラーメッセージを確認
+        エラーメッセージを確認
         :return:
         """
         response = self.client.get(self.url)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual(self.template, response.templates[0].name)
-        self.assertEqual("不正な操作を検知しました", self.client_session.get("error"))
+        self.assertEqual("不正な操作を検知しました", self.get_toast_msg(response).get("error"))
 
     def test_get_failure_next_month(self):
         """
         クエリパラメーターに来月の日付を指定してアクセスする
-        セッションのエラーメッセージを確認
+        エラーメッセージを確認
         :return:
         """
         next_month_YM = (datetime.today() + relativedelta(day=1, months=1)).strftime("%Y%m%d")
         response = self.client.get(self.url, {"date": next_month_YM})
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual(self.template, response.templates[0].name)
-        self.assertEqual("来月以降の情報は編集できません", self.client_session.get("error"))
+        self.assertEqual("来月以降の情報は編集できません", self.get_toast_msg(response).get("error"))
 
     def test_get_failure_exist_promoted_stamp(self):
         """
         申請中の日付をクエリパラメーターに指定してアクセスする
-        セッションのエラーメッセージを確認
+        エラーメッセージを確認
         :return:
         """
-        TimeCard.objects.all().update(state=TimeCard.State.PROCESSING)
+        MonthlySubmission.objects.create(
+            user=self.user, month=date(2023, 1, 1), state=MonthlySubmission.State.PROCESSING
+        )
 
         response = self.client.get(self.url, {"date": "20230102"})
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual(self.template, response.templates[0].name)
-        self.assertEqual("申請中および承認済みの情報は更新できません", self.client_session.get("error"))
+        self.assertEqual("申請中および承認済みの情報は更新できません", self.get_toast_msg(response).get("error"))
 
     def test_not_initial_data(self):
         """
@@ -155,7 +157,7 @@ class TestTimeCardEditView(BaseTestCase):
         self.assertEqual(self.str2datetime("2023/01/03 07:00", "%Y/%m/%d %H:%M"), stamp_in.stamped_time)
         self.assertEqual(self.str2datetime("2023/01/03 19:00", "%Y/%m/%d %H:%M"), stamp_out.stamped_time)
 
-        self.assertEqual("更新しました", self.client.session["success"])
+        self.assertEqual("更新しました", self.get_toast_msg(response)["success"])
 
     def test_create_failure_by_validation(self):
         """
@@ -253,13 +255,13 @@ class TestTimeCardEditView(BaseTestCase):
 
         self.assertEqual(0, TimeCard.objects.all().count())
 
-        self.assertEqual("更新しました", self.client.session["success"])
+        self.assertEqual("更新しました", self.get_toast_msg(response)["success"])
 
     def test_update_success(self):
         """
         更新処理（入力チェックOK）
         更新されていることを確認
-        セッションのメッセージを確認
+        メッセージを確認
         :return:
         """
         post_data = {
@@ -301,7 +303,7 @@ class TestTimeCardEditView(BaseTestCase):
         self.assertEqual(self.str2datetime("2023/01/04 12:30", "%Y/%m/%d %H:%M"), stamp_break_enter.stamped_time)
         self.assertEqual(self.str2datetime("2023/01/04 13:30", "%Y/%m/%d %H:%M"), stamp_break_out.stamped_time)
 
-        self.assertEqual("更新しました", self.client.session["success"])
+        self.assertEqual("更新しました", self.get_toast_msg(response)["success"])
 
     def test_update_failure_by_validation(self):
         """
@@ -355,7 +357,7 @@ class TestTimeCardEditView(BaseTestCase):
         """
         更新処理
         申請中の打刻情報を更新できないことを確認
-        セッションのエラーメッセージを確認
+        エラーメッセージを確認
         :return:
         """
         post_data = {
@@ -380,7 +382,7 @@ class TestTimeCardEditView(BaseTestCase):
             "form-3-stamped_time_1": "13:30",
             "form-3-kind": TimeCard.Kind.END_BREAK,
         }
-        TimeCard.objects.all().update(state=TimeCard.State.APPROVED)
+        MonthlySubmission.objects.create(user=self.user, month=date(2023, 1, 1), state=MonthlySubmission.State.APPROVED)
 
         response = self.client.post(self.url, data=post_data)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
@@ -398,4 +400,4 @@ class TestTimeCardEditView(BaseTestCase):
         self.assertEqual(self.str2datetime("2023/01/02 12:00", "%Y/%m/%d %H:%M"), stamp_break_enter.stamped_time)
         self.assertEqual(self.str2datetime("2023/01/02 13:00", "%Y/%m/%d %H:%M"), stamp_break_out.stamped_time)
 
-        self.assertEqual("申請中のため編集できません", self.client.session.get("error"))
+        self.assertEqual("申請中のため編集できません", self.get_toast_msg(response).get("error"))
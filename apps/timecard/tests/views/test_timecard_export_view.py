@@ -5,6 +5,8 @@ from io import BytesIO
 import openpyxl
 from django.urls import reverse
 
+from apps.timecard.views import TimeCardExportView
+
 from ..base import BaseTestCase
 
 
@@ -90,6 +92,56 @@ class TestTimeCardExportView(BaseTestCase):
         self.assertEqual("12:00", ws["F7"].value)
         self.assertEqual("13:00", ws["G7"].value)
 
+    def test_write_only_same_as_standard(self):
+        """
+        書き込み専用モードで出力したExcelが通常モードと同じ内容・書式であることを確認
+        :return:
+        """
+        for month in ["202301", "202305"]:
+            write_only_ws = self._get_ws_by_response(month=month)
+
+            TimeCardExportView.WRITE_ONLY = False
+            try:
+                standard_ws = self._get_ws_by_response(month=month)
+            finally:
+                TimeCardExportView.WRITE_ONLY = True
+
+            self.assertEqual(standard_ws.max_row, write_only_ws.max_row)
+            self.assertEqual(standard_ws.max_column, write_only_ws.max_column)
+            self.assertEqual(
+                [str(cell_range) for cell_range in standard_ws.merged_cells.ranges],
+                [str(cell_range) for cell_range in write_only_ws.merged_cells.ranges],
+            )
+            self.assertEqual(standard_ws.page_setup.orientation, write_only_ws.page_setup.orientation)
+
+            for column_letter in "ABCDEFGH":
+                self.assertEqual(
+                    standard_ws.column_dimensions[column_letter].width,
+                    write_only_ws.column_dimensions[column_letter].width,
+                )
+
+            for row_num in range(1, standard_ws.max_row + 1):
+                self.assertEqual(
+                    standard_ws.row_dimensions[row_num].height, write_only_ws.row_dimensions[row_num].height
+                )
+                for col_num in range(1, standard_ws.max_column + 1):
+                    standard_cell = standard_ws.cell(row=row_num, column=col_num)
+                    write_only_cell = write_only_ws.cell(row=row_num, column=col_num)
+                    if standard_cell.value is None and row_num < 5:
+                        # ヘッダーより上の空セルは比較しない
+                        continue
+
+                    self.assertEqual(standard_cell.value, write_only_cell.value)
+                    self.assertEqual(standard_cell.font.sz, write_only_cell.font.sz)
+                    self.assertEqual(standard_cell.font.color, write_only_cell.font.color)
+                    self.assertEqual(standard_cell.fill.fgColor.rgb, write_only_cell.fill.fgColor.rgb)
+                    for side in ["left", "right", "top", "bottom"]:
+                        self.assertEqual(
+                            getattr(getattr(standard_cell.border, side), "style", None),
+                            getattr(getattr(write_only_cell.border, side), "style", None),
+                        )
+                    self.assertEqual(standard_cell.alignment.horizontal, write_only_cell.alignment.horizontal)
+
     def _get_ws_by_response(self, **get_params):
         """
         ダウンロードしたExcelのシート名を確認
@@ -1,8 +1,12 @@
 from http import HTTPStatus
+from io import BytesIO
 
+import openpyxl
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 
 from apps.timecard.forms import UploadFileForm
+from apps.timecard.models import TimeCard
 
 from ..base import BaseTestCase
 
@@ -30,3 +34,93 @@ class TestTimeCardImportView(BaseTestCase):
         upload_form = response.context["upload_form"]
         self.assertIsInstance(upload_form, UploadFileForm)
         self.assertFalse(upload_form.is_valid())
+
+    def test_import_no_change(self):
+        """
+        取込済みの打刻と同じ内容のExcelを取り込む
+        打刻が追加・更新・削除されないことを確認
+        :return:
+        """
+        response = self.client.post(self.url, {"file": self._create_upload_file()}, follow=True)
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertEqual(
+            "2023年01月の取込が成功しました（追加：0件、更新：0件、削除：0件）", self.get_toast_msg(response)["success"]
+        )
+        self.assertEqual([1, 2, 3, 4], list(TimeCard.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_import_diff(self):
+        """
+        変更があった日の打刻のみ追加・更新・削除されることを確認
+        :return:
+        """
+        rows = {
+            2: ["08:30", "19:00", None, None],
+            3: ["09:00", "18:00", None, None],
+        }
+        response = self.client.post(self.url, {"file": self._create_upload_file(rows)}, follow=True)
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertEqual(
+            "2023年01月の取込が成功しました（追加：2件、更新：1件、削除：2件）", self.get_toast_msg(response)["success"]
+        )
+
+        stamps_qs = TimeCard.objects.filter(user=self.user)
+        self.assertEqual(4, stamps_qs.count())
+        self.assertEqual(self.str2datetime("2023/01/02 08:30:00"), stamps_qs.get(id=1).stamped_time)
+        self.assertEqual(self.str2datetime("2023/01/02 19:00:00"), stamps_qs.get(id=2).stamped_time)
+        self.assertFalse(stamps_qs.filter(id__in=[3, 4]).exists())
+        self.assertEqual(
+            self.str2datetime("2023/01/03 09:00:00"), stamps_qs.get(kind=TimeCard.Kind.IN, id__gt=4).stamped_time
+        )
+        self.assertEqual(
+            self.str2datetime("2023/01/03 18:00:00"), stamps_qs.get(kind=TimeCard.Kind.OUT, id__gt=4).stamped_time
+        )
+
+    def test_import_err_report(self):
+        """
+        入力時刻にエラーがあるExcelを取り込む
+        エラーレポートがダウンロードされ、打刻が変更されていないことを確認
+        :return:
+        """
+        rows = {
+            2: ["19:00", "09:00", None, None],
+            3: ["9時", "18:00", None, None],
+        }
+        response = self.client.post(self.url, {"file": self._create_upload_file(rows)})
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertIn("attachment", response.headers.get("Content-Disposition"))
+
+        ws = openpyxl.load_workbook(BytesIO(response.content))["一覧"]
+        self.assertEqual("エラー内容", ws["I5"].value)
+        self.assertEqual("出勤時刻＜退勤時刻で入力してください。", ws["I7"].value)
+        self.assertEqual("フォーマットはHH:MMで入力してください。", ws["I8"].value)
+        self.assertEqual("00FFFF00", ws["D7"].fill.fgColor.rgb)
+        self.assertEqual("00FFFF00", ws["D8"].fill.fgColor.rgb)
+        self.assertEqual("00FFFFFF", ws["E8"].fill.fgColor.rgb)
+
+        self.assertEqual([1, 2, 3, 4], list(TimeCard.objects.order_by("id").values_list("id", flat=True)))
+
+    def _create_upload_file(self, rows=None):
+        """
+        取込用のExcelを作成する
+        :param rows: 日付をキー、[出勤, 退勤, 休憩開始, 休憩終了]を値とする辞書
+        :return::class:`django.core.files.uploadedfile.SimpleUploadedFile`
+        """
+        if rows is None:
+            rows = {2: ["09:00", "19:00", "12:00", "13:00"]}
+
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "一覧"
+        ws["A2"] = "勤務報告書　2023年01月"
+        ws["A4"] = "氏名　テスト2"
+        ws.append(["日付", "曜日", "区分", "出勤", "退勤", "休憩開始", "休憩終了", "備考"])
+        for day in range(1, 32):
+            ws.append([day, "月", "平日"] + rows.get(day, [None, None, None, None]))
+
+        file = BytesIO()
+        wb.save(file)
+        return SimpleUploadedFile(
+            "upload.xlsx",
+            file.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
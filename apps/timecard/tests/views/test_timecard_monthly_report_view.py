@@ -1,12 +1,14 @@
-from datetime import datetime
+from datetime import date, datetime
 from http import HTTPStatus
 
 from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from apps.timecard.forms import TimeCardFormSet
-from apps.timecard.models import TimeCard
+from apps.timecard.models import MonthlySubmission, TimeCard
 
 from ..base import BaseTestCase
 
@@ -84,6 +86,50 @@ class TestTimeCardMonthlyReportView(BaseTestCase):
         self.assertEqual("0:00", monthly_report[2]["work_hours"])
         self.assertEqual("0:00", monthly_report[2]["break_hours"])
 
+    def test_query_count_not_depend_on_work_days(self):
+        """
+        出勤日数が増えても発行されるクエリ数が変わらないことを確認
+        :return:
+        """
+        # 表示月のセッションへの保存は初回のみのため、事前に表示しておく
+        self.client.get(self.url, {"month": "202301"})
+        with CaptureQueriesContext(connection) as one_day_queries:
+            self.client.get(self.url, {"month": "202301"})
+
+        for day in range(3, 31):
+            TimeCard.objects.create(
+                user=self.user,
+                kind=TimeCard.Kind.IN,
+                stamped_time=self.str2datetime("2023/01/{:02} 09:00:00".format(day)),
+            )
+            TimeCard.objects.create(
+                user=self.user,
+                kind=TimeCard.Kind.OUT,
+                stamped_time=self.str2datetime("2023/01/{:02} 18:00:00".format(day)),
+            )
+
+        with CaptureQueriesContext(connection) as many_days_queries:
+            response = self.client.get(self.url, {"month": "202301"})
+
+        self.assertEqual(len(one_day_queries), len(many_days_queries))
+        self.assertEqual("9:00", response.context_data["monthly_report"][29]["work_hours"])
+
+    def test_session_saved_only_when_changed(self):
+        """
+        同じ月を続けて表示する
+        表示月が変わらない場合はセッションを更新せず、変わった場合のみ更新することを確認
+        :return:
+        """
+        self.client.get(self.url, {"month": "202301"})
+
+        with CaptureQueriesContext(connection) as same_month_queries:
+            self.client.get(self.url, {"month": "202301"})
+        self.assertEqual(0, len(self._get_session_write_queries(same_month_queries)))
+
+        with CaptureQueriesContext(connection) as other_month_queries:
+            self.client.get(self.url, {"month": "202302"})
+        self.assertEqual(1, len(self._get_session_write_queries(other_month_queries)))
+
     def test_secondary_access(self):
         """
         他メニュー遷移後の再表示
@@ -111,10 +157,9 @@ class TestTimeCardMonthlyReportView(BaseTestCase):
         self.assertEqual(reverse("timecard:timecard_monthly_report") + "?month=202301", response.redirect_chain[0][0])
         self.assertEqual(HTTPStatus.FOUND.value, response.redirect_chain[0][1])
 
-        self.assertEqual(TimeCard.State.PROCESSING, TimeCard.objects.get(kind=TimeCard.Kind.IN).state)
-        self.assertEqual(TimeCard.State.PROCESSING, TimeCard.objects.get(kind=TimeCard.Kind.OUT).state)
-        self.assertEqual(TimeCard.State.PROCESSING, TimeCard.objects.get(kind=TimeCard.Kind.ENTER_BREAK).state)
-        self.assertEqual(TimeCard.State.PROCESSING, TimeCard.objects.get(kind=TimeCard.Kind.END_BREAK).state)
+        submission = MonthlySubmission.objects.get(user=self.user, month=date(2023, 1, 1))
+        self.assertEqual(MonthlySubmission.State.PROCESSING, submission.state)
+        self.assertIsNotNone(submission.submitted_at)
 
     def test_promote_failure_is_promoted(self):
         """
@@ -123,8 +168,9 @@ class TestTimeCardMonthlyReportView(BaseTestCase):
         打刻情報のステータスが変更されていないことを確認
         :return:
         """
-        self.stamp_in.state = TimeCard.State.PROCESSING
-        self.stamp_in.save()
+        MonthlySubmission.objects.create(
+            user=self.user, month=date(2023, 1, 1), state=MonthlySubmission.State.PROCESSING
+        )
 
         response = self.client.get(self.url, {"month": "202301", "mode": "promote"}, follow=True)
         self.assertEqual("すでに申請済みです", response.context_data["error"])
@@ -132,10 +178,9 @@ class TestTimeCardMonthlyReportView(BaseTestCase):
         self.assertEqual(reverse("timecard:timecard_monthly_report") + "?month=202301", response.redirect_chain[0][0])
         self.assertEqual(HTTPStatus.FOUND.value, response.redirect_chain[0][1])
 
-        self.assertEqual(TimeCard.State.PROCESSING, self.stamp_in.state)
-        self.assertEqual(TimeCard.State.NEW, self.stamp_out.state)
-        self.assertEqual(TimeCard.State.NEW, self.stamp_out.state)
-        self.assertEqual(TimeCard.State.NEW, self.stamp_out.state)
+        self.assertEqual(
+            MonthlySubmission.State.PROCESSING, MonthlySubmission.objects.get_state(self.user, date(2023, 1, 1))
+        )
 
     def test_promote_failure_not_exist_stamp(self):
         """
@@ -165,8 +210,7 @@ class TestTimeCardMonthlyReportView(BaseTestCase):
         self.assertEqual(reverse("timecard:timecard_monthly_report") + "?month=202301", response.redirect_chain[0][0])
         self.assertEqual(HTTPStatus.FOUND.value, response.redirect_chain[0][1])
 
-        self.assertEqual(TimeCard.State.NEW, self.stamp_in.state)
-        self.assertEqual(TimeCard.State.NEW, self.stamp_out.state)
+        self.assertEqual(MonthlySubmission.State.NEW, MonthlySubmission.objects.get_state(self.user, date(2023, 1, 1)))
 
         expected_err_msg = "2日：" + TimeCardFormSet.ERR_MSG_WORK_TIME
         self.assertEqual(expected_err_msg, response.context_data.get("promote_err_msg")[0])
@@ -175,3 +219,7 @@ class TestTimeCardMonthlyReportView(BaseTestCase):
 
         response = self.client.get(self.url + "?month=202301")
         self.assertEqual(expected_err_msg, response.context_data["promote_err_msg"][0])
+
+    def _get_session_write_queries(self, queries):
+        session_write_sql = ('UPDATE "django_session"', 'INSERT INTO "django_session"')
+        return [query for query in queries if query["sql"].startswith(session_write_sql)]
@@ -1,8 +1,17 @@
+import json
+from datetime import date
 from http import HTTPStatus
+from unittest import mock
 
+from django.contrib.messages import get_messages
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import urlsafe_base64_encode
 
-from apps.timecard.models import TimeCard
+from apps.accounts.models import User
+from apps.timecard.models import MonthlySubmission, TimeCard, TimeCardSummary
+from apps.timecard.views import TimeCardProcessMonthListView
 
 from ..base import BaseTestCaseNeedSuperUser
 
@@ -39,7 +48,7 @@ class TestTimeCardProcessMonthListView(BaseTestCaseNeedSuperUser):
         response = self.client.get(self.url)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual(self.template, response.templates[0].name)
-        self.assertEqual(0, response.context_data["month_list"].count())
+        self.assertEqual(0, len(response.context_data["month_list"]))
 
     def test_display_promoted_month(self):
         """
@@ -47,12 +56,12 @@ class TestTimeCardProcessMonthListView(BaseTestCaseNeedSuperUser):
         申請者と申請月が表示されていることを確認
         :return:
         """
-        TimeCard.objects.filter(user=self.user).update(state=TimeCard.State.PROCESSING)
+        self._create_submission(self.user, date(2023, 1, 1))
 
         response = self.client.get(self.url)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual(self.template, response.templates[0].name)
-        self.assertEqual(1, response.context_data["month_list"].count())
+        self.assertEqual(1, len(response.context_data["month_list"]))
         self.assertEqual("テスト2", response.context_data["month_list"][0]["user_name"])
         self.assertEqual("2023年01月", response.context_data["month_list"][0]["date_str"])
 
@@ -61,9 +70,204 @@ class TestTimeCardProcessMonthListView(BaseTestCaseNeedSuperUser):
         ログインユーザーの承認申請が表示されないことを確認
         :return:
         """
-        TimeCard.objects.filter(user=self.user).update(state=TimeCard.State.PROCESSING, user=self.super_user)
+        TimeCard.objects.filter(user=self.user).update(user=self.super_user)
+        self._create_submission(self.super_user, date(2023, 1, 1))
 
         response = self.client.get(self.url)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
         self.assertEqual(self.template, response.templates[0].name)
-        self.assertEqual(0, response.context_data["month_list"].count())
+        self.assertEqual(0, len(response.context_data["month_list"]))
+
+    def test_keyset_pagination(self):
+        """
+        申請が1ページの表示件数を超える
+        (申請月, ユーザー)順に表示され、次のページ・前のページへ移動できることを確認
+        :return:
+        """
+        user3 = User.objects.get(id=3)
+        self._create_submission(user3, date(2023, 2, 1))
+        self._create_submission(self.user, date(2023, 2, 1))
+        self._create_submission(user3, date(2023, 1, 1))
+
+        with mock.patch.object(TimeCardProcessMonthListView, "paginate_by", 2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+            self.assertEqual(
+                [(3, date(2023, 1, 1)), (2, date(2023, 2, 1))],
+                [(month["user"], month["month"]) for month in response.context_data["month_list"]],
+            )
+            self.assertEqual("テスト3", response.context_data["month_list"][0]["user_name"])
+            self.assertEqual(1, len([query for query in queries if 'FROM "monthly_submission"' in query["sql"]]))
+            self.assertFalse(response.context_data["page_obj"].has_previous())
+
+            response = self.client.get(self.url + response.context_data["page_obj"].next_query)
+            self.assertEqual(
+                [(3, date(2023, 2, 1))],
+                [(month["user"], month["month"]) for month in response.context_data["month_list"]],
+            )
+            self.assertFalse(response.context_data["page_obj"].has_next())
+
+            response = self.client.get(self.url + response.context_data["page_obj"].previous_query)
+            self.assertEqual(
+                [(3, date(2023, 1, 1)), (2, date(2023, 2, 1))],
+                [(month["user"], month["month"]) for month in response.context_data["month_list"]],
+            )
+
+    def test_keyset_pagination_tampered_cursor(self):
+        """
+        改ざんされたカーソルでページを移動する
+        申請月・ユーザーの型に変換できない場合は、エラーにならず先頭のページが表示されることを確認
+        :return:
+        """
+        user3 = User.objects.get(id=3)
+        self._create_submission(user3, date(2023, 2, 1))
+        self._create_submission(self.user, date(2023, 2, 1))
+        self._create_submission(user3, date(2023, 1, 1))
+
+        with mock.patch.object(TimeCardProcessMonthListView, "paginate_by", 2):
+            for values in [
+                ["2023-13-01", 2],
+                ["2023-01-01", "abc"],
+                [["2023-01-01"], 2],
+                [20230101, 2],
+                [None, 2],
+                [{"month": "2023-01-01"}, 2],
+            ]:
+                for key in ["after", "before"]:
+                    cursor = urlsafe_base64_encode(json.dumps(values).encode())
+                    response = self.client.get(self.url, {key: cursor})
+                    self.assertEqual(HTTPStatus.OK, response.status_code)
+                    self.assertEqual(
+                        [(3, date(2023, 1, 1)), (2, date(2023, 2, 1))],
+                        [(month["user"], month["month"]) for month in response.context_data["month_list"]],
+                    )
+                    self.assertFalse(response.context_data["page_obj"].has_previous())
+
+    def test_filter_by_name_and_state(self):
+        """
+        申請者名・ステータスで絞り込みを行う
+        条件に合う申請のみ表示され、申請中以外は承認対象にならないことを確認
+        :return:
+        """
+        user4 = User.objects.create(email="test4@example.com", name="別ユーザー4")
+        self._create_submission(self.user, date(2023, 1, 1))
+        self._create_submission(user4, date(2023, 1, 1))
+        self._create_submission(User.objects.get(id=3), date(2023, 1, 1), MonthlySubmission.State.APPROVED)
+
+        response = self.client.get(self.url, {"name": "テスト", "state": MonthlySubmission.State.PROCESSING})
+        self.assertEqual([2], [month["user"] for month in response.context_data["month_list"]])
+
+        response = self.client.get(self.url, {"name": "", "state": MonthlySubmission.State.APPROVED})
+        self.assertEqual([3], [month["user"] for month in response.context_data["month_list"]])
+        self.assertEqual("承認済み", response.context_data["month_list"][0]["state"])
+        self.assertFalse(response.context_data["month_list"][0]["can_approve"])
+
+        response = self.client.get(self.url, {"name": "", "state": ""})
+        self.assertEqual([2, 3, 4], [month["user"] for month in response.context_data["month_list"]])
+
+    def test_bulk_approve(self):
+        """
+        複数の申請をまとめて承認する
+        選択した申請が承認済みになり、サマリがまとめて作成されることを確認
+        :return:
+        """
+        user3 = User.objects.get(id=3)
+        for stamp in TimeCard.objects.filter(user=self.user):
+            TimeCard.objects.create(user=user3, kind=stamp.kind, stamped_time=self.str2datetime("2023/02/01 09:00:00"))
+            TimeCard.objects.create(user=user3, kind=stamp.kind, stamped_time=self.str2datetime("2023/03/01 09:00:00"))
+        self._create_submission(self.user, date(2023, 1, 1))
+        self._create_submission(user3, date(2023, 2, 1))
+        self._create_submission(user3, date(2023, 3, 1))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"submission": ["2_202301", "3_202302", "3_202303"]}, follow=True)
+        self.assertEqual(HTTPStatus.OK.value, response.status_code)
+        self.assertEqual("3件承認しました", response.context_data["success"])
+        self.assertEqual(0, len(response.context_data["month_list"]))
+
+        self.assertFalse(MonthlySubmission.objects.exclude(state=MonthlySubmission.State.APPROVED).exists())
+        summary = TimeCardSummary.objects.get(user=self.user, month=date(2023, 1, 1))
+        self.assertEqual("9.0", summary.total_work_hours)
+        self.assertEqual("1.0", summary.total_break_hours)
+        self.assertEqual(1 << 1, summary.work_days_flag)
+        self.assertEqual(
+            [date(2023, 2, 1), date(2023, 3, 1)],
+            list(TimeCardSummary.objects.filter(user=user3).order_by("month").values_list("month", flat=True)),
+        )
+
+        summary_inserts = [query for query in queries if query["sql"].startswith('INSERT INTO "timecard_summary"')]
+        self.assertEqual(1, len(summary_inserts))
+        self.assertEqual(0, len([query for query in queries if query["sql"].startswith('UPDATE "timecard"')]))
+
+    def test_bulk_approve_partial_failure(self):
+        """
+        承認できない申請を含めてまとめて承認する
+        承認できる申請のみ承認され、失敗した申請が理由とともに表示されることを確認
+        :return:
+        """
+        self._create_submission(self.user, date(2023, 1, 1))
+        self._create_submission(self.super_user, date(2023, 1, 1))
+        self._create_submission(User.objects.get(id=3), date(2023, 1, 1), MonthlySubmission.State.APPROVED)
+
+        response = self.client.post(
+            self.url, {"submission": ["2_202301", "2_202302", "3_202301", "1_202301", "invalid"]}, follow=True
+        )
+        self.assertEqual("1件承認しました", response.context_data["success"])
+        self.assertEqual("3件の承認に失敗しました", response.context_data["error"])
+        self.assertEqual(
+            [
+                "テスト1 2023年01月：自身の勤怠は承認できません",
+                "テスト2 2023年02月：申請中の勤怠情報が存在しません",
+                "テスト3 2023年01月：承認済みの勤怠です",
+            ],
+            sorted(self._get_failure_msg_list(response)),
+        )
+        self.assertContains(response, '<h6 class="text-danger">テスト3 2023年01月：承認済みの勤怠です</h6>', html=True)
+        self.assertTrue(TimeCardSummary.objects.filter(user=self.user, month=date(2023, 1, 1)).exists())
+        self.assertEqual(
+            MonthlySubmission.State.PROCESSING, MonthlySubmission.objects.get_state(self.super_user, date(2023, 1, 1))
+        )
+
+    def test_bulk_approve_fallback_each(self):
+        """
+        まとめての承認中にエラーが発生する
+        1件ずつ承認し直し、エラーになった申請以外は承認されることを確認
+        :return:
+        """
+        self._create_submission(self.user, date(2023, 1, 1))
+        self._create_submission(User.objects.get(id=3), date(2023, 1, 1))
+        bulk_create = TimeCardSummary.objects.bulk_create
+
+        def bulk_create_fail_user3(summary_list):
+            if any(summary.user_id == 3 for summary in summary_list):
+                raise IntegrityError
+            return bulk_create(summary_list)
+
+        with mock.patch.object(TimeCardSummary.objects, "bulk_create", side_effect=bulk_create_fail_user3):
+            response = self.client.post(self.url, {"submission": ["2_202301", "3_202301"]}, follow=True)
+
+        self.assertEqual("1件承認しました", response.context_data["success"])
+        self.assertEqual(["テスト3 2023年01月：承認処理に失敗しました"], self._get_failure_msg_list(response))
+        self.assertEqual(
+            MonthlySubmission.State.APPROVED, MonthlySubmission.objects.get_state(self.user, date(2023, 1, 1))
+        )
+        self.assertEqual(MonthlySubmission.State.PROCESSING, MonthlySubmission.objects.get_state(3, date(2023, 1, 1)))
+
+    def test_bulk_approve_not_selected(self):
+        """
+        申請を選択せずに承認する
+        エラーメッセージが表示されることを確認
+        :return:
+        """
+        response = self.client.post(self.url, follow=True)
+        self.assertEqual("承認する勤怠を選択してください", response.context_data["error"])
+
+    def _get_failure_msg_list(self, response):
+        return [
+            message.message
+            for message in get_messages(response.wsgi_request)
+            if message.extra_tags == TimeCardProcessMonthListView.FAILURE_MESSAGE_TAG
+        ]
+
+    def _create_submission(self, user, month, state=MonthlySubmission.State.PROCESSING):
+        return MonthlySubmission.objects.create(user=user, month=month, state=state)
@@ -3,7 +3,7 @@ from http import HTTPStatus
 
 from django.urls import reverse
 
-from apps.timecard.models import TimeCard
+from apps.timecard.models import MonthlySubmission, TimeCard, TimeCardSummary
 
 from ..base import BaseTestCaseNeedSuperUser
 
@@ -78,7 +78,9 @@ class TestTimeCardProcessMonthlyReportView(BaseTestCaseNeedSuperUser):
         `申請中`のデータが表示されることを確認
         :return:
         """
-        TimeCard.objects.all().update(state=TimeCard.State.PROCESSING)
+        MonthlySubmission.objects.create(
+            user=self.user, month=datetime(2023, 1, 1).date(), state=MonthlySubmission.State.PROCESSING
+        )
 
         response = self.client.get(self.url, {"user": self.user.id, "month": "202301"}, follow=True)
         self.assertEqual(HTTPStatus.OK.value, response.status_code)
@@ -117,7 +119,9 @@ class TestTimeCardProcessMonthlyReportView(BaseTestCaseNeedSuperUser):
         打刻情報のステータスが`承認済み`に変更されていることを確認
         :return:
         """
-        TimeCard.objects.all().update(state=TimeCard.State.PROCESSING)
+        MonthlySubmission.objects.create(
+            user=self.user, month=datetime(2023, 1, 1).date(), state=MonthlySubmission.State.PROCESSING
+        )
 
         response = self.client.get(self.url, {"user": self.user.id, "month": "202301", "mode": "promote"}, follow=True)
         self.assertEqual("承認しました", response.context_data["success"])
@@ -126,10 +130,14 @@ class TestTimeCardProcessMonthlyReportView(BaseTestCaseNeedSuperUser):
         self.assertEqual(self.redirect_url, response.redirect_chain[0][0])
         self.assertEqual(HTTPStatus.FOUND.value, response.redirect_chain[0][1])
 
-        self.assertEqual(TimeCard.State.APPROVED, TimeCard.objects.get(kind=TimeCard.Kind.IN).state)
-        self.assertEqual(TimeCard.State.APPROVED, TimeCard.objects.get(kind=TimeCard.Kind.OUT).state)
-        self.assertEqual(TimeCard.State.APPROVED, TimeCard.objects.get(kind=TimeCard.Kind.ENTER_BREAK).state)
-        self.assertEqual(TimeCard.State.APPROVED, TimeCard.objects.get(kind=TimeCard.Kind.END_BREAK).state)
+        submission = MonthlySubmission.objects.get(user=self.user, month=datetime(2023, 1, 1).date())
+        self.assertEqual(MonthlySubmission.State.APPROVED, submission.state)
+        self.assertIsNotNone(submission.approved_at)
+
+        summary = TimeCardSummary.objects.get(user=self.user, month=datetime(2023, 1, 1).date())
+        self.assertEqual("9.0", summary.total_work_hours)
+        self.assertEqual("1.0", summary.total_break_hours)
+        self.assertEqual(1 << 1, summary.work_days_flag)
 
     def test_promote_failure_own_record(self):
         """
@@ -154,7 +162,9 @@ class TestTimeCardProcessMonthlyReportView(BaseTestCaseNeedSuperUser):
         打刻情報のステータスが`新規`に変更されていることを確認
         :return:
         """
-        TimeCard.objects.all().update(state=TimeCard.State.PROCESSING)
+        MonthlySubmission.objects.create(
+            user=self.user, month=datetime(2023, 1, 1).date(), state=MonthlySubmission.State.PROCESSING
+        )
 
         response = self.client.get(self.url, {"user": self.user.id, "month": "202301", "mode": "demote"}, follow=True)
         self.assertEqual("差し戻しました", response.context_data["success"])
@@ -163,7 +173,6 @@ class TestTimeCardProcessMonthlyReportView(BaseTestCaseNeedSuperUser):
         self.assertEqual(self.redirect_url, response.redirect_chain[0][0])
         self.assertEqual(HTTPStatus.FOUND.value, response.redirect_chain[0][1])
 
-        self.assertEqual(TimeCard.State.NEW, TimeCard.objects.get(kind=TimeCard.Kind.IN).state)
-        self.assertEqual(TimeCard.State.NEW, TimeCard.objects.get(kind=TimeCard.Kind.OUT).state)
-        self.assertEqual(TimeCard.State.NEW, TimeCard.objects.get(kind=TimeCard.Kind.ENTER_BREAK).state)
-        self.assertEqual(TimeCard.State.NEW, TimeCard.objects.get(kind=TimeCard.Kind.END_BREAK).state)
+        self.assertEqual(
+            MonthlySubmission.State.NEW, MonthlySubmission.objects.get_state(self.user, datetime(2023, 1, 1).date())
+        )
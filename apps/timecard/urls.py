@@ -1,19 +1,24 @@
 from django.urls import path
 
-from apps.timecard.views import (DashboardView, TimeCardApprovedMonthListView,
+from apps.timecard.views import (DashboardView, DatabasePoolStatsView,
+                                 TimeCardApprovedMonthListView,
                                  TimeCardApprovedMonthlyReportView,
-                                 TimeCardEditView, TimeCardExportView,
-                                 TimeCardImportView, TimeCardMonthlyReportView,
+                                 TimeCardBulkExportView, TimeCardEditView,
+                                 TimeCardExportView, TimeCardImportView,
+                                 TimeCardMonthlyReportView,
                                  TimeCardProcessMonthListView,
-                                 TimeCardProcessMonthlyReportView)
+                                 TimeCardProcessMonthlyReportView,
+                                 WorkConditionView)
 
 app_name = "apps.timecard"
 
 urlpatterns = [
     path("", DashboardView.as_view(), name="dashboard"),
+    path("work_condition", WorkConditionView.as_view(), name="work_condition"),
     path("monthly_report", TimeCardMonthlyReportView.as_view(), name="timecard_monthly_report"),
     path("edit", TimeCardEditView.as_view(), name="timecard_edit"),
     path("export", TimeCardExportView.as_view(), name="timecard_export"),
+    path("bulk_export", TimeCardBulkExportView.as_view(), name="timecard_bulk_export"),
     path("upload", TimeCardImportView.as_view(), name="timecard_upload"),
     path("process_month_list", TimeCardProcessMonthListView.as_view(), name="timecard_process_month_list"),
     path("process_monthly_report", TimeCardProcessMonthlyReportView.as_view(), name="timecard_process_monthly_report"),
@@ -21,4 +26,5 @@ urlpatterns = [
     path(
         "approved_monthly_report", TimeCardApprovedMonthlyReportView.as_view(), name="timecard_approved_monthly_report"
     ),
+    path("db_pool_stats", DatabasePoolStatsView.as_view(), name="db_pool_stats"),
 ]
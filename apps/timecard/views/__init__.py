@@ -1,4 +1,6 @@
-from .dashboard import DashboardView
+from .bulk_export import TimeCardBulkExportView
+from .dashboard import DashboardView, WorkConditionView
+from .monitoring import DatabasePoolStatsView
 from .timecard import (TimeCardApprovedMonthListView,
                        TimeCardApprovedMonthlyReportView, TimeCardEditView,
                        TimeCardExportView, TimeCardImportView,
@@ -7,8 +9,11 @@ from .timecard import (TimeCardApprovedMonthListView,
 
 __all__ = [
     "DashboardView",
+    "WorkConditionView",
+    "DatabasePoolStatsView",
     "TimeCardMonthlyReportView",
     "TimeCardExportView",
+    "TimeCardBulkExportView",
     "TimeCardImportView",
     "TimeCardProcessMonthListView",
     "TimeCardProcessMonthlyReportView",
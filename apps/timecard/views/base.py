@@ -1,23 +1,35 @@
+import json
 import re
 from datetime import timedelta
+from itertools import groupby
 
-import jpholiday
+import openpyxl
 from dateutil.relativedelta import relativedelta
+from django.contrib import messages
 from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin
-from django.db.models.functions import TruncDay
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.views import generic
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import (Alignment, Border, Font, NamedStyle, PatternFill,
+                             Side)
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.worksheet.cell_range import CellRange
 
-from apps.timecard.models import TimeCard
+from apps.timecard.models import DailyAttendance, MonthlySubmission, TimeCard
+from apps.timecard.month_calendar import get_calendar_day, get_month_calendar
 
 
 class TemplateView(LoginRequiredMixin, generic.TemplateView):
     login_url = reverse_lazy("accounts:login")
 
     def get_context_data(self):
-        return get_toast_msg_by_session(self.request.session)
+        return get_toast_msg(self.request)
 
 
 class ListView(LoginRequiredMixin, generic.ListView):
@@ -35,6 +47,131 @@ class SuperuserPermissionView(AccessMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
+class KeysetPage:
+    def __init__(self, object_list, next_query=None, previous_query=None):
+        self.object_list = object_list
+        self.next_query = next_query
+        self.previous_query = previous_query
+
+    def has_next(self):
+        return self.next_query is not None
+
+    def has_previous(self):
+        return self.previous_query is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+# OFFSETを使わず、直前のページの末尾の行より後ろを取得するページング
+# 並び順は最後に一意なフィールドを含めること（先頭の-は降順）
+class KeysetPaginationMixin:
+    paginate_by = 50
+    keyset_ordering = ["pk"]
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_keyset_ordering()
+        after = self._decode_cursor(self.request.GET.get("after"), ordering, queryset)
+        before = self._decode_cursor(self.request.GET.get("before"), ordering, queryset)
+
+        if before is not None:
+            # 前のページは並び順を反転して取得し、表示用に戻す
+            queryset = queryset.filter(self._get_keyset_condition(ordering, before, True))
+            queryset = queryset.order_by(*[self._reverse_field(field) for field in ordering])
+        elif after is not None:
+            queryset = queryset.filter(self._get_keyset_condition(ordering, after)).order_by(*ordering)
+        else:
+            queryset = queryset.order_by(*ordering)
+
+        # 1件多く取得し、次のページの有無を判定する
+        object_list = list(queryset[: page_size + 1])
+        has_more = len(object_list) > page_size
+        object_list = object_list[:page_size]
+        if before is not None:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, after is not None
+
+        next_query = previous_query = None
+        if object_list and has_next:
+            next_query = self._get_page_query("after", self._get_keyset_values(object_list[-1], ordering))
+        if object_list and has_previous:
+            previous_query = self._get_page_query("before", self._get_keyset_values(object_list[0], ordering))
+
+        page = KeysetPage(object_list, next_query, previous_query)
+        return None, page, object_list, page.has_other_pages()
+
+    def _get_keyset_condition(self, ordering, values, reverse=False):
+        # (a, b) > (x, y) を a > x OR (a = x AND b > y) に展開する
+        condition = Q(pk__in=[])
+        for index, field in enumerate(ordering):
+            lookup = "gt" if field.startswith("-") == reverse else "lt"
+            field_condition = Q(**{"{}__{}".format(field.lstrip("-"), lookup): values[index]})
+            for equal_field, value in zip(ordering[:index], values):
+                field_condition &= Q(**{equal_field.lstrip("-"): value})
+            condition |= field_condition
+
+        return condition
+
+    def _reverse_field(self, field):
+        return field[1:] if field.startswith("-") else "-" + field
+
+    def _get_keyset_values(self, obj, ordering):
+        values = []
+        for field in ordering:
+            value = obj
+            for attr in field.lstrip("-").split("__"):
+                value = value[attr] if isinstance(value, dict) else getattr(value, attr)
+            values.append(value)
+
+        return values
+
+    def _get_page_query(self, key, values):
+        query_dict = self.request.GET.copy()
+        query_dict.pop("after", None)
+        query_dict.pop("before", None)
+        query_dict[key] = urlsafe_base64_encode(json.dumps(values, cls=DjangoJSONEncoder).encode())
+        return "?" + query_dict.urlencode()
+
+    def _decode_cursor(self, cursor, ordering, queryset):
+        if not cursor:
+            return
+
+        try:
+            values = json.loads(urlsafe_base64_decode(cursor))
+        except ValueError:
+            return
+
+        if not isinstance(values, list) or len(values) != len(ordering):
+            return
+
+        # 並び順のフィールドの型に変換できない値を含むカーソルは無視し、先頭のページを表示する
+        try:
+            return [self._to_field_value(queryset, field, value) for field, value in zip(ordering, values)]
+        except (TypeError, ValueError, ValidationError, FieldDoesNotExist):
+            return
+
+    def _to_field_value(self, queryset, field, value):
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError(value)
+
+        field = field.lstrip("-")
+        if field in queryset.query.annotations:
+            # 集計などで追加した列はDB側の型に変換する
+            return queryset.query.annotations[field].output_field.to_python(value)
+
+        model = queryset.model
+        for name in field.split("__"):
+            model_field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            model = model_field.related_model
+
+        return model_field.to_python(value)
+
+
 class TimeCardBaseMonthlyReportView(TemplateView):
     model = TimeCard
     template_name = None
@@ -61,11 +198,11 @@ class TimeCardBaseMonthlyReportView(TemplateView):
         return EOM_by_url.astimezone(timezone.get_default_timezone())
 
     def get_context_data(self):
-        monthly_stamps_qs = self.get_queryset()
+        self.monthly_stamps = self._get_monthly_stamps()
 
         context = super().get_context_data()
-        context["monthly_report"] = self._get_monthly_report(monthly_stamps_qs)
-        context["state"] = self._get_state(monthly_stamps_qs)
+        context["monthly_report"] = self._get_monthly_report(self.monthly_stamps)
+        context["state"] = self._get_state()
         context["BOM"] = (self.EOM_by_url + relativedelta(day=1)).date()
         context["EOM"] = self.EOM_by_url.date()
 
@@ -79,34 +216,28 @@ class TimeCardBaseMonthlyReportView(TemplateView):
         ).order_by("stamped_time")
         return monthly_stamps_qs
 
-    def _get_state(self, monthly_stamps_qs):
-        if monthly_stamps_qs.filter(state=TimeCard.State.APPROVED).exists():
-            return TimeCard.State.APPROVED
-        elif monthly_stamps_qs.filter(state=TimeCard.State.PROCESSING).exists():
-            return TimeCard.State.PROCESSING
+    def _get_monthly_stamps(self):
+        return MonthlyStamps.from_daily_attendance(self.request.user, self.EOM_by_url + relativedelta(day=1))
 
-        return TimeCard.State.NEW
+    def _get_state(self):
+        return MonthlySubmission.objects.get_state(self.request.user, (self.EOM_by_url + relativedelta(day=1)).date())
 
-    def _get_monthly_report(self, monthly_stamps_qs):
+    def _get_monthly_report(self, monthly_stamps):
         self.total_work_hours = self.total_break_hours = timedelta()
 
-        day_count = self.EOM_by_url.day
-        work_days_list = self._get_work_days_by_qs(monthly_stamps_qs)
+        work_days_list = monthly_stamps.work_days
 
         monthly_report = []
-        for day_index in range(day_count):
+        for calendar_day in self._get_month_calendar():
             start_work = end_work = enter_break = end_break = ""
             work_hours = break_hours = timedelta()
 
-            day = day_index + 1
-            DOW = self._get_DOW(day)
-            day_kind = self._get_day_kind(DOW, day)
-            date = (self.EOM_by_url + relativedelta(day=day)).strftime("%m/%d") + "({})".format(DOW)
-            holiday_name = jpholiday.is_holiday_name(self.EOM_by_url + relativedelta(day=day))
+            day = calendar_day.date.day
+            date = calendar_day.date.strftime("%m/%d") + "({})".format(calendar_day.DOW)
 
             if day in work_days_list:
-                start_work, end_work, enter_break, end_break = self._get_daily_stamps_info(monthly_stamps_qs, day)
-                work_hours, break_hours = self._calculation_hours_daily(start_work, end_work, enter_break, end_break)
+                start_work, end_work, enter_break, end_break = monthly_stamps.get_daily_stamps_info(day)
+                work_hours, break_hours = monthly_stamps.get_daily_hours(day)
 
             self.total_work_hours += work_hours
             self.total_break_hours += break_hours
@@ -119,71 +250,16 @@ class TimeCardBaseMonthlyReportView(TemplateView):
                     "end_work": end_work,
                     "enter_break": enter_break,
                     "end_break": end_break,
-                    "holiday_name": holiday_name,
+                    "holiday_name": calendar_day.holiday_name,
                     "work_hours": self._timedelta2str(work_hours),
                     "break_hours": self._timedelta2str(break_hours),
-                    "day_kind": day_kind,
+                    "day_kind": calendar_day.day_kind,
                 }
             )
         return monthly_report
 
-    def _get_daily_stamps_info(self, monthly_stamps_qs, day):
-        daily_stamps_qs = monthly_stamps_qs.filter(
-            stamped_time__gte=(self.EOM_by_url + relativedelta(day=day)),
-            stamped_time__lt=(self.EOM_by_url + relativedelta(day=day) + relativedelta(days=1)),
-        )
-
-        start_work_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.IN).first()
-        end_work_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.OUT).first()
-        enter_break_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.ENTER_BREAK).first()
-        end_break_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.END_BREAK).first()
-
-        start_work = start_work_obj.stamped_time if start_work_obj else ""
-        end_work = end_work_obj.stamped_time if end_work_obj else ""
-        enter_break = enter_break_obj.stamped_time if enter_break_obj else ""
-        end_break = end_break_obj.stamped_time if end_break_obj else ""
-
-        return start_work, end_work, enter_break, end_break
-
-    def _calculation_hours_daily(self, start_work, end_work, enter_break, end_break):
-        try:
-            work_hours = break_hours = timedelta()
-            if start_work and end_work and start_work < end_work:
-                work_hours = end_work - start_work
-
-            if enter_break and end_break and enter_break < end_break:
-                break_hours = end_break - enter_break
-
-            if break_hours > timedelta() and work_hours > break_hours:
-                work_hours -= break_hours
-
-            return work_hours, break_hours
-        except:
-            return timedelta(), timedelta()
-
-    def _get_DOW(self, day):
-        week = {1: "月", 2: "火", 3: "水", 4: "木", 5: "金", 6: "土", 7: "日"}
-        DOW_int = (self.EOM_by_url + relativedelta(day=day)).isoweekday()
-        return week[DOW_int]
-
-    def _get_day_kind(self, DOW, day):
-        date = self.EOM_by_url + relativedelta(day=day)
-        if jpholiday.is_holiday(date):
-            return "祝日"
-        if DOW in ["土", "日"]:
-            return "休日"
-
-        return "平日"
-
-    def _get_work_days_by_qs(self, monthly_stamps_qs):
-        work_days = [
-            stamp_qs["datetime"].day
-            for stamp_qs in monthly_stamps_qs.annotate(datetime=TruncDay("stamped_time"))
-            .values("datetime")
-            .order_by("datetime")
-            .distinct()
-        ]
-        return work_days
+    def _get_month_calendar(self):
+        return get_month_calendar(self.EOM_by_url.year, self.EOM_by_url.month)
 
     def _timedelta2str(self, timedelta):
         if isinstance(timedelta, str):
@@ -196,6 +272,60 @@ class TimeCardBaseMonthlyReportView(TemplateView):
         pass
 
 
+# 対象月の日次勤怠を1回のクエリで取得し、日ごとに振り分けて保持する
+class MonthlyStamps:
+    def __init__(self, BOM):
+        self.BOM = BOM
+        self.work_days = []
+        self.daily_stamps_dict = {}
+        self.daily_hours_dict = {}
+
+    @classmethod
+    def from_daily_attendance(cls, user, BOM):
+        monthly_stamps = cls(BOM)
+        monthly_stamps.add_daily_attendance(
+            DailyAttendance.objects.filter(
+                user=user, date__range=(BOM.date(), (BOM + relativedelta(months=1, days=-1)).date())
+            )
+        )
+
+        return monthly_stamps
+
+    @classmethod
+    def iter_daily_attendance_by_user(cls, daily_attendance_qs, BOM):
+        # ユーザーごとの日次勤怠を1回のクエリで順に取得する
+        attendances = daily_attendance_qs.order_by("user", "date")
+        for user_id, user_attendances in groupby(attendances.iterator(), key=lambda attendance: attendance.user_id):
+            monthly_stamps = cls(BOM)
+            monthly_stamps.add_daily_attendance(user_attendances)
+            yield user_id, monthly_stamps
+
+    def add_daily_attendance(self, attendances):
+        work_days = set(self.work_days)
+        for attendance in attendances:
+            day = attendance.date.day
+            work_days.add(day)
+            self.daily_stamps_dict[day] = [
+                attendance.start_work or "",
+                attendance.end_work or "",
+                attendance.enter_break or "",
+                attendance.end_break or "",
+            ]
+            self.daily_hours_dict[day] = (attendance.work_hours, attendance.break_hours)
+
+        self.work_days = sorted(work_days)
+
+    def get_daily_stamps_info(self, day):
+        start_work, end_work, enter_break, end_break = self.daily_stamps_dict.get(day, ["", "", "", ""])
+        return start_work, end_work, enter_break, end_break
+
+    def get_daily_hours(self, day):
+        if day in self.daily_hours_dict:
+            return self.daily_hours_dict[day]
+
+        return calculation_hours_daily(*self.get_daily_stamps_info(day))
+
+
 class ExcelHandleView(View):
     template_name = None
 
@@ -228,6 +358,124 @@ class ExcelHandleView(View):
     LIGHT_PINK = "E0B9B8"
     LIGHT_GREEN = "DBE3C0"
 
+    # 書き込み専用モードで共有するスタイル
+    CELL_FONT = Font(name=FONT_NAME, size=9)
+    CELL_BORDER = Border(
+        top=Side(style="thin", color=BLACK),
+        bottom=Side(style="thin", color=BLACK),
+        left=Side(style="thin", color=BLACK),
+        right=Side(style="thin", color=BLACK),
+    )
+    CELL_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrapText=True)
+    NAMED_STYLES = {
+        "timecard_title": {"font": Font(name=FONT_NAME, size=12)},
+        "timecard_header": {
+            "font": CELL_FONT,
+            "fill": PatternFill(patternType="solid", fgColor=LIGHT_GREEN),
+            "border": CELL_BORDER,
+            "alignment": CELL_ALIGNMENT,
+        },
+        "timecard_body": {"font": CELL_FONT, "border": CELL_BORDER, "alignment": CELL_ALIGNMENT},
+        "timecard_holiday": {
+            "font": Font(color=RED, name=FONT_NAME, size=9),
+            "border": CELL_BORDER,
+            "alignment": CELL_ALIGNMENT,
+        },
+        "timecard_" + LIGHT_PINK: {
+            "font": CELL_FONT,
+            "fill": PatternFill(patternType="solid", fgColor=LIGHT_PINK),
+            "border": CELL_BORDER,
+            "alignment": CELL_ALIGNMENT,
+        },
+        "timecard_" + LIGHT_BLUE: {
+            "font": CELL_FONT,
+            "fill": PatternFill(patternType="solid", fgColor=LIGHT_BLUE),
+            "border": CELL_BORDER,
+            "alignment": CELL_ALIGNMENT,
+        },
+    }
+    TITLE_ROW_HEIGHT = 20
+
+    def _setup_page_ws(self, ws):
+        ws.page_setup.orientation = "landscape"
+        ws.page_setup.fitToWidth = 1
+        ws.page_setup.fitToHeight = 0
+        ws.sheet_properties.pageSetUpPr.fitToPage = True
+
+    def _create_write_only_wb(self, headline, user_name, rows):
+        wb = openpyxl.Workbook(write_only=True)
+        for name, style_kwargs in self.NAMED_STYLES.items():
+            wb.add_named_style(NamedStyle(name=name, **style_kwargs))
+
+        ws = wb.create_sheet(self.SHEET_TITLE)
+        self._setup_page_ws(ws)
+
+        # 書き込み専用モードでは列幅と行の高さを先に設定する
+        # 結合される'区分'のヘッダーは空にする
+        header = [
+            None if col_num == self.DAY_KIND_COL_NUM else value for col_num, value in enumerate(self.SHEET_HEADER, 1)
+        ]
+        self._set_col_width_ws(ws, [header] + rows)
+        for coordinate in (self.TITLE_CELL, self.USER_NAME_CELL):
+            ws.row_dimensions[coordinate_to_tuple(coordinate)[0]].height = self.TITLE_ROW_HEIGHT
+
+        ws.merged_cells.add(
+            CellRange(
+                min_row=self.HEADER_ROW_NUM,
+                min_col=self.DOW_COL_NUM,
+                max_row=self.HEADER_ROW_NUM,
+                max_col=self.DAY_KIND_COL_NUM,
+            )
+        )
+
+        title_cells = {
+            coordinate_to_tuple(self.TITLE_CELL)[0]: headline,
+            coordinate_to_tuple(self.USER_NAME_CELL)[0]: user_name,
+        }
+        for row_num in range(1, self.HEADER_ROW_NUM):
+            if row_num in title_cells:
+                ws.append([self._write_only_cell(ws, title_cells[row_num], "timecard_title")])
+            else:
+                ws.append([])
+
+        ws.append([self._write_only_cell(ws, value, "timecard_header") for value in header])
+        for row in rows:
+            ws.append(
+                [
+                    self._write_only_cell(ws, value, self._get_cell_style(col_num, row))
+                    for col_num, value in enumerate(row, 1)
+                ]
+            )
+
+        return wb
+
+    def _write_only_cell(self, ws, value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    def _get_cell_style(self, col_num, row):
+        day_kind = row[self.DAY_KIND_COL_NUM - 1]
+        DOW = row[self.DOW_COL_NUM - 1]
+        if col_num in (self.DAY_COL_NUM, self.DOW_COL_NUM) and day_kind in ["休日", "祝日"]:
+            return "timecard_" + self._get_cell_color(day_kind, DOW)
+
+        if row[col_num - 1] == "祝日":
+            return "timecard_holiday"
+
+        return "timecard_body"
+
+    def _set_col_width_ws(self, ws, rows):
+        # ヘッダー以下の文字数に応じて幅を調整する
+        max_char_length_dict = {}
+        for row in rows:
+            for col_num, value in enumerate(row, 1):
+                if value:
+                    max_char_length_dict[col_num] = max(max_char_length_dict.get(col_num, 0), len(str(value)))
+
+        for col_num, max_char_length in max_char_length_dict.items():
+            ws.column_dimensions[get_column_letter(col_num)].width = max_char_length * 1.5 + 2
+
     def _adjust_col_width_ws(self, ws):
         for column in ws.columns:
             column_letter = column[0].column_letter
@@ -283,33 +531,7 @@ class ExcelHandleView(View):
 
 
 def get_DOW(datetime) -> str:
-    week = {1: "月", 2: "火", 3: "水", 4: "木", 5: "金", 6: "土", 7: "日"}
-    DOW_int = datetime.isoweekday()
-    return week[DOW_int]
-
-
-def get_work_days_by_qs(stamps_qs) -> list:
-    work_days = [
-        stamp_qs["datetime"].day
-        for stamp_qs in stamps_qs.annotate(datetime=TruncDay("stamped_time")).values("datetime").distinct()
-    ]
-    return work_days
-
-
-def get_daily_stamps_info(stamps_qs, date):
-    daily_stamps_qs = stamps_qs.filter(stamped_time__gte=date, stamped_time__lt=date + relativedelta(days=1))
-
-    start_work_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.IN).first()
-    end_work_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.OUT).first()
-    enter_break_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.ENTER_BREAK).first()
-    end_break_obj = daily_stamps_qs.filter(kind=TimeCard.Kind.END_BREAK).first()
-
-    start_work = start_work_obj.stamped_time if start_work_obj else ""
-    end_work = end_work_obj.stamped_time if end_work_obj else ""
-    enter_break = enter_break_obj.stamped_time if enter_break_obj else ""
-    end_break = end_break_obj.stamped_time if end_break_obj else ""
-
-    return start_work, end_work, enter_break, end_break
+    return get_calendar_day(datetime).DOW
 
 
 def calculation_hours_daily(start_work, end_work, enter_break, end_break) -> (timedelta, timedelta):
@@ -335,11 +557,13 @@ def timedelta2str(timedelta) -> str:
     return str(hours_float)
 
 
-def get_toast_msg_by_session(session) -> dict:
+def get_toast_msg(request) -> dict:
+    # 取り出したメッセージは次のレスポンスでCookieから削除される
     context = {}
     toast_key_list = ["success", "error", "warning"]
-    for key in toast_key_list:
-        if session.get(key):
-            context[key] = session.pop(key)
+    for message in messages.get_messages(request):
+        # タグ付きのメッセージは各画面で個別に表示する
+        if message.level_tag in toast_key_list and not message.extra_tags:
+            context[message.level_tag] = message.message
 
     return context
@@ -0,0 +1,135 @@
+import os
+import urllib.parse
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import django
+from dateutil.relativedelta import relativedelta
+from django.contrib import messages
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.timecard.models import DailyAttendance
+
+from .base import ExcelHandleView, MonthlyStamps, SuperuserPermissionView
+from .timecard import TimeCardExportView
+
+
+def create_wb_content(headline, user_name, rows) -> bytes:
+    wb = ExcelHandleView()._create_write_only_wb(headline, user_name, rows)
+    content = BytesIO()
+    wb.save(content)
+    return content.getvalue()
+
+
+class ZipStream:
+    # seekを持たないため、zipfileはシークせずに先頭から順に書き込む
+    def __init__(self):
+        self._buffer = BytesIO()
+        self._position = 0
+
+    def write(self, data):
+        self._position += len(data)
+        return self._buffer.write(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+class TimeCardBulkExportView(SuperuserPermissionView, TimeCardExportView):
+    def get(self, request, *args, **kwargs):
+        self.EOM_by_url = self._get_EOM_by_url(False)
+
+        if self.EOM_by_url is None:
+            messages.error(request, "不正な操作を検知しました")
+            return redirect(reverse("timecard:timecard_approved_month_list"))
+
+        # ワーカー内ではプロセスを増やさず、作成したExcelから順にZIPにして返す
+        response = StreamingHttpResponse(
+            self.iter_zip(self._get_users_qs(request.GET.getlist("user"))), content_type="application/zip"
+        )
+        filename = "勤怠_" + self.EOM_by_url.strftime("%Y{0}%m{1}").format(*"年月") + ".zip"
+        response["Content-Disposition"] = "attachment; filename={}".format(urllib.parse.quote(filename))
+        return response
+
+    def _get_users_qs(self, user_id_list):
+        users_qs = User.objects.filter(active=True)
+        if user_id_list:
+            users_qs = users_qs.filter(id__in=[user_id for user_id in user_id_list if user_id.isdecimal()])
+
+        return users_qs
+
+    def iter_zip(self, users_qs):
+        stream = ZipStream()
+        filename_set = set()
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for user, monthly_stamps in self._iter_monthly_stamps_by_user(users_qs):
+                content = create_wb_content(*self._get_ws_contents(user, monthly_stamps))
+                zip_file.writestr(self._get_unique_filename(user, filename_set), content)
+                yield stream.pop()
+
+        yield stream.pop()
+
+    def write_zip(self, file, users_qs, max_workers=None):
+        # 管理コマンドから実行する場合は、Excelの作成を複数のプロセスで行う
+        max_workers = max_workers or os.cpu_count()
+        filename_set = set()
+        with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            with ProcessPoolExecutor(max_workers, initializer=django.setup) as executor:
+                # 作成中のExcelを一定数に抑え、投入した順にZIPへ書き込む
+                pending = deque()
+                for user, monthly_stamps in self._iter_monthly_stamps_by_user(users_qs):
+                    future = executor.submit(create_wb_content, *self._get_ws_contents(user, monthly_stamps))
+                    pending.append((self._get_unique_filename(user, filename_set), future))
+
+                    if len(pending) >= max_workers * 2:
+                        filename, future = pending.popleft()
+                        zip_file.writestr(filename, future.result())
+
+                while pending:
+                    filename, future = pending.popleft()
+                    zip_file.writestr(filename, future.result())
+
+        return len(filename_set)
+
+    def _iter_monthly_stamps_by_user(self, users_qs):
+        BOM = self.EOM_by_url + relativedelta(day=1)
+        daily_attendance_qs = DailyAttendance.objects.filter(
+            date__gte=BOM.date(),
+            date__lte=self.EOM_by_url.date(),
+            user__in=users_qs,
+        )
+
+        # ユーザーと日次勤怠をどちらもユーザーID順に取得して突き合わせる
+        stamps_iter = MonthlyStamps.iter_daily_attendance_by_user(daily_attendance_qs, BOM)
+        stamps_user_id, monthly_stamps = next(stamps_iter, (None, None))
+        for user in users_qs.order_by("id").iterator():
+            while stamps_user_id is not None and stamps_user_id < user.id:
+                stamps_user_id, monthly_stamps = next(stamps_iter, (None, None))
+
+            if stamps_user_id == user.id:
+                yield user, monthly_stamps
+            else:
+                yield user, MonthlyStamps(BOM)
+
+    def _get_unique_filename(self, user, filename_set):
+        filename = self._get_filename(user)
+        if filename in filename_set:
+            # 同姓同名のユーザーはIDを付与して区別する
+            filename = filename.replace(".xlsx", "_{}.xlsx".format(user.id))
+
+        filename_set.add(filename)
+        return filename
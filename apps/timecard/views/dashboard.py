@@ -1,45 +1,115 @@
-from datetime import timedelta
-
 from dateutil.relativedelta import relativedelta
-from django.db.models import Q
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Case, Count, F, Max, Q, Value, When
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
 
 from apps.accounts.models import User
-from apps.timecard.models import TimeCard, TimeCardSummary
+from apps.timecard.models import (MonthlyAttendance, MonthlySubmission,
+                                  Presence, TimeCard, TimeCardSummary)
 
-from .base import (TemplateView, calculation_hours_daily,
-                   get_daily_stamps_info, get_work_days_by_qs, timedelta2str)
+from .base import (SuperuserPermissionView, TemplateView, View,
+                   calculation_hours_daily, timedelta2str)
 
+WORK_CONDITION_PAGE_SIZE = 20
 
-class DashboardView(TemplateView):
-    template_name = "material-dashboard-master/pages/dashboard.html"
 
-    def dispatch(self, request, *args, **kwargs):
-        self.today = (
-            timezone.datetime.today()
-            .astimezone(timezone.get_default_timezone())
-            .replace(hour=0, minute=0, second=0, microsecond=0)
+def get_today():
+    return (
+        timezone.datetime.today()
+        .astimezone(timezone.get_default_timezone())
+        .replace(hour=0, minute=0, second=0, microsecond=0)
+    )
+
+
+def get_work_condition_page(request, today):
+    # 打刻時に更新される在席状況から取得する（前日以前の在席状況は未出勤として扱う）
+    today_q = Q(presence__date=today.date())
+    users_qs = (
+        User.objects.exclude(id=request.user.id)
+        .annotate(
+            start_work=Case(When(today_q, then=F("presence__start_work"))),
+            end_work=Case(When(today_q, then=F("presence__end_work"))),
+            presence_state=Case(When(today_q, then=F("presence__state")), default=Value(Presence.State.ABSENT)),
         )
-        self.is_promoted = (
-            TimeCard.objects.filter(
-                stamped_time__gte=self.today + relativedelta(day=1),
-                stamped_time__lt=self.today + relativedelta(months=1, day=1) - relativedelta(days=1),
-                user=request.user,
-            )
-            .exclude(state=TimeCard.State.NEW)
-            .exists()
+        .order_by("-manager", "id")
+    )
+
+    work_condition = Paginator(users_qs, WORK_CONDITION_PAGE_SIZE).get_page(request.GET.get("page"))
+    for user in work_condition:
+        user.state_label = Presence.State(user.presence_state).label
+
+    return work_condition
+
+
+def get_work_condition_etag(request, *args, **kwargs):
+    # 日付・ページ・在席状況・ユーザーのいずれかが変わった場合のみ内容が変わる
+    presence_version = Presence.objects.get_version()
+    user_version = User.objects.aggregate(updated_at=Max("updated_at"), count=Count("pk"))
+    return "{}-{}-{}-{}-{}-{}-{}".format(
+        get_today().date(),
+        request.user.id,
+        request.GET.get("page", ""),
+        presence_version["updated_at"],
+        presence_version["count"],
+        user_version["updated_at"],
+        user_version["count"],
+    )
+
+
+class DashboardSnapshot:
+    KIND_LIST = [TimeCard.Kind.IN, TimeCard.Kind.OUT, TimeCard.Kind.ENTER_BREAK, TimeCard.Kind.END_BREAK]
+
+    def __init__(self, user, today):
+        self.this_monday = today - relativedelta(days=today.isoweekday() - 1)
+        self.this_sunday = self.this_monday + relativedelta(days=6)
+        self.week_latest_updated_at = None
+        self.daily_stamps_dict = {}
+
+        # 当月の申請状況は月次申請の1行のみで判定する
+        BOM = today + relativedelta(day=1)
+        self.is_promoted = MonthlySubmission.objects.get_state(user, BOM.date()) != MonthlySubmission.State.NEW
+
+        next_monday = self.this_monday + relativedelta(weeks=1)
+        stamps = (
+            TimeCard.objects.filter(user=user, stamped_time__gte=self.this_monday, stamped_time__lt=next_monday)
+            .order_by("stamped_time")
+            .values_list("kind", "stamped_time", "updated_at")
         )
+        for kind, stamped_time, updated_at in stamps:
+            daily_stamps = self.daily_stamps_dict.setdefault(timezone.localdate(stamped_time), {})
+            daily_stamps.setdefault(kind, stamped_time)
+            if not self.week_latest_updated_at or self.week_latest_updated_at < updated_at:
+                self.week_latest_updated_at = updated_at
+
+    def get_stamped_time(self, date, kind):
+        # 対象日の打刻区分ごとの最初の打刻時刻
+        return self.daily_stamps_dict.get(date, {}).get(kind)
+
+
+class DashboardView(TemplateView):
+    template_name = "material-dashboard-master/pages/dashboard.html"
+
+    TREND_MONTH_COUNT = 6
 
+    def dispatch(self, request, *args, **kwargs):
+        self.today = get_today()
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
+        self.snapshot = DashboardSnapshot(request.user, self.today)
+        self.is_promoted = self.snapshot.is_promoted
+
         if "mode" not in request.GET:
             return super().get(request, *args, **kwargs)
 
         if self.is_promoted:
-            request.session["error"] = "締め処理後のため打刻できません"
+            messages.error(request, "締め処理後のため打刻できません")
             return redirect(reverse("timecard:dashboard"))
 
         stamping_kind = self._convert_stamping_kind(request.GET["mode"])
@@ -66,151 +136,91 @@ class DashboardView(TemplateView):
             return
 
     def _stamped_time_today(self, stamping_kind):
-        today_qs = TimeCard.objects.filter(
-            user=self.request.user,
-            kind=stamping_kind,
-            stamped_time__gte=self.today,
-            stamped_time__lt=self.today + relativedelta(days=1),
-        )
-        if not today_qs.exists():
-            return
-
-        return today_qs.first().stamped_time
+        return self.snapshot.get_stamped_time(self.today.date(), stamping_kind)
 
     def _get_stamped_time(self):
-        stamped_kind_dict = {
-            TimeCard.Kind.IN: None,
-            TimeCard.Kind.OUT: None,
-            TimeCard.Kind.ENTER_BREAK: None,
-            TimeCard.Kind.END_BREAK: None,
-        }
-
-        for stamped_kind in stamped_kind_dict.keys():
-            if self.is_promoted or self._stamped_time_today(stamped_kind):
-                stamped_kind_dict[stamped_kind] = self._stamped_time_today(stamped_kind)
-
-        return stamped_kind_dict
+        return {stamped_kind: self._stamped_time_today(stamped_kind) for stamped_kind in DashboardSnapshot.KIND_LIST}
 
     def _get_bar_chart_data(self):
         work_hour_data = [0] * 7
-
-        DOW_int = self.today.isoweekday()
-        this_monday = self.today - relativedelta(days=DOW_int - 1)
-        this_sunday = this_monday + relativedelta(days=6)
-        this_week_stamps_qs = TimeCard.objects.filter(
-            user=self.request.user, stamped_time__gte=this_monday, stamped_time__lt=this_sunday + relativedelta(days=1)
-        )
-        work_days = get_work_days_by_qs(this_week_stamps_qs)
-        bar_chart_latest_updated_at = (
-            this_week_stamps_qs.order_by("-updated_at").first().updated_at if work_days != [] else None
-        )
-
-        for day in work_days:
-            work_date = self.today + relativedelta(day=day)
-            DOW_index = work_date.isoweekday() - 1
-
-            start_work, end_work, enter_break, end_break = get_daily_stamps_info(this_week_stamps_qs, work_date)
+        for day_index in range(7):
+            work_date = (self.snapshot.this_monday + relativedelta(days=day_index)).date()
+            start_work, end_work, enter_break, end_break = [
+                self.snapshot.get_stamped_time(work_date, kind) for kind in DashboardSnapshot.KIND_LIST
+            ]
             work_hours, break_hours = calculation_hours_daily(start_work, end_work, enter_break, end_break)
-            work_hour_data[DOW_index] = float("{:.2f}".format(work_hours.seconds / (60 * 60)))
+            work_hour_data[day_index] = float("{:.2f}".format(work_hours.seconds / (60 * 60)))
 
         return {
             "work_hour": work_hour_data,
-            "this_monday": this_monday,
-            "this_sunday": this_sunday,
-            "latest_updated_at": bar_chart_latest_updated_at,
+            "this_monday": self.snapshot.this_monday,
+            "this_sunday": self.snapshot.this_sunday,
+            "latest_updated_at": self.snapshot.week_latest_updated_at,
         }
 
-    def _past_6months_YM(self):
-        today = timezone.datetime.today()
-        months_list = []
-        for index in range(6):
-            display_month_YM = (today - relativedelta(months=index)).strftime("%Y/%m")
-            months_list.append(display_month_YM)
-
-        return months_list
+    def _get_trend_months(self):
+        # 当月を含む過去6ヶ月の月初日（古い順）
+        BOM = self.today + relativedelta(day=1)
+        return [BOM - relativedelta(months=index) for index in reversed(range(self.TREND_MONTH_COUNT))]
 
     def _get_line_graph_data(self):
-        self.line_graph_latest_updated_at = None
-        months_YM_list = self._past_6months_YM()
-        graph_data = {}
-        for month_YM in months_YM_list:
-            graph_data[month_YM] = self._get_total_work_hours(month_YM)
-
-        total_work_hour_list = [hours for hours in graph_data.values()]
+        trend_months = self._get_trend_months()
+        latest_updated_at_list = []
+
+        # 承認済みの月はサマリから取得する
+        total_work_hours_dict = {}
+        for summary in TimeCardSummary.objects.filter(
+            user=self.request.user, month__in=[month.date() for month in trend_months]
+        ):
+            total_work_hours_dict[summary.month] = float(summary.total_work_hours)
+            latest_updated_at_list.append(summary.updated_at)
+
+        # サマリがない月は打刻のたびに更新している月次勤怠から取得する
+        missing_months = [month.date() for month in trend_months if month.date() not in total_work_hours_dict]
+        if missing_months:
+            for monthly_attendance in MonthlyAttendance.objects.filter(
+                user=self.request.user, month__in=missing_months
+            ):
+                total_work_hours_dict[monthly_attendance.month] = float(timedelta2str(monthly_attendance.work_hours))
+                latest_updated_at_list.append(monthly_attendance.updated_at)
 
         return {
-            "months": ", ".join(map(str, sorted([month for month in graph_data.keys()]))),
-            "total_work_hours": total_work_hour_list[::-1],
-            "latest_updated_at": self.line_graph_latest_updated_at,
+            "months": ", ".join(month.strftime("%Y/%m") for month in trend_months),
+            "total_work_hours": [total_work_hours_dict.get(month.date(), 0) for month in trend_months],
+            "latest_updated_at": max(latest_updated_at_list, default=None),
         }
 
-    def _get_total_work_hours(self, month):
-        obj = TimeCardSummary.objects.filter(user=self.request.user, month=month).first()
-        if obj:
-            if not self.line_graph_latest_updated_at or self.line_graph_latest_updated_at < obj.updated_at:
-                self.line_graph_latest_updated_at = obj.updated_at
-
-            return float(obj.total_work_hours)
-
-        month_first_date = timezone.datetime.strptime(month + "/01", "%Y/%m/%d").astimezone(
-            timezone.get_default_timezone()
-        )
-        monthly_stamps_qs = self._get_monthly_stamps_qs(month_first_date)
-        if monthly_stamps_qs.exists():
-            if (
-                not self.line_graph_latest_updated_at
-                or self.line_graph_latest_updated_at < monthly_stamps_qs.order_by("-updated_at").first().updated_at
-            ):
-                self.line_graph_latest_updated_at = monthly_stamps_qs.order_by("-updated_at").first().updated_at
-
-            total_work_hours_str = self._get_total_work_hours_by_qs(monthly_stamps_qs, month_first_date)
-            return float(total_work_hours_str)
-
-        return 0
-
-    def _get_monthly_stamps_qs(self, month_first_date):
-        return TimeCard.objects.filter(
-            user=self.request.user,
-            stamped_time__gte=month_first_date,
-            stamped_time__lt=month_first_date + relativedelta(months=1, day=1) - relativedelta(days=1),
-        )
-
-    def _get_total_work_hours_by_qs(self, monthly_stamps_qs, month_first_date) -> str:
-        work_days = get_work_days_by_qs(monthly_stamps_qs)
+    def _get_work_condition(self):
+        # 勤務状況一覧は管理ユーザーのみ表示する
+        if not self.request.user.is_manager:
+            return
 
-        total_work_hours = timedelta()
-        for day in work_days:
-            work_date = month_first_date + relativedelta(day=day)
+        return get_work_condition_page(self.request, self.today)
 
-            start_work, end_work, enter_break, end_break = get_daily_stamps_info(monthly_stamps_qs, work_date)
-            work_hours, break_hours = calculation_hours_daily(start_work, end_work, enter_break, end_break)
-            total_work_hours += work_hours
 
-        return timedelta2str(total_work_hours)
-
-    def _get_work_condition(self):
-        users = User.objects.exclude(id=self.request.user.id).order_by("-manager")
-        at_work_users_info = (
-            TimeCard.objects.filter(
-                (Q(kind=TimeCard.Kind.IN) | Q(kind=TimeCard.Kind.OUT)),
-                stamped_time__gte=self.today,
-                stamped_time__lt=self.today + relativedelta(days=1),
-            )
-            .distinct()
-            .values_list("user", "kind", "stamped_time")
+class WorkConditionView(SuperuserPermissionView, View):
+    @method_decorator(etag(get_work_condition_etag))
+    def get(self, request, *args, **kwargs):
+        work_condition = get_work_condition_page(request, get_today())
+        return JsonResponse(
+            {
+                "page": work_condition.number,
+                "num_pages": work_condition.paginator.num_pages,
+                "users": [
+                    {
+                        "id": user.id,
+                        "name": user.name,
+                        "is_manager": user.is_manager,
+                        "state": user.presence_state,
+                        "state_label": user.state_label,
+                        "start_work": self._local_time(user.start_work),
+                        "end_work": self._local_time(user.end_work),
+                    }
+                    for user in work_condition
+                ],
+            }
         )
 
-        condition = []
-        for user in users:
-            start_work = ""
-            end_work = ""
-            if at_work_users_info.filter(user=user, kind=TimeCard.Kind.IN):
-                start_work = at_work_users_info.get(user=user, kind=TimeCard.Kind.IN)[2]
-            elif at_work_users_info.filter(user=user, kind=TimeCard.Kind.OUT):
-                start_work = at_work_users_info.get(user=user, kind=TimeCard.Kind.OUT)[2]
-
-            condition.append(
-                {"name": user.name, "is_manager": user.is_manager, "start_work": start_work, "end_work": end_work}
-            )
-
-        return condition
+    def _local_time(self, stamped_time):
+        if stamped_time:
+            return timezone.localtime(stamped_time).strftime("%H:%M")
@@ -0,0 +1,13 @@
+import os
+
+from django.http import JsonResponse
+
+from config.db.pool import get_pool_stats
+
+from .base import SuperuserPermissionView, View
+
+
+class DatabasePoolStatsView(SuperuserPermissionView, View):
+    # 応答したワーカープロセスのコネクションプールの利用状況を返す
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"pid": os.getpid(), "pools": get_pool_stats()})
@@ -1,30 +1,35 @@
 import logging
 import re
 import urllib
+from collections import namedtuple
 from datetime import datetime, time
 
-import jpholiday
 import openpyxl
 from dateutil.relativedelta import relativedelta
-from django.db import transaction
+from django.contrib import messages
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-from django.db.models.functions import TruncMonth
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import redirect, render
 from django.template.response import TemplateResponse
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from django.views.generic import ListView
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils.cell import coordinate_to_tuple
 
 from apps.accounts.models import User
-from apps.timecard.forms import (TimeCardFormSet, TimeCardSearchForm,
+from apps.timecard.forms import (MonthlySubmissionFilterForm, TimeCardFormSet,
+                                 TimeCardSearchForm, TimeCardSummaryFilterForm,
                                  UploadFileForm)
-from apps.timecard.models import TimeCard, TimeCardSummary
+from apps.timecard.models import (DailyAttendance, MonthlyAttendance,
+                                  MonthlySubmission, TimeCard, TimeCardSummary,
+                                  seconds2hours_str)
 
-from .base import (ExcelHandleView, SuperuserPermissionView, TemplateView,
-                   TimeCardBaseMonthlyReportView, get_DOW,
-                   get_toast_msg_by_session, timedelta2str)
+from .base import (ExcelHandleView, KeysetPaginationMixin, MonthlyStamps,
+                   SuperuserPermissionView, TemplateView,
+                   TimeCardBaseMonthlyReportView, get_DOW, get_toast_msg,
+                   timedelta2str)
 
 
 class TimeCardMonthlyReportView(TimeCardBaseMonthlyReportView):
@@ -66,27 +71,33 @@ class TimeCardMonthlyReportView(TimeCardBaseMonthlyReportView):
         monthly_stamps_qs = self.get_queryset()
 
         if not monthly_stamps_qs.exists():
-            self.request.session["warning"] = "未打刻のため申請できません"
+            messages.warning(self.request, "未打刻のため申請できません")
             return redirect(url)
-        elif monthly_stamps_qs.exclude(state=TimeCard.State.NEW):
-            self.request.session["error"] = "すでに申請済みです"
+        elif self._get_state() != MonthlySubmission.State.NEW:
+            messages.error(self.request, "すでに申請済みです")
             return redirect(url)
 
         promote_err_dict = {}
-        if self._is_valid_stamps_qs(monthly_stamps_qs, promote_err_dict):
-            monthly_stamps_qs.update(state=TimeCard.State.PROCESSING)
-            self.request.session["success"] = "ステータスを{}に更新しました".format(TimeCard.State.PROCESSING.label)
+        if self._is_valid_monthly_stamps(promote_err_dict):
+            month = (self.EOM_by_url + relativedelta(day=1)).date()
+            if not MonthlySubmission.objects.promote(self.request.user, month):
+                messages.error(self.request, "すでに申請済みです")
+                return redirect(url)
+
+            messages.success(
+                self.request, "ステータスを{}に更新しました".format(MonthlySubmission.State.PROCESSING.label)
+            )
             return redirect(url)
 
-        self.request.session["warning"] = "入力時刻にエラーがあるため申請できません"
+        messages.warning(self.request, "入力時刻にエラーがあるため申請できません")
         self.request.session["promote_err_month_dict"] = {self.EOM_by_url.strftime("%Y%m"): promote_err_dict}
         return redirect(url)
 
-    def _is_valid_stamps_qs(self, monthly_stamps_qs, promote_err_dict):
-        work_days_list = self._get_work_days_by_qs(monthly_stamps_qs)
+    def _is_valid_monthly_stamps(self, promote_err_dict):
+        monthly_stamps = self._get_monthly_stamps()
 
-        for work_day in work_days_list:
-            start_work, end_work, enter_break, end_break = self._get_daily_stamps_info(monthly_stamps_qs, work_day)
+        for work_day in monthly_stamps.work_days:
+            start_work, end_work, enter_break, end_break = monthly_stamps.get_daily_stamps_info(work_day)
 
             if not (start_work and end_work):
                 promote_err_dict[work_day] = TimeCardFormSet.ERR_MSG_NEED_WORK_TIME
@@ -115,20 +126,21 @@ class TimeCardMonthlyReportView(TimeCardBaseMonthlyReportView):
 
 
 class TimeCardExportView(TimeCardBaseMonthlyReportView, ExcelHandleView):
+    WRITE_ONLY = True
+
     def get(self, request, *args, **kwargs):
         self.EOM_by_url = super()._get_EOM_by_url(False)
 
         if self.EOM_by_url is None:
             return redirect(reverse("timecard:timecard_monthly_report"))
 
-        wb = self._create_wb()
-        filename = (
-            "勤怠_"
-            + request.user.name.replace(" ", "_")
-            + "_"
-            + self.EOM_by_url.strftime("%Y{0}%m{1}").format(*"年月")
-            + ".xlsx"
-        )
+        if self.WRITE_ONLY:
+            monthly_stamps = self._get_monthly_stamps()
+            wb = self._create_write_only_wb(*self._get_ws_contents(request.user, monthly_stamps))
+        else:
+            wb = self._create_wb()
+
+        filename = self._get_filename(request.user)
         response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
         response["Content-Disposition"] = "attachment; filename={}".format(urllib.parse.quote(filename))
         wb.save(response)
@@ -138,10 +150,7 @@ class TimeCardExportView(TimeCardBaseMonthlyReportView, ExcelHandleView):
     def _create_wb(self):
         wb = openpyxl.Workbook()
         ws = wb.active
-        ws.page_setup.orientation = "landscape"
-        ws.page_setup.fitToWidth = 1
-        ws.page_setup.fitToHeight = 0
-        ws.sheet_properties.pageSetUpPr.fitToPage = True
+        self._setup_page_ws(ws)
         ws.title = self.SHEET_TITLE
 
         self._write_ws(ws)
@@ -150,33 +159,47 @@ class TimeCardExportView(TimeCardBaseMonthlyReportView, ExcelHandleView):
 
         return wb
 
+    def _get_filename(self, user):
+        return (
+            "勤怠_"
+            + user.name.replace(" ", "_")
+            + "_"
+            + self.EOM_by_url.strftime("%Y{0}%m{1}").format(*"年月")
+            + ".xlsx"
+        )
+
+    def _get_ws_contents(self, user, monthly_stamps):
+        headline = self.SHEET_HEADLINE.format(self.EOM_by_url.strftime("%Y{0}%m{1}").format(*"年月"))
+        user_name = self.SHEET_USER_NAME.format(user.name)
+        return headline, user_name, self._get_ws_rows(monthly_stamps)
+
     def _write_ws(self, ws):
         self._write_header(ws)
 
-        day_count = self.EOM_by_url.day
-        monthly_stamps_qs = self.get_queryset()
-        for day_index in range(day_count):
-            day = day_index + 1
-            target_date = self.EOM_by_url + relativedelta(day=day)
-            holiday_name = jpholiday.is_holiday_name(target_date)
+        for row in self._get_ws_rows(self._get_monthly_stamps()):
+            ws.append(row)
 
-            DOW = self._get_DOW(day)
-            day_kind = self._get_day_kind(DOW, day)
-            start_time, end_time, enter_break, end_break = self._get_daily_stamps_info(monthly_stamps_qs, day)
+    def _get_ws_rows(self, monthly_stamps):
+        rows = []
+        for calendar_day in self._get_month_calendar():
+            day = calendar_day.date.day
+            start_time, end_time, enter_break, end_break = monthly_stamps.get_daily_stamps_info(day)
 
-            ws.append(
+            rows.append(
                 [
                     day,
-                    DOW,
-                    day_kind,
+                    calendar_day.DOW,
+                    calendar_day.day_kind,
                     self._local_time(start_time),
                     self._local_time(end_time),
                     self._local_time(enter_break),
                     self._local_time(end_break),
-                    holiday_name,
+                    calendar_day.holiday_name,
                 ]
             )
 
+        return rows
+
     def _format(self, timedelta):
         if isinstance(timedelta, str):
             return timedelta
@@ -214,7 +237,7 @@ class TimeCardEditView(TemplateView):
     def post(self, request, *args, **kwargs):
         formset = self._get_formset(request.POST)
         if self._has_promoted_stamps(formset):
-            request.session["error"] = "申請中のため編集できません"
+            messages.error(request, "申請中のため編集できません")
             return render(request, self.template_name)
 
         if not formset.is_valid():
@@ -225,14 +248,15 @@ class TimeCardEditView(TemplateView):
             return render(request, self.template_name, context)
 
         delete_data = len([key for key in formset.data.keys() if "DELETE" in key]) > 0
-        saved_form_list = formset.save()
+        with DailyAttendance.objects.bulk_refresh():
+            saved_form_list = formset.save()
 
         if saved_form_list is False:
-            request.session["error"] = "更新に失敗しました"
+            messages.error(request, "更新に失敗しました")
             return render(request, self.template_name)
 
         elif delete_data or len(saved_form_list) > 0:
-            request.session["success"] = "更新しました"
+            messages.success(request, "更新しました")
             self._delete_promote_err_msg_by_session(request.session)
             return render(request, self.template_name)
 
@@ -272,27 +296,28 @@ class TimeCardEditView(TemplateView):
             self.date_by_url.strftime("%Y%m")
         ):
             session["promote_err_month_dict"][self.date_by_url.strftime("%Y%m")].pop(str(self.date_by_url.day), None)
+            # 入れ子の辞書の変更は検知されないため明示する（内容が変わらなければ保存されない）
+            session.modified = True
 
     def _can_edit(self):
         next_month = timezone.datetime.today().astimezone(timezone.get_default_timezone()).replace(
             hour=0, minute=0, second=0, microsecond=0
         ) + relativedelta(day=1, months=1)
         if not self.date_by_url:
-            self.request.session["error"] = "不正な操作を検知しました"
+            messages.error(self.request, "不正な操作を検知しました")
             return
 
         elif self.date_by_url >= next_month:
-            self.request.session["error"] = "来月以降の情報は編集できません"
+            messages.error(self.request, "来月以降の情報は編集できません")
             return
 
-        daily_stamps_qs = TimeCard.objects.filter(
-            stamped_time__gte=(self.date_by_url + relativedelta(day=1)),
-            stamped_time__lt=(self.date_by_url + relativedelta(months=1, day=1)),
-            user=self.request.user,
-        ).exclude(state=TimeCard.State.NEW)
-        if daily_stamps_qs.exists():
-            self.request.session["error"] = "{}および{}の情報は更新できません".format(
-                TimeCard.State.PROCESSING.label, TimeCard.State.APPROVED.label
+        state = MonthlySubmission.objects.get_state(self.request.user, (self.date_by_url + relativedelta(day=1)).date())
+        if state != MonthlySubmission.State.NEW:
+            messages.error(
+                self.request,
+                "{}および{}の情報は更新できません".format(
+                    MonthlySubmission.State.PROCESSING.label, MonthlySubmission.State.APPROVED.label
+                ),
             )
             return
 
@@ -303,8 +328,12 @@ class TimeCardEditView(TemplateView):
             if form.instance.id is None:
                 return
 
-            obj = TimeCard.objects.get(id=form.instance.id)
-            return obj and obj.state != TimeCard.State.NEW
+            stamped_time = TimeCard.objects.filter(id=form.instance.id).values_list("stamped_time", flat=True).first()
+            if stamped_time is None:
+                return
+
+            month = timezone.localdate(stamped_time).replace(day=1)
+            return MonthlySubmission.objects.get_state(self.request.user, month) != MonthlySubmission.State.NEW
 
 
 class TimeCardImportView(ExcelHandleView):
@@ -314,11 +343,16 @@ class TimeCardImportView(ExcelHandleView):
     ERR_MSG_HEADER = "エラー内容"
     ERR_FORMAT = "フォーマットはHH:MMで入力してください。"
 
+    IMPORT_BATCH_SIZE = 500
+
+    WsRow = namedtuple("WsRow", ["row_num", "day", "start_work", "end_work", "enter_break", "end_break"])
+
     def __init__(self):
         super().__init__()
         self.err_cell_list = []
         self.row_err_msg_dict = {}
         self.EOM_by_ws = None
+        self.ws_header_dict = {}
 
     def get(self, *args, **kwargs):
         return TemplateResponse(self.request, self.template_name, {"upload_form": UploadFileForm()})
@@ -328,53 +362,97 @@ class TimeCardImportView(ExcelHandleView):
         if not (upload_form.is_valid()):
             return render(request, self.template_name, {"upload_form": upload_form})
 
-        wb = openpyxl.load_workbook(request.FILES["file"])
+        file = request.FILES["file"]
+        ws_rows = self._read_ws_rows(file)
 
-        if self._can_import_wb(wb):
-            self._import_data_by_wb(wb)
+        if self._can_import_ws_rows(ws_rows):
+            self._import_data_by_ws_rows(ws_rows)
             return render(request, self.template_name)
 
-        if request.session.get("error"):
+        # 行ごとのエラーがない場合はメッセージのみ表示する
+        if not self.row_err_msg_dict:
             return render(request, self.template_name)
 
-        err_response = self._create_err_response(wb)
+        # エラーレポートの作成時のみ書式を含めてExcelを読み込む
+        file.seek(0)
+        err_response = self._create_err_response(openpyxl.load_workbook(file))
         return err_response
 
     def _get_upload_form(self):
         kwargs = {"data": self.request.POST, "files": self.request.FILES}
         return UploadFileForm(**kwargs)
 
-    def _can_import_wb(self, wb):
+    def _read_ws_rows(self, file):
         try:
-            ws = wb[self.SHEET_TITLE]
+            wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            self.logger.error(f"{e}", exc_info=True)
+            return
 
-            if self._invalid_ws_layout(ws):
+        try:
+            if self.SHEET_TITLE not in wb.sheetnames:
+                return
+
+            return list(self._iter_ws_rows(wb[self.SHEET_TITLE]))
+        finally:
+            wb.close()
+
+    def _iter_ws_rows(self, ws):
+        header_cells = {
+            coordinate_to_tuple(coordinate): coordinate for coordinate in (self.TITLE_CELL, self.USER_NAME_CELL)
+        }
+
+        # ヘッダーまではタイトルと氏名のみ保持し、1日の行から末日の行までを型変換して返す
+        for row_num, row in enumerate(ws.iter_rows(values_only=True), start=1):
+            if row_num <= self.HEADER_ROW_NUM:
+                for col_num, value in enumerate(row, start=1):
+                    if (row_num, col_num) in header_cells:
+                        self.ws_header_dict[header_cells[(row_num, col_num)]] = value
+                continue
+
+            row = tuple(row) + (None,) * (self.END_BREAK_COL_NUM - len(row))
+            yield self.WsRow(
+                row_num,
+                row[self.DAY_COL_NUM - 1],
+                self._cell_value2time(row[self.START_WORK_COL_NUM - 1]),
+                self._cell_value2time(row[self.END_WORK_COL_NUM - 1]),
+                self._cell_value2time(row[self.ENTER_BREAK_COL_NUM - 1]),
+                self._cell_value2time(row[self.END_BREAK_COL_NUM - 1]),
+            )
+
+    def _can_import_ws_rows(self, ws_rows):
+        try:
+            if ws_rows is None:
+                raise ValueError("sheet '{}' is not found".format(self.SHEET_TITLE))
+
+            if self._invalid_ws_layout(ws_rows):
                 return
 
             if self._exist_promoted_stamps():
                 return
 
-            if self._invalid_ws_data(ws):
+            if self._invalid_ws_data(ws_rows):
                 return
 
             return True
 
         except Exception as e:
-            self.request.session["error"] = "取込失敗しました"
+            messages.error(self.request, "取込失敗しました")
             self.logger.error(f"{e}", exc_info=True)
+            self.row_err_msg_dict.clear()
             return
 
-    def _invalid_ws_layout(self, ws):
-        user_name = ws[self.USER_NAME_CELL].value[3:]
+    def _invalid_ws_layout(self, ws_rows):
+        user_name = self.ws_header_dict.get(self.USER_NAME_CELL)[3:]
         if user_name != self.request.user.name:
-            self.request.session["error"] = "不正なシートのため取込できません"
+            messages.error(self.request, "不正なシートのため取込できません")
             return True
 
-        self.EOM_by_ws = self._get_EOM_by_ws(ws)
+        self.EOM_by_ws = self._get_EOM_by_ws()
 
         # シートの月末日が正しいかチェックする
-        if self.EOM_by_ws.day != ws.cell(row=ws.max_row, column=1).value:
-            self.request.session["error"] = "不正なシートのため取込できません"
+        if not ws_rows or self.EOM_by_ws.day != ws_rows[-1].day:
+            messages.error(self.request, "不正なシートのため取込できません")
             return True
 
         next_month = timezone.datetime.today().astimezone(timezone.get_default_timezone()).replace(
@@ -382,39 +460,32 @@ class TimeCardImportView(ExcelHandleView):
         ) + relativedelta(day=1, months=1)
 
         if self.EOM_by_ws >= next_month:
-            self.request.session["error"] = "来月以降の情報は取込できません"
+            messages.error(self.request, "来月以降の情報は取込できません")
             return True
 
         return False
 
-    def _invalid_ws_data(self, ws):
+    def _invalid_ws_data(self, ws_rows):
         empty_row_count = 0
         valid_row_count = 0
         # 1日の行から末日の行までループする
-        for row_num in range(self.HEADER_ROW_NUM + 1, ws.max_row + 1):
-            row = ws[row_num]
-
-            start_work_cell = row[self.START_WORK_COL_NUM - 1]
-            end_work_cell = row[self.END_WORK_COL_NUM - 1]
-            enter_break_cell = row[self.ENTER_BREAK_COL_NUM - 1]
-            end_break_cell = row[self.END_BREAK_COL_NUM - 1]
-
-            if start_work_cell.value is end_work_cell.value is enter_break_cell.value is end_break_cell.value is None:
+        for ws_row in ws_rows:
+            if ws_row.start_work is ws_row.end_work is ws_row.enter_break is ws_row.end_break is None:
                 empty_row_count += 1
                 continue
 
-            if self._exist_format_err(start_work_cell, end_work_cell, enter_break_cell, end_break_cell):
-                self.row_err_msg_dict[row_num] = self.ERR_FORMAT
+            if self._exist_format_err(ws_row):
+                self.row_err_msg_dict[ws_row.row_num] = self.ERR_FORMAT
                 continue
 
-            if self._invalid_work_time(start_work_cell, end_work_cell):
+            if self._invalid_work_time(ws_row):
                 continue
 
-            if enter_break_cell.value is end_break_cell.value is None:
+            if ws_row.enter_break is ws_row.end_break is None:
                 valid_row_count += 1
                 continue
 
-            if self._invalid_break_time(start_work_cell, end_work_cell, enter_break_cell, end_break_cell):
+            if self._invalid_break_time(ws_row):
                 continue
 
             valid_row_count += 1
@@ -422,7 +493,7 @@ class TimeCardImportView(ExcelHandleView):
         day_count = self.EOM_by_ws.day
         if day_count == empty_row_count:
             # 未入力の場合、取込した月の情報が全て削除されるためエラーにする
-            self.request.session["error"] = "未入力のため取込できません"
+            messages.error(self.request, "未入力のため取込できません")
             return
 
         return day_count != (empty_row_count + valid_row_count)
@@ -464,72 +535,114 @@ class TimeCardImportView(ExcelHandleView):
         if cell_value is None or isinstance(cell_value, time):
             return cell_value
 
+        if isinstance(cell_value, datetime):
+            return cell_value.time()
+
         try:
             return datetime.strptime(cell_value, "%H:%M").time()
         except:
             return False
 
-    def _get_EOM_by_ws(self, ws):
-        value = ws[self.TITLE_CELL].value[6:]
+    def _get_EOM_by_ws(self):
+        value = self.ws_header_dict.get(self.TITLE_CELL)[6:]
         month_str = value.replace("年", "").replace("月", "") + "01"
         import_month = datetime.strptime(month_str, "%Y%m%d").astimezone(timezone.get_default_timezone())
         return import_month + relativedelta(months=1, day=1) - relativedelta(days=1)
 
     @transaction.atomic
-    def _import_data_by_wb(self, wb):
+    def _import_data_by_ws_rows(self, ws_rows):
         try:
             with transaction.atomic():
-                ws = wb[self.SHEET_TITLE]
-
-                self._get_queryset().delete()
-
-                # 1日の行から末日の行までループする
-                stamp_list = []
-                for row_num in range(self.HEADER_ROW_NUM + 1, ws.max_row + 1):
-                    row = ws[row_num]
-                    day = row[0].value
-
-                    stamped_date = self.EOM_by_ws + relativedelta(day=day)
-                    col_num_kind = {
-                        self.START_WORK_COL_NUM: TimeCard.Kind.IN,
-                        self.END_WORK_COL_NUM: TimeCard.Kind.OUT,
-                        self.ENTER_BREAK_COL_NUM: TimeCard.Kind.ENTER_BREAK,
-                        self.END_BREAK_COL_NUM: TimeCard.Kind.END_BREAK,
-                    }
-
-                    for col_num in col_num_kind:
-                        cell_value = row[col_num - 1].value
-
-                        if cell_value:
-                            stamp_kind = col_num_kind[col_num]
-                            stamped_time = self._make_stamped_time(stamped_date, cell_value)
-                            stamp_list.append([stamp_kind, stamped_time])
-
-                if stamp_list:
-                    for stamp in stamp_list:
-                        TimeCard.objects.create(kind=stamp[0], stamped_time=stamp[1], user=self.request.user)
-
-                self.request.session["success"] = "{}の取込が成功しました".format(
-                    self.EOM_by_ws.strftime("%Y{0}%m{1}").format(*"年月")
+                import_stamp_dict = self._get_import_stamp_dict(ws_rows)
+                inserted_count, updated_count, deleted_count = self._bulk_import_stamps(import_stamp_dict)
+                self.logger.info(
+                    "import timecard user=%s month=%s inserted=%s updated=%s deleted=%s",
+                    self.request.user.id,
+                    self.EOM_by_ws.strftime("%Y%m"),
+                    inserted_count,
+                    updated_count,
+                    deleted_count,
+                )
+
+                messages.success(
+                    self.request,
+                    "{}の取込が成功しました（追加：{}件、更新：{}件、削除：{}件）".format(
+                        self.EOM_by_ws.strftime("%Y{0}%m{1}").format(*"年月"),
+                        inserted_count,
+                        updated_count,
+                        deleted_count,
+                    ),
                 )
 
                 if self.request.session.get("promote_err_month_dict"):
-                    self.request.session["promote_err_month_dict"].pop(self.EOM_by_ws.strftime("%Y%m"))
+                    self.request.session["promote_err_month_dict"].pop(self.EOM_by_ws.strftime("%Y%m"), None)
+                    # 入れ子の辞書の変更は検知されないため明示する（内容が変わらなければ保存されない）
+                    self.request.session.modified = True
 
         except Exception as e:
             self.logger.error(f"{e}", exc_info=True)
 
-    def _make_stamped_time(self, stamped_day, cell_value):
-        if not isinstance(cell_value, time):
-            cell_value = datetime.strptime(cell_value, "%H:%M").time()
-        return stamped_day + relativedelta(hours=cell_value.hour, minutes=cell_value.minute)
+    def _get_import_stamp_dict(self, ws_rows):
+        # 1日の行から末日の行までループする
+        import_stamp_dict = {}
+        for ws_row in ws_rows:
+            stamped_date = self.EOM_by_ws + relativedelta(day=ws_row.day)
+            stamp_kind_time = {
+                TimeCard.Kind.IN: ws_row.start_work,
+                TimeCard.Kind.OUT: ws_row.end_work,
+                TimeCard.Kind.ENTER_BREAK: ws_row.enter_break,
+                TimeCard.Kind.END_BREAK: ws_row.end_break,
+            }
+
+            for stamp_kind, stamp_time in stamp_kind_time.items():
+                if stamp_time:
+                    import_stamp_dict[(ws_row.day, stamp_kind)] = self._make_stamped_time(stamped_date, stamp_time)
+
+        return import_stamp_dict
+
+    def _bulk_import_stamps(self, import_stamp_dict):
+        BOM = self.EOM_by_ws + relativedelta(day=1)
+        now = timezone.now()
+
+        # 取込済みの打刻と比較し、変更があった打刻のみ追加・更新・削除する
+        update_stamps = []
+        delete_stamp_ids = []
+        for stamp in self._get_queryset().order_by("stamped_time"):
+            key = ((stamp.stamped_time - BOM).days + 1, stamp.kind)
+            if key not in import_stamp_dict:
+                delete_stamp_ids.append(stamp.id)
+                continue
+
+            stamped_time = import_stamp_dict.pop(key)
+            if stamp.stamped_time != stamped_time:
+                stamp.stamped_time = stamped_time
+                stamp.updated_at = now
+                update_stamps.append(stamp)
+
+        insert_stamps = [
+            TimeCard(user=self.request.user, kind=stamp_kind, stamped_time=stamped_time)
+            for (day, stamp_kind), stamped_time in import_stamp_dict.items()
+        ]
+
+        # 日次勤怠の再集計は取込の最後にまとめて1回で行う
+        with DailyAttendance.objects.bulk_refresh():
+            TimeCard.objects.filter(id__in=delete_stamp_ids).delete()
+            TimeCard.objects.bulk_update(
+                update_stamps, ["stamped_time", "updated_at"], batch_size=self.IMPORT_BATCH_SIZE
+            )
+            TimeCard.objects.bulk_create(insert_stamps, batch_size=self.IMPORT_BATCH_SIZE)
+
+        return len(insert_stamps), len(update_stamps), len(delete_stamp_ids)
+
+    def _make_stamped_time(self, stamped_day, stamp_time):
+        return stamped_day + relativedelta(hours=stamp_time.hour, minutes=stamp_time.minute)
 
     def _create_err_response(self, wb):
         ws = wb[self.SHEET_TITLE]
         self._reset_color_cells(ws)
         self._reset_err_msg_col(ws)
 
-        self._set_err_color()
+        self._set_err_color(ws)
         self._set_err_msg(ws)
 
         self._edit_appearance_ws(ws)
@@ -543,13 +656,17 @@ class TimeCardImportView(ExcelHandleView):
         return response
 
     def _exist_promoted_stamps(self):
-        monthly_stamps_qs = self._get_queryset()
-        if monthly_stamps_qs.exclude(state=TimeCard.State.NEW).exists():
-            self.request.session["error"] = "{}および{}の情報は更新できません".format(
-                TimeCard.State.PROCESSING.label, TimeCard.State.APPROVED.label
+        state = MonthlySubmission.objects.get_state(self.request.user, (self.EOM_by_ws + relativedelta(day=1)).date())
+        if state != MonthlySubmission.State.NEW:
+            messages.error(
+                self.request,
+                "{}および{}の情報は更新できません".format(
+                    MonthlySubmission.State.PROCESSING.label, MonthlySubmission.State.APPROVED.label
+                ),
             )
+            return True
 
-        return monthly_stamps_qs.exclude(state=TimeCard.State.NEW).exists()
+        return False
 
     def _get_queryset(self):
         monthly_stamps_qs = TimeCard.objects.filter(
@@ -560,97 +677,277 @@ class TimeCardImportView(ExcelHandleView):
 
         return monthly_stamps_qs
 
-    def _exist_format_err(self, *cells):
+    def _exist_format_err(self, ws_row):
         format_err = False
-        for cell in cells:
-            if self._cell_value2time(cell.value) is False:
-                self.err_cell_list.append(cell)
+        col_num_time = {
+            self.START_WORK_COL_NUM: ws_row.start_work,
+            self.END_WORK_COL_NUM: ws_row.end_work,
+            self.ENTER_BREAK_COL_NUM: ws_row.enter_break,
+            self.END_BREAK_COL_NUM: ws_row.end_break,
+        }
+        for col_num, stamp_time in col_num_time.items():
+            if stamp_time is False:
+                self.err_cell_list.append((ws_row.row_num, col_num))
                 format_err = True
 
         return format_err
 
-    def _set_err_color(self):
-        for err_cell in self.err_cell_list:
-            err_cell.fill = PatternFill(patternType="solid", fgColor=self.YELLOW)
+    def _set_err_color(self, ws):
+        for row_num, col_num in self.err_cell_list:
+            ws.cell(row=row_num, column=col_num).fill = PatternFill(patternType="solid", fgColor=self.YELLOW)
 
     def _set_err_msg(self, ws):
         for row_num, err_msg in self.row_err_msg_dict.items():
             ws[row_num][self.ERR_MSG_COL_NUM - 1].value = err_msg
             ws[row_num][self.ERR_MSG_COL_NUM - 1].font = Font(name=self.FONT_NAME, size=9)
 
-    def _invalid_work_time(self, start_work_cell, end_work_cell):
-        start_work = self._cell_value2time(start_work_cell.value)
-        end_work = self._cell_value2time(end_work_cell.value)
-        row_num = start_work_cell.row
+    def _invalid_work_time(self, ws_row):
+        start_work = ws_row.start_work
+        end_work = ws_row.end_work
+        work_cells = [(ws_row.row_num, self.START_WORK_COL_NUM), (ws_row.row_num, self.END_WORK_COL_NUM)]
 
         if (start_work is None) ^ (end_work is None):
-            self.err_cell_list.extend([start_work_cell, end_work_cell])
-            self.row_err_msg_dict[row_num] = TimeCardFormSet.ERR_MSG_NEED_WORK_TIME
+            self.err_cell_list.extend(work_cells)
+            self.row_err_msg_dict[ws_row.row_num] = TimeCardFormSet.ERR_MSG_NEED_WORK_TIME
             return True
 
         elif end_work < start_work:
-            self.err_cell_list.extend([start_work_cell, end_work_cell])
-            self.row_err_msg_dict[row_num] = TimeCardFormSet.ERR_MSG_WORK_TIME
+            self.err_cell_list.extend(work_cells)
+            self.row_err_msg_dict[ws_row.row_num] = TimeCardFormSet.ERR_MSG_WORK_TIME
             return True
 
         return False
 
-    def _invalid_break_time(self, start_work_cell, end_work_cell, enter_break_cell, end_break_cell):
-        start_work = self._cell_value2time(start_work_cell.value)
-        end_work = self._cell_value2time(end_work_cell.value)
-        enter_break = self._cell_value2time(enter_break_cell.value)
-        end_break = self._cell_value2time(end_break_cell.value)
-        row_num = start_work_cell.row
+    def _invalid_break_time(self, ws_row):
+        start_work = ws_row.start_work
+        end_work = ws_row.end_work
+        enter_break = ws_row.enter_break
+        end_break = ws_row.end_break
+        break_cells = [(ws_row.row_num, self.ENTER_BREAK_COL_NUM), (ws_row.row_num, self.END_BREAK_COL_NUM)]
 
         if (enter_break is None) ^ (end_break is None):
-            self.err_cell_list.extend([enter_break_cell, end_break_cell])
-            self.row_err_msg_dict[row_num] = TimeCardFormSet.ERR_MSG_NEED_BREAK_TIME
+            self.err_cell_list.extend(break_cells)
+            self.row_err_msg_dict[ws_row.row_num] = TimeCardFormSet.ERR_MSG_NEED_BREAK_TIME
             return True
 
         elif end_break < enter_break:
-            self.err_cell_list.extend([enter_break_cell, end_break_cell])
-            self.row_err_msg_dict[row_num] = TimeCardFormSet.ERR_MSG_BREAK_TIME
+            self.err_cell_list.extend(break_cells)
+            self.row_err_msg_dict[ws_row.row_num] = TimeCardFormSet.ERR_MSG_BREAK_TIME
             return True
 
         elif enter_break < start_work or end_work < end_break:
-            self.err_cell_list.extend([enter_break_cell, end_break_cell])
-            self.row_err_msg_dict[row_num] = TimeCardFormSet.ERR_MSG_BREAK_TIME_OUT_OF_RANGE
+            self.err_cell_list.extend(break_cells)
+            self.row_err_msg_dict[ws_row.row_num] = TimeCardFormSet.ERR_MSG_BREAK_TIME_OUT_OF_RANGE
             return True
 
         return False
 
 
-class TimeCardProcessMonthListView(SuperuserPermissionView, ListView):
+Submission = namedtuple("Submission", ["user_id", "month"])
+
+
+class TimeCardProcessMonthListView(SuperuserPermissionView, KeysetPaginationMixin, ListView):
     context_object_name = "month_list"
     template_name = "material-dashboard-master/pages/tables_process.html"
+    url = reverse_lazy("timecard:timecard_process_month_list")
+    keyset_ordering = ["month", "user_id"]
+    # 1トランザクションで承認する申請数
+    BULK_APPROVE_BATCH_SIZE = 100
+    # 承認に失敗した申請ごとのメッセージ（トーストではなく一覧の上部に表示する）
+    FAILURE_MESSAGE_TAG = "approve_failure"
+    logger = logging.getLogger(__name__)
 
-    def get_queryset(self):
-        state_process_month_qs = (
-            TimeCard.objects.filter(~Q(user=self.request.user), state=TimeCard.State.PROCESSING)
-            .values("user", "stamped_time")
-            .annotate(month=TruncMonth("stamped_time"))
-            .values("user", "month")
-            .order_by("user", "-month")
-            .distinct()
+    def post(self, request, *args, **kwargs):
+        submission_list, failure_list = self._parse_submissions(request.POST.getlist("submission"))
+        if not submission_list and not failure_list:
+            messages.error(request, "承認する勤怠を選択してください")
+            return redirect(self.url)
+
+        approved_count, bulk_failure_list = self.bulk_approve(submission_list)
+        failure_list.extend(bulk_failure_list)
+
+        if failure_list:
+            self._add_failure_messages(failure_list)
+        if approved_count:
+            messages.success(request, "{}件承認しました".format(approved_count))
+        if failure_list:
+            messages.error(request, "{}件の承認に失敗しました".format(len(failure_list)))
+
+        return redirect(self.url)
+
+    def _add_failure_messages(self, failure_list):
+        # Cookieに収まらない場合は古いメッセージから破棄されるため、件数のメッセージより先に追加する
+        user_name_dict = dict(
+            User.objects.filter(id__in={submission.user_id for submission, _ in failure_list}).values_list("id", "name")
+        )
+        for submission, reason in failure_list:
+            messages.error(
+                self.request,
+                "{} {}：{}".format(
+                    user_name_dict.get(submission.user_id, ""),
+                    submission.month.strftime("%Y{0}%m{1}").format(*"年月"),
+                    reason,
+                ),
+                extra_tags=self.FAILURE_MESSAGE_TAG,
+            )
+
+    def _parse_submissions(self, submission_key_list):
+        submission_set = set()
+        failure_list = []
+        for submission_key in submission_key_list:
+            try:
+                user_id, month_str = submission_key.split("_")
+                submission = Submission(int(user_id), datetime.strptime(month_str + "01", "%Y%m%d").date())
+            except ValueError:
+                self.logger.warning(f"invalid submission key: {submission_key}")
+                continue
+
+            if submission.user_id == self.request.user.id:
+                failure_list.append((submission, "自身の勤怠は承認できません"))
+            else:
+                submission_set.add(submission)
+
+        return sorted(submission_set), failure_list
+
+    def bulk_approve(self, submission_list):
+        approved_count = 0
+        failure_list = []
+        for index in range(0, len(submission_list), self.BULK_APPROVE_BATCH_SIZE):
+            batch = submission_list[index : index + self.BULK_APPROVE_BATCH_SIZE]
+            state_dict = self._get_submission_state_dict(batch)
+
+            target_list = []
+            for submission in batch:
+                state = state_dict.get(submission)
+                if state == MonthlySubmission.State.APPROVED:
+                    failure_list.append((submission, "承認済みの勤怠です"))
+                elif state != MonthlySubmission.State.PROCESSING:
+                    failure_list.append((submission, "申請中の勤怠情報が存在しません"))
+                else:
+                    target_list.append(submission)
+
+            try:
+                approved_count += self._approve_submissions(target_list)
+            except Exception as e:
+                # まとめての承認に失敗した場合は1件ずつ承認し、失敗したものだけを報告する
+                self.logger.error(f"{e}", exc_info=True)
+                for submission in target_list:
+                    try:
+                        approved_count += self._approve_submissions([submission])
+                    except Exception as e:
+                        self.logger.error(f"{e}", exc_info=True)
+                        failure_list.append((submission, "承認処理に失敗しました"))
+
+        return approved_count, failure_list
+
+    def _get_submission_state_dict(self, submission_list):
+        submission_qs = MonthlySubmission.objects.filter(self._get_submission_condition(submission_list))
+        return {
+            Submission(user_id, month): state
+            for user_id, month, state in submission_qs.values_list("user", "month", "state")
+        }
+
+    def _get_submission_condition(self, submission_list):
+        condition = Q(pk__in=[])
+        for submission in submission_list:
+            condition |= Q(user=submission.user_id, month=submission.month)
+
+        return condition
+
+    def _approve_submissions(self, submission_list):
+        if not submission_list:
+            return 0
+
+        # 打刻のたびに更新している月次勤怠をまとめて取得し、サマリとして確定する
+        monthly_attendance_dict = {
+            (monthly_attendance.user_id, monthly_attendance.month): monthly_attendance
+            for monthly_attendance in MonthlyAttendance.objects.filter(
+                user__in={submission.user_id for submission in submission_list},
+                month__in={submission.month for submission in submission_list},
+            )
+        }
+        summary_list = []
+        for submission in submission_list:
+            monthly_attendance = (
+                monthly_attendance_dict.get((submission.user_id, submission.month)) or MonthlyAttendance()
+            )
+            summary_list.append(
+                TimeCardSummary(
+                    user_id=submission.user_id,
+                    month=submission.month,
+                    work_days_flag=monthly_attendance.work_days_flag,
+                    work_seconds=monthly_attendance.work_seconds,
+                    break_seconds=monthly_attendance.break_seconds,
+                )
+            )
+
+        now = timezone.now()
+        with transaction.atomic():
+            approved_count = MonthlySubmission.objects.filter(
+                self._get_submission_condition(submission_list), state=MonthlySubmission.State.PROCESSING
+            ).update(state=MonthlySubmission.State.APPROVED, approved_at=now, updated_at=now)
+            if approved_count != len(submission_list):
+                # 確認後に差し戻された申請がある
+                raise IntegrityError("submission state has been changed")
+
+            TimeCardSummary.objects.bulk_create(summary_list)
+
+        return approved_count
+
+    def get(self, request, *args, **kwargs):
+        self.filter_form = MonthlySubmissionFilterForm(
+            request.GET or None, initial={"state": MonthlySubmission.State.PROCESSING}
         )
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        submission_qs = MonthlySubmission.objects.filter(~Q(user=self.request.user))
+
+        if not self.filter_form.is_bound:
+            submission_qs = submission_qs.filter(state=MonthlySubmission.State.PROCESSING)
+        elif self.filter_form.is_valid():
+            if self.filter_form.cleaned_data["name"]:
+                submission_qs = submission_qs.filter(user__name__startswith=self.filter_form.cleaned_data["name"])
+            if self.filter_form.cleaned_data["state"]:
+                submission_qs = submission_qs.filter(state=self.filter_form.cleaned_data["state"])
+        else:
+            submission_qs = submission_qs.none()
 
-        return state_process_month_qs
+        return submission_qs.select_related("user")
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data()
-        context.update(**get_toast_msg_by_session(self.request.session))
-
-        for month in context["month_list"]:
-            user = User.objects.get(pk=month["user"])
-            month["user_name"] = user.name
-            month["date_str"] = month["month"].strftime("%Y{0}%m{1}").format(*"年月")
-            month["param"] = "?month={}&user={}".format(month["month"].strftime("%Y%m"), user.id)
+        context.update(**get_toast_msg(self.request))
+
+        context["filter_form"] = self.filter_form
+
+        context["month_list"] = [
+            {
+                "user": submission.user_id,
+                "month": submission.month,
+                "user_name": submission.user.name,
+                "state": submission.get_state_display(),
+                "can_approve": submission.state == MonthlySubmission.State.PROCESSING,
+                "date_str": submission.month.strftime("%Y{0}%m{1}").format(*"年月"),
+                "param": "?month={}&user={}".format(submission.month.strftime("%Y%m"), submission.user_id),
+                "submission": "{}_{}".format(submission.user_id, submission.month.strftime("%Y%m")),
+            }
+            for submission in context["month_list"]
+        ]
 
         return context
 
 
-class TimeCardApprovedMonthListView(SuperuserPermissionView, ListView):
+class TimeCardApprovedMonthListView(SuperuserPermissionView, KeysetPaginationMixin, ListView):
+    context_object_name = "timecardsummary_list"
     template_name = "material-dashboard-master/pages/tables_approved.html"
+    SORT_ORDERING = {
+        "name": ["user__name", "user_id"],
+        "-work_seconds": ["-work_seconds", "user_id"],
+        "work_seconds": ["work_seconds", "user_id"],
+        "-overtime_seconds": ["-overtime_seconds", "user_id"],
+    }
+    TOP_OVERTIME_COUNT = 5
 
     def get(self, request, *args, **kwargs):
         display_month = (
@@ -659,22 +956,74 @@ class TimeCardApprovedMonthListView(SuperuserPermissionView, ListView):
             or (timezone.datetime.today() - relativedelta(months=1)).strftime("%Y%m")
         )
         self.request.session["approved_month"] = display_month
+        self.filter_form = TimeCardSummaryFilterForm(request.GET or None)
         return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
-        summary_qs = TimeCardSummary.objects.filter(
-            ~Q(user=self.request.user), month=self.request.session["approved_month"]
-        )
+        summary_qs = self._get_org_summary_qs()
+
+        # 絞り込み・並び替えは秒数のままDB側で行う
+        if self.filter_form.is_valid():
+            min_hours = self.filter_form.cleaned_data["min_hours"]
+            max_hours = self.filter_form.cleaned_data["max_hours"]
+            if min_hours is not None:
+                summary_qs = summary_qs.filter(work_seconds__gte=min_hours * 60 * 60)
+            if max_hours is not None:
+                summary_qs = summary_qs.filter(work_seconds__lte=max_hours * 60 * 60)
+            if self.filter_form.cleaned_data["work_day"] is not None:
+                summary_qs = summary_qs.worked_on(self.filter_form.cleaned_data["work_day"])
+            if self.filter_form.cleaned_data["work_days_lt"] is not None:
+                summary_qs = summary_qs.work_days_lt(self.filter_form.cleaned_data["work_days_lt"])
+            if self.filter_form.cleaned_data["name"]:
+                summary_qs = summary_qs.filter(user__name__startswith=self.filter_form.cleaned_data["name"])
+
+        if self._get_sort() == "-overtime_seconds":
+            summary_qs = summary_qs.with_overtime()
 
-        return summary_qs
+        return summary_qs.select_related("user")
+
+    def get_keyset_ordering(self):
+        return self.SORT_ORDERING.get(self._get_sort(), self.SORT_ORDERING["name"])
+
+    def _get_sort(self):
+        if not self.filter_form.is_valid():
+            return ""
+
+        return self.filter_form.cleaned_data["sort"]
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data()
-        context.update(**get_toast_msg_by_session(self.request.session))
+        context.update(**get_toast_msg(self.request))
         context["search_form"] = self._get_search_form()
+        context["filter_form"] = self.filter_form
+        context["org_totals"] = self._get_org_totals()
+        context["top_overtime_list"] = self._get_top_overtime_list()
 
         return context
 
+    def _get_org_summary_qs(self):
+        month = datetime.strptime(self.request.session["approved_month"] + "01", "%Y%m%d").date()
+        return TimeCardSummary.objects.filter(~Q(user=self.request.user), month=month)
+
+    def _get_org_totals(self):
+        org_totals = self._get_org_summary_qs().org_totals()
+        return {
+            "headcount": org_totals["headcount"],
+            "total_work_hours": seconds2hours_str(org_totals["total_work_seconds"]),
+            "avg_work_hours": seconds2hours_str(org_totals["avg_work_seconds"]),
+            "max_work_hours": seconds2hours_str(org_totals["max_work_seconds"]),
+            "total_break_hours": seconds2hours_str(org_totals["total_break_seconds"]),
+        }
+
+    def _get_top_overtime_list(self):
+        top_overtime_list = list(
+            self._get_org_summary_qs().select_related("user").top_overtime(self.TOP_OVERTIME_COUNT)
+        )
+        for summary in top_overtime_list:
+            summary.overtime_hours = seconds2hours_str(summary.overtime_seconds)
+
+        return top_overtime_list
+
     def _get_search_form(self):
         kwargs = {}
         kwargs["initial"] = {
@@ -696,18 +1045,18 @@ class TimeCardApprovedMonthListView(SuperuserPermissionView, ListView):
 class TimeCardApprovedMonthlyReportView(SuperuserPermissionView, TimeCardBaseMonthlyReportView):
     template_name = "material-dashboard-master/pages/approved_list.html"
     url = reverse_lazy("timecard:timecard_approved_month_list")
-    DISPLAY_STATE = TimeCard.State.APPROVED
+    DISPLAY_STATE = MonthlySubmission.State.APPROVED
 
     def get(self, request, *args, **kwargs):
         self.user = self._get_user_by_url(request)
 
         self.EOM_by_url = self._get_EOM_by_url()
         if self.user is None or self.EOM_by_url is None:
-            request.session["error"] = "不正な操作を検知しました"
+            messages.error(request, "不正な操作を検知しました")
             return redirect(self.url)
 
-        if not self.get_queryset().exists():
-            request.session["error"] = "勤怠情報が存在しません"
+        if self._get_state() != self.DISPLAY_STATE:
+            messages.error(request, "勤怠情報が存在しません")
             return redirect(self.url)
 
         return super().get(request, *args, **kwargs)
@@ -740,26 +1089,31 @@ class TimeCardApprovedMonthlyReportView(SuperuserPermissionView, TimeCardBaseMon
             stamped_time__gte=(self.EOM_by_url + relativedelta(day=1)),
             stamped_time__lt=(self.EOM_by_url + relativedelta(months=1, day=1)),
             user=self.user,
-            state=self.DISPLAY_STATE,
         ).order_by("stamped_time")
 
         return monthly_stamps_qs
 
+    def _get_monthly_stamps(self):
+        return MonthlyStamps.from_daily_attendance(self.user, self.EOM_by_url + relativedelta(day=1))
+
+    def _get_state(self):
+        return MonthlySubmission.objects.get_state(self.user, (self.EOM_by_url + relativedelta(day=1)).date())
+
     def _get_total_work_hours(self):
-        summary = TimeCardSummary.objects.get(user=self.user, month=self.EOM_by_url.strftime("%Y%m"))
+        summary = TimeCardSummary.objects.get(user=self.user, month=self.EOM_by_url.date().replace(day=1))
         return summary.total_work_hours
 
 
 class TimeCardProcessMonthlyReportView(TimeCardApprovedMonthlyReportView):
     template_name = "material-dashboard-master/pages/processing_list.html"
     url = reverse_lazy("timecard:timecard_process_month_list")
-    DISPLAY_STATE = TimeCard.State.PROCESSING
+    DISPLAY_STATE = MonthlySubmission.State.PROCESSING
 
     def get(self, request, *args, **kwargs):
         response = super().get(request, *args, **kwargs)
 
-        if request.session.get("error"):
-            return redirect(self.url)
+        if isinstance(response, HttpResponseRedirect):
+            return response
 
         if request.GET.get("mode") == "demote":
             return self._demote_process()
@@ -767,71 +1121,55 @@ class TimeCardProcessMonthlyReportView(TimeCardApprovedMonthlyReportView):
         return response
 
     def _get_total_work_hours(self):
-        return timedelta2str(self.total_work_hours)
+        return timedelta2str(self._get_monthly_attendance().work_hours)
+
+    def _get_monthly_attendance(self):
+        month = (self.EOM_by_url + relativedelta(day=1)).date()
+        return MonthlyAttendance.objects.filter(user=self.user, month=month).first() or MonthlyAttendance(
+            user=self.user, month=month
+        )
 
     @transaction.atomic
-    def approval_process(self, monthly_stamps_qs):
+    def approval_process(self):
+        month = (self.EOM_by_url + relativedelta(day=1)).date()
         try:
             with transaction.atomic():
-                monthly_stamps_qs.update(state=TimeCard.State.APPROVED)
-                work_days_list = self._get_work_days_by_qs(monthly_stamps_qs)
-                work_days_flag = self.create_work_days_flag(work_days_list)
-                self._calculation_total_work_hours_total_break_hours(monthly_stamps_qs)
+                if not MonthlySubmission.objects.approve(self.user, month):
+                    return
 
+                # 打刻のたびに更新している月次勤怠をそのままサマリとして確定する
+                monthly_attendance = self._get_monthly_attendance()
                 return TimeCardSummary.objects.create(
                     user=self.user,
-                    work_days_flag=work_days_flag,
-                    month=self.EOM_by_url.strftime("%Y%m"),
-                    total_work_hours=timedelta2str(self.total_work_hours),
-                    total_break_hours=timedelta2str(self.total_break_hours),
+                    work_days_flag=monthly_attendance.work_days_flag,
+                    month=month,
+                    work_seconds=monthly_attendance.work_seconds,
+                    break_seconds=monthly_attendance.break_seconds,
                 )
         except:
             return
 
-    def create_work_days_flag(self, work_days_list) -> int:
-        work_days_flag_int = 0
-        for work_day in work_days_list:
-            left_shift_count = work_day - 1
-            work_days_flag_int = work_days_flag_int | 1 << left_shift_count
-
-        return work_days_flag_int
-
     def _promote_process(self):
-        monthly_stamps_qs = self.get_queryset()
-
-        if not monthly_stamps_qs.exists():
-            self.request.session["error"] = "申請中の勤怠情報が存在しません"
+        if self._get_state() != MonthlySubmission.State.PROCESSING:
+            messages.error(self.request, "申請中の勤怠情報が存在しません")
             return redirect(self.url)
 
-        if self.approval_process(monthly_stamps_qs):
-            self.request.session["success"] = "承認しました"
+        if self.approval_process():
+            messages.success(self.request, "承認しました")
             return redirect(self.url)
 
-        self.request.session["error"] = "承認処理に失敗しました"
+        messages.error(self.request, "承認処理に失敗しました")
         return redirect(self.url)
 
-    def _calculation_total_work_hours_total_break_hours(self, monthly_stamps_qs):
-        self._get_monthly_report(monthly_stamps_qs)
-
-    def get_queryset(self):
-        monthly_stamps_qs = TimeCard.objects.filter(
-            stamped_time__gte=(self.EOM_by_url + relativedelta(day=1)),
-            stamped_time__lt=(self.EOM_by_url + relativedelta(months=1, day=1)),
-            user=self.user,
-        ).order_by("stamped_time")
-
-        return monthly_stamps_qs
-
     def _demote_process(self):
-        try:
-            self.get_queryset().update(state=TimeCard.State.NEW)
-            self.request.session["success"] = "差し戻しました"
-        except:
-            self.request.session["error"] = "差戻処理に失敗しました"
+        if MonthlySubmission.objects.demote(self.user, (self.EOM_by_url + relativedelta(day=1)).date()):
+            messages.success(self.request, "差し戻しました")
+        else:
+            messages.error(self.request, "差戻処理に失敗しました")
 
         return redirect(self.url)
 
     def get_context_data(self):
         context = super().get_context_data()
-        context["work_days_count"] = len(self._get_work_days_by_qs(self.get_queryset()))
+        context["work_days_count"] = len(self.monthly_stamps.work_days)
         return context
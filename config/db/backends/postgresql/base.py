@@ -0,0 +1,73 @@
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from config.db.pool import get_pool
+
+
+# DATABASESに以下の設定を追加したPostgreSQLのバックエンド
+#   CONN_HEALTH_CHECKS: 再利用する接続が使えるか、リクエストの最初のクエリの前に確認する
+#   POOL: {"MAX_SIZE": 最大接続数, "TIMEOUT": 待ち時間（秒）} を指定すると、プロセス内のスレッドで接続を共有する
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_enabled = self.settings_dict.get("CONN_HEALTH_CHECKS", False)
+        self.health_check_done = False
+
+    @property
+    def pool(self):
+        pool_settings = self.settings_dict.get("POOL") or {}
+        if not pool_settings.get("MAX_SIZE"):
+            return
+
+        return get_pool(self.alias, pool_settings["MAX_SIZE"], pool_settings.get("TIMEOUT", 30))
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        return pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def connect(self):
+        super().connect()
+        # プールで待機していた接続はサーバー側で切断されている可能性があるため確認対象にする
+        self.health_check_done = self.pool is None
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+
+        # 実行中のトランザクションを残したままプールに戻さない
+        discard = bool(self.connection.closed) or self.errors_occurred
+        if not discard:
+            try:
+                if self.connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    self.connection.rollback()
+            except base.Database.Error:
+                discard = True
+
+        pool.putconn(self.connection, discard)
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # リクエストの開始・終了ごとに、次のクエリの前で再確認する
+        self.health_check_done = False
+
+    def _cursor(self, name=None):
+        self.ensure_connection()
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
+
+    def close_if_health_check_failed(self):
+        if self.connection is None or not self.health_check_enabled or self.health_check_done:
+            return
+
+        # トランザクションの途中では切断しない
+        if self.in_atomic_block:
+            return
+
+        if not self.is_usable():
+            self.close()
+
+        self.health_check_done = True
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# スレッドワーカー間で共有するプロセス内のコネクションプール
+class ConnectionPool:
+    def __init__(self, max_size, timeout=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        # 直近に返却された接続から再利用する
+        self._idle = deque()
+        self._in_use = 0
+        self._waiting = 0
+        self._checkout_count = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def getconn(self, connect):
+        start = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+
+        acquired = self._slots.acquire(timeout=self.timeout)
+        wait = time.monotonic() - start
+        with self._lock:
+            self._waiting -= 1
+            self._checkout_count += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if not acquired:
+                raise PoolTimeout("connection pool exhausted (max_size={})".format(self.max_size))
+
+            self._in_use += 1
+            conn = self._idle.pop() if self._idle else None
+
+        if conn is not None and not conn.closed:
+            return conn
+
+        try:
+            return connect()
+        except Exception:
+            self._release()
+            raise
+
+    def putconn(self, conn, discard=False):
+        if discard or conn.closed:
+            self._close_quietly(conn)
+        else:
+            with self._lock:
+                self._idle.append(conn)
+
+        self._release()
+
+    def closeall(self):
+        with self._lock:
+            idle_list = list(self._idle)
+            self._idle.clear()
+
+        for conn in idle_list:
+            self._close_quietly(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkout_count": self._checkout_count,
+                "avg_wait_ms": round(self._total_wait / self._checkout_count * 1000, 3) if self._checkout_count else 0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def _release(self):
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pool_dict = {}
+_pool_dict_lock = threading.Lock()
+
+
+def get_pool(alias, max_size, timeout):
+    with _pool_dict_lock:
+        pool = _pool_dict.get(alias)
+        # fork前に作成されたプールの接続は子プロセスで使わない
+        if pool is None or pool.pid != os.getpid():
+            pool = _pool_dict[alias] = ConnectionPool(max_size, timeout)
+
+        return pool
+
+
+def get_pool_stats() -> dict:
+    with _pool_dict_lock:
+        return {alias: pool.stats() for alias, pool in _pool_dict.items() if pool.pid == os.getpid()}
+
+
+def close_all_pools():
+    with _pool_dict_lock:
+        pool_list = list(_pool_dict.values())
+        _pool_dict.clear()
+
+    for pool in pool_list:
+        pool.closeall()
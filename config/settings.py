@@ -32,6 +32,10 @@ DEBUG = env.get_value("DEBUG") == "True"
 
 ALLOWED_HOSTS = env.get_value("ALLOWED_HOSTS", list)
 
+# ログイン画面にデモ用のログイン情報（有効なユーザーのメールアドレス・名前）を表示する
+# 認証なしで公開されるため、デモ環境以外では有効にしない
+DEMO_LOGIN_INFO = env.bool("DEMO_LOGIN_INFO", default=DEBUG)
+
 
 # Application definition
 
@@ -74,6 +78,21 @@ TEMPLATES = [
         },
     },
 ]
+if not DEBUG:
+    # 本番ではコンパイル済みのテンプレートをプロセス内にキャッシュする
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        ),
+    ]
+
+# 起動時に画面のテンプレートをコンパイルし、構文エラーがあれば起動を失敗させる
+TEMPLATE_PRECOMPILE = env.bool("TEMPLATE_PRECOMPILE", default=not DEBUG)
 
 WSGI_APPLICATION = "config.wsgi.application"
 
@@ -83,14 +102,41 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "config.db.backends.postgresql",
         "NAME": env.get_value("DB_NAME"),
         "USER": env.get_value("DB_USER"),
         "PASSWORD": env.get_value("DB_PASSWORD"),
         "HOST": env.get_value("DB_HOST"),
         "PORT": env.get_value("DB_PORT"),
+        # 接続を再利用する秒数（0の場合はリクエストごとに切断する）
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+        # 再利用する接続が使えるか、リクエストの最初のクエリの前に確認する
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+        # pgbouncerのtransactionモードではサーバーサイドカーソルを使えない
+        "DISABLE_SERVER_SIDE_CURSORS": env.bool("DB_PGBOUNCER", default=False),
+        # スレッドワーカー向けのプロセス内コネクションプール（MAX_SIZEが0の場合は使わない）
+        "POOL": {
+            "MAX_SIZE": env.int("DB_POOL_MAX_SIZE", default=0),
+            "TIMEOUT": env.float("DB_POOL_TIMEOUT", default=30),
+        },
     }
 }
+if DATABASES["default"]["POOL"]["MAX_SIZE"]:
+    # プールを使う場合は、リクエストの終了時に接続をプールへ返却する
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+
+# Cache / Session
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/
+
+CACHES = {"default": env.cache_url("CACHE_URL", default="locmemcache://")}
+
+# 内容が変わらない場合はDBに書き込まないセッション
+# キャッシュを併用する場合は apps.accounts.sessions.cached_db を指定する
+SESSION_ENGINE = env.get_value("SESSION_ENGINE", default="apps.accounts.sessions.db")
+
+# トーストメッセージはセッションではなく署名付きCookieで受け渡す
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
 
 
 # Password validation
@@ -134,6 +180,9 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static_local"),
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
+if not DEBUG:
+    # ファイル名にハッシュを付与し、圧縮とgzip・brotliの圧縮済みファイルの作成を行う
+    STATICFILES_STORAGE = "config.storage.CompressedManifestStaticFilesStorage"
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
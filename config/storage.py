@@ -0,0 +1,57 @@
+import gzip
+import os
+
+import brotli
+import rcssmin
+import rjsmin
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    minifiers = {
+        ".css": rcssmin.cssmin,
+        ".js": rjsmin.jsmin,
+    }
+    compress_extensions = (".css", ".js", ".svg", ".json", ".txt", ".eot", ".ttf")
+    # 小さいファイルは圧縮してもヘッダー分の差しかないため対象外にする
+    compress_min_size = 1024
+
+    def _save(self, name, content):
+        # コピー元のファイルとハッシュ付きのファイルのどちらも、書き込む時点で空白やコメントを取り除く
+        minify = self.minifiers.get(os.path.splitext(name)[1])
+        if minify is not None and ".min." not in os.path.basename(name):
+            content.seek(0)
+            content = ContentFile(minify(content.read().decode("utf-8")).encode("utf-8"))
+
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+
+        if dry_run:
+            return
+
+        # 途中のパスで作成されたファイルは残らないため、マニフェストに記録された最終的なファイルを対象にする
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            if hashed_name.endswith(self.compress_extensions):
+                self._save_compressed(hashed_name)
+
+    def _save_compressed(self, name):
+        with self.open(name) as file:
+            content = file.read()
+
+        if len(content) < self.compress_min_size:
+            return
+
+        # nginxのgzip_static・brotli_staticで配信する圧縮済みファイルを作成する
+        for suffix, compressed in [
+            (".gz", gzip.compress(content, compresslevel=9, mtime=0)),
+            (".br", brotli.compress(content, quality=11)),
+        ]:
+            if len(compressed) >= len(content):
+                continue
+
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
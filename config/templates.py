@@ -0,0 +1,47 @@
+from django.template import engines
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.urls import URLResolver, get_resolver
+from django.views.defaults import ERROR_403_TEMPLATE_NAME
+
+PRECOMPILE_NAMESPACES = ["accounts", "timecard"]
+
+
+def precompile_templates(namespaces=PRECOMPILE_NAMESPACES):
+    template_names = [ERROR_403_TEMPLATE_NAME]
+    template_names.extend(iter_view_template_names(get_resolver().url_patterns, namespaces))
+    return compile_templates(template_names)
+
+
+def iter_view_template_names(url_patterns, namespaces, in_namespace=False):
+    for pattern in url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_view_template_names(
+                pattern.url_patterns, namespaces, in_namespace or pattern.namespace in namespaces
+            )
+        elif in_namespace:
+            template_name = getattr(getattr(pattern.callback, "view_class", None), "template_name", None)
+            if template_name:
+                yield template_name
+
+
+def compile_templates(template_names):
+    engine = engines["django"]
+    pending = list(template_names)
+    compiled = []
+    while pending:
+        template_name = pending.pop()
+        if template_name in compiled:
+            continue
+
+        # cachedローダーの場合は、コンパイル結果がローダーにキャッシュされる
+        # 構文エラーやテンプレートが存在しない場合は例外をそのまま送出する
+        template = engine.get_template(template_name)
+        compiled.append(template_name)
+
+        # extendsとincludeは描画時に読み込まれるため、名前が固定のものはここで辿る
+        for node in template.template.nodelist.get_nodes_by_type((ExtendsNode, IncludeNode)):
+            name_expr = node.parent_name if isinstance(node, ExtendsNode) else node.template
+            if isinstance(name_expr.var, str) and not name_expr.filters:
+                pending.append(name_expr.var)
+
+    return compiled
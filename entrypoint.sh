@@ -1,8 +1,26 @@
 #!/bin/sh
-python manage.py migrate
-python manage.py collectstatic --noinput
-if [ $DEBUG = 1 ]; then
+set -e
+
+# 起動時間の計測の開始時刻（gunicornの起動完了時にログへ出力する）
+BOOT_STARTED_AT=$(date +%s.%N)
+export BOOT_STARTED_AT
+
+if [ "$STARTUP_MODE" = "fast" ]; then
+    # 静的ファイルはイメージのビルド時に作成済みのため、nginxと共有するボリュームへの反映だけを行う
+    if [ -n "$STATIC_SHARE_DIR" ] && ! cmp -s static/staticfiles.json "$STATIC_SHARE_DIR/staticfiles.json"; then
+        cp -R static/. "$STATIC_SHARE_DIR/"
+    fi
+    # 未適用のマイグレーションがある場合だけmigrateする（--planと併用するとモデルの状態を作成せずに終了する）
+    if ! python manage.py migrate --check --plan --skip-checks > /dev/null; then
+        python manage.py migrate
+    fi
+else
+    python manage.py migrate
+    python manage.py collectstatic --noinput
+fi
+
+if [ "$DEBUG" = 1 ]; then
     python manage.py runserver 0.0.0.0:8000
 else
-    gunicorn config.wsgi:application
-fi
\ No newline at end of file
+    exec gunicorn config.wsgi:application
+fi
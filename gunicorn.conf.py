@@ -1,13 +1,91 @@
+import gc
+import multiprocessing
 import os
 import pathlib
+import time
 
-template_root = os.path.join(os.getcwd(), "templates")
-template_list = []
+# 起動時間の計測の開始時刻（entrypoint.shから渡されない場合は設定の読み込み時）
+boot_started_at = float(os.environ.get("BOOT_STARTED_AT") or time.time())
 
-for path, subdirs, files in os.walk(template_root):
-    for name in files:
-        template_list.append(str(pathlib.PurePath(path, name)))
+# GUNICORN_PROFILEが未指定の場合は、DEBUGの値からプロファイルを決める
+profile = os.environ.get("GUNICORN_PROFILE") or ("development" if os.environ.get("DEBUG") == "True" else "production")
 
 bind = "0.0.0.0:8000"
-reload = True
-reload_extra_files = template_list
+
+# 起動が完了したことを示すファイル（コンテナのヘルスチェックで参照する）
+ready_file = os.environ.get("GUNICORN_READY_FILE", "/tmp/gunicorn.ready")
+# DBに接続できるまで待つ秒数
+db_wait_timeout = float(os.environ.get("DB_WAIT_TIMEOUT", 30))
+
+
+def remove_ready_file(server):
+    # コンテナの再起動時に前回のファイルが残っていても、起動が完了するまでは準備中とする
+    pathlib.Path(ready_file).unlink(missing_ok=True)
+
+
+def prepare_workers(server):
+    from django.db import connections
+
+    from config.db.pool import close_all_pools
+
+    wait_for_database(server)
+
+    # 読み込み中に開いた接続をforkしたワーカーで共有しない
+    connections.close_all()
+    close_all_pools()
+
+    # 読み込み済みのオブジェクトをGCの対象外にして、コピーオンライトでページが複製されないようにする
+    gc.collect()
+    gc.freeze()
+
+    pathlib.Path(ready_file).touch()
+    server.log.info("Ready in %.2f seconds", time.time() - boot_started_at)
+
+
+def wait_for_database(server):
+    from django.db import connection
+    from django.db.utils import OperationalError
+
+    deadline = time.monotonic() + db_wait_timeout
+    while True:
+        try:
+            connection.ensure_connection()
+            return
+        except OperationalError as e:
+            if time.monotonic() >= deadline:
+                raise
+
+            server.log.warning("Waiting for database: %s", e)
+            time.sleep(1)
+
+
+if profile == "development":
+    template_root = os.path.join(os.getcwd(), "templates")
+    template_list = []
+
+    for path, subdirs, files in os.walk(template_root):
+        for name in files:
+            template_list.append(str(pathlib.PurePath(path, name)))
+
+    reload = True
+    reload_extra_files = template_list
+else:
+    cpu_count = multiprocessing.cpu_count()
+    workers = int(os.environ.get("GUNICORN_WORKERS", cpu_count * 2 + 1))
+    # スレッド数が2以上の場合はgthreadワーカーになる
+    threads = int(os.environ.get("GUNICORN_THREADS", 2))
+
+    # マスターでアプリを読み込んでからforkし、ワーカー間でメモリを共有する
+    preload_app = True
+
+    # openpyxlによるメモリの増加を抑えるため、一定数のリクエストでワーカーを入れ替える
+    # 全ワーカーが同時に再起動しないようにばらつきを持たせる
+    max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+    max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+    # ハートビートのファイルをディスクではなくメモリ上に置く
+    worker_tmp_dir = "/dev/shm"
+
+    # 起動の完了はDBに接続できることを確認してから通知する
+    on_starting = remove_ready_file
+    when_ready = prepare_workers